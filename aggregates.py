@@ -0,0 +1,53 @@
+class InventoryStats:
+    """Running catalogue totals, updated from product changes instead of rescans.
+
+    Every change to a product is reported as ``update(key, old, new)`` where
+    ``old``/``new`` are the product dicts before and after (``None`` for an
+    insert or delete). The old values are subtracted and the new ones added,
+    so reading the totals is O(1) and updating them is O(1) per product.
+    Stock value is kept in integer paise so repeated deltas do not drift.
+    """
+
+    def __init__(self, products=None):
+        self.total_skus = 0
+        self.total_units = 0
+        self._value_paise = 0
+        self.categories = {}
+        for key, product in (products or {}).items():
+            self.update(key, None, product)
+
+    @property
+    def stock_value(self):
+        return self._value_paise / 100
+
+    def update(self, key, old, new):
+        if old is not None:
+            self._apply(old, -1)
+        if new is not None:
+            self._apply(new, 1)
+
+    def _apply(self, product, sign):
+        units = product["quantity"] * sign
+        value = round(product["price"] * 100) * units
+        self.total_skus += sign
+        self.total_units += units
+        self._value_paise += value
+
+        totals = self.categories.setdefault(product["category"], {"skus": 0, "units": 0, "value_paise": 0})
+        totals["skus"] += sign
+        totals["units"] += units
+        totals["value_paise"] += value
+        if totals["skus"] == 0:
+            del self.categories[product["category"]]
+
+    def snapshot(self):
+        """Plain-dict copy of the totals, safe to hand to another thread"""
+        return {
+            "total_skus": self.total_skus,
+            "total_units": self.total_units,
+            "stock_value": self.stock_value,
+            "categories": {
+                name: {"skus": t["skus"], "units": t["units"], "value": t["value_paise"] / 100}
+                for name, t in self.categories.items()
+            }
+        }
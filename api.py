@@ -0,0 +1,267 @@
+"""JSON HTTP API over the headless core, for POS terminals and scripts.
+
+Run from the repository root (uses STOCK_DB_PATH like the app):
+
+    python -m api --host 127.0.0.1 --port 8000
+
+Endpoints (bodies and responses are JSON):
+
+    GET  /health
+    GET  /metrics?format=prometheus|jsonl   timers and counters (STOCK_PROFILE=1 to collect)
+    GET  /products?q=&category=&limit=      search the catalogue
+    GET  /products/{id}
+    POST /products                          add a product (see core.add_product)
+    POST /products/{id}/stock               {"delta": units}
+    GET  /stats
+    GET  /low-stock?limit=
+    GET  /sales?customer=&start=&end=&limit=
+    GET  /sales/{id}
+    POST /bills/quote                       price a bill without selling it
+    POST /checkout                          check out one bill
+    POST /checkout/batch                    {"bills": [...]} in one transaction
+    GET  /locations                         stock and sales totals of every location
+    POST /locations                         {"name", "copy_from": location ID or null}
+    GET  /transfers?location=&limit=
+    POST /transfers                         {"id", "quantity", "from", "to"}
+
+Every product, stats, sales, bill and checkout endpoint works on one
+location's store: ``?location=<id>``, the main store (1) by default.
+
+A bill is ``{"customer", "lines": [{"id", "quantity"}], "discount_percent",
+"tax_percent"}``. Bad input answers 400, unknown IDs and locations 404, and bills that
+cannot be sold (not enough stock, expired) 409. Store calls block, so they
+run in Starlette's thread pool; the store's connection pool and lock make
+that safe for concurrent requests. The app can run against the same
+database at the same time: each request first reloads the store if the
+app has written to it (see InventoryStore.refresh).
+"""
+import argparse
+import contextlib
+import json
+import threading
+
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse, PlainTextResponse
+from starlette.routing import Route
+
+import core
+from instrumentation import METRICS, timer
+from locations import MAIN, Locations
+from store import ExpiredProductError, OutOfStockError
+
+locations = None
+_store_lock = threading.Lock()
+
+
+def get_locations():
+    """The API process's locations, opened on first use"""
+    global locations
+    with _store_lock:
+        if locations is None:
+            locations = Locations()
+    return locations
+
+
+def get_store(request=None):
+    """Store of the request's ``?location=`` (the main store without one)"""
+    location = MAIN if request is None else _int(request.query_params.get("location", MAIN), "location")
+    return get_locations().store(location)
+
+
+def error(status, message):
+    return JSONResponse({"error": message}, status_code=status)
+
+
+def endpoint(handler, status=200):
+    """Run ``handler(request, body)`` in the thread pool and map core errors to HTTP statuses"""
+    async def wrapper(request):
+        body = None
+        if request.method == "POST":
+            try:
+                body = json.loads(await request.body() or b"{}")
+            except ValueError:
+                return error(400, "Body must be JSON")
+            if not isinstance(body, dict):
+                return error(400, "Body must be a JSON object")
+        try:
+            with timer(f"api.{handler.__name__}"):
+                result = await run_in_threadpool(handler, request, body)
+        except LookupError as e:
+            return error(404, str(e.args[0]))
+        except (OutOfStockError, ExpiredProductError) as e:
+            return error(409, str(e))
+        except (ValueError, TypeError) as e:
+            return error(400, str(e))
+        return JSONResponse(result, status_code=status)
+    return wrapper
+
+
+def _int(value, name):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a whole number")
+
+
+def _product(request, key):
+    product = get_store(request).get_product(key)
+    if product is None:
+        raise LookupError(f"Product {key} not found")
+    return dict(product, id=key)
+
+
+# Reads
+
+def health(request, body):
+    return {"status": "ok"}
+
+
+async def metrics(request):
+    """Instrumentation counters as Prometheus text (default) or JSON lines"""
+    stats = await run_in_threadpool(lambda: get_store().get_stats())
+    METRICS.gauge("catalogue_products", stats["total_skus"])
+    if request.query_params.get("format") == "jsonl":
+        return PlainTextResponse(METRICS.json_lines(), media_type="application/x-ndjson")
+    return PlainTextResponse(METRICS.prometheus(), media_type="text/plain; version=0.0.4")
+
+
+def list_products(request, body):
+    params = request.query_params
+    ids = get_store(request).search_products(params.get("q", ""), params.get("category") or None)
+    return [_product(request, key) for key in ids[:_int(params.get("limit", 100), "limit")]]
+
+
+def get_product(request, body):
+    return _product(request, request.path_params["id"])
+
+
+def stats(request, body):
+    low, stocked_out = get_store(request).low_stock_counts()
+    return dict(get_store(request).get_stats(), low_stock=low, stocked_out=stocked_out)
+
+
+def low_stock(request, body):
+    limit = request.query_params.get("limit")
+    ids = get_store(request).low_stock(None if limit is None else _int(limit, "limit"))
+    return [_product(request, key) for key in ids]
+
+
+def list_sales(request, body):
+    params = request.query_params
+    return core.sales(get_store(request), params.get("customer", ""), params.get("start"), params.get("end"),
+                      _int(params.get("limit", 50), "limit"))
+
+
+def get_sale(request, body):
+    sales = get_store(request).get_sales([request.path_params["id"]])
+    if not sales:
+        raise LookupError(f"Sale {request.path_params['id']} not found")
+    return sales[0]
+
+
+# Writes
+
+def add_product(request, body):
+    key = core.add_product(
+        get_store(request), body.get("name"), float(body.get("price", 0)), _int(body.get("quantity", 0), "quantity"),
+        body.get("expiry_date"), body.get("category"), body.get("barcode"),
+        _int(body.get("reorder_level", 0), "reorder_level"), _int(body.get("reorder_quantity", 0), "reorder_quantity"),
+        key=None if body.get("id") is None else _int(body["id"], "id")
+    )
+    return _product(request, key)
+
+
+def adjust_stock(request, body):
+    key = request.path_params["id"]
+    _product(request, key)
+    quantity = core.adjust_stock(get_store(request), key, _int(body.get("delta"), "delta"))
+    return {"id": key, "quantity": quantity}
+
+
+def quote(request, body):
+    cart = core.build_cart(get_store(request), body.get("lines") or [])
+    totals = core.bill_totals(cart, body.get("discount_percent", 0), body.get("tax_percent", 0))
+    return {"items": cart.items(), **{name: float(value) for name, value in totals.items()}}
+
+
+def checkout(request, body):
+    cart = core.build_cart(get_store(request), body.get("lines") or [])
+    sale_id = core.checkout_cart(get_store(request), body.get("customer"), cart,
+                                 body.get("discount_percent", 0), body.get("tax_percent", 0))
+    return get_store(request).get_sales([sale_id])[0]
+
+
+def checkout_batch(request, body):
+    bills = body.get("bills")
+    if not isinstance(bills, list) or not all(isinstance(bill, dict) for bill in bills):
+        raise ValueError("bills must be a list of bill objects")
+    return {"results": core.checkout_bills(get_store(request), bills)}
+
+
+# Locations
+
+def list_locations(request, body):
+    return get_locations().rollup()
+
+
+def add_location(request, body):
+    copy_from = body.get("copy_from")
+    location_id = get_locations().add_location(body.get("name"),
+                                               None if copy_from is None else _int(copy_from, "copy_from"))
+    return {"id": location_id, "name": get_locations().names()[location_id]}
+
+
+def list_transfers(request, body):
+    params = request.query_params
+    location = params.get("location")
+    return get_locations().transfers(_int(params.get("limit", 50), "limit"),
+                                     None if location is None else _int(location, "location"))
+
+
+def transfer(request, body):
+    transfer_id = get_locations().transfer(_int(body.get("id"), "id"), _int(body.get("quantity"), "quantity"),
+                                           _int(body.get("from"), "from"), _int(body.get("to"), "to"))
+    return get_locations().get_transfer(transfer_id)
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    yield
+    if locations is not None:
+        locations.close()
+
+
+app = Starlette(routes=[
+    Route("/health", endpoint(health)),
+    Route("/metrics", metrics),
+    Route("/products", endpoint(list_products)),
+    Route("/products", endpoint(add_product, 201), methods=["POST"]),
+    Route("/products/{id:int}", endpoint(get_product)),
+    Route("/products/{id:int}/stock", endpoint(adjust_stock), methods=["POST"]),
+    Route("/stats", endpoint(stats)),
+    Route("/low-stock", endpoint(low_stock)),
+    Route("/sales", endpoint(list_sales)),
+    Route("/sales/{id:int}", endpoint(get_sale)),
+    Route("/bills/quote", endpoint(quote), methods=["POST"]),
+    Route("/checkout", endpoint(checkout, 201), methods=["POST"]),
+    Route("/checkout/batch", endpoint(checkout_batch), methods=["POST"]),
+    Route("/locations", endpoint(list_locations)),
+    Route("/locations", endpoint(add_location, 201), methods=["POST"]),
+    Route("/transfers", endpoint(list_transfers)),
+    Route("/transfers", endpoint(transfer, 201), methods=["POST"]),
+], lifespan=lifespan)
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Stock & billing JSON API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""Pages of the app, each in its own module and imported the first time it is shown.
+
+``PAGES`` maps the sidebar label of every page to its module (also its
+``?page=`` link). A page module draws itself in ``render()`` and imports
+what only it needs - pandas, the importer, receipts - so opening one page
+never pays for the others. ``HIDDEN_PAGES`` are left out of the sidebar
+and only opened through their link.
+"""
+import importlib
+
+from instrumentation import timer
+
+PAGES = {
+    "🏠 Dashboard": "dashboard",
+    "📦 Display Products": "products",
+    "➕ Add Product": "add_product",
+    "🔄 Update Stock": "update_stock",
+    "💳 Generate Bill": "billing",
+    "📊 Categories": "categories",
+    "📈 Sales History": "sales_history",
+    "🏬 Stores": "stores"
+}
+
+HIDDEN_PAGES = {
+    "🩺 Diagnostics": "diagnostics"
+}
+
+
+def render(label):
+    """Import (once per process) and draw the page with label ``label``"""
+    module = PAGES.get(label) or HIDDEN_PAGES[label]
+    with timer(f"page.{module}"):
+        importlib.import_module(f"{__name__}.{module}").render()
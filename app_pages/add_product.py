@@ -0,0 +1,131 @@
+"""Add Product: single product form and bulk import from CSV/Excel."""
+import streamlit as st
+
+import core
+from caching import cached_view
+from common import NEW_CATEGORY, category_options, get_store, notify, show_notices
+from importer import REQUIRED_COLUMNS, read_upload, template_csv, validate
+
+
+@cached_view(max_entries=4)
+def import_preview(key, data, filename, next_id):
+    """(sheet, valid products, errors) for an uploaded product sheet; raises ValueError if it cannot be read
+
+    Keyed on the upload's bytes and the next free ID, so reruns with the
+    same file skip parsing and validating it until a product is added.
+    """
+    import_df = read_upload(data, filename)
+    return (import_df,) + validate(import_df, next_id, get_store().get_barcodes())
+
+
+def save_product():
+    """Validate the Add Product form and add the product"""
+    store = get_store()
+    state = st.session_state
+    key = None if state.use_auto_id else int(state.get("new_product_id") or 0)
+    name = state.new_product_name
+    category = state.get("new_category_name", "") if state.new_product_category == NEW_CATEGORY else state.new_product_category
+    if key is not None and store.get_product(key) is not None:
+        state.add_product_error = "Product ID already exists! Uncheck 'Use Auto-Generated ID' to choose different ID."
+        return
+    try:
+        key = core.add_product(store, name, state.new_product_price, state.new_product_quantity,
+                               state.new_product_expiry, category, state.new_product_barcode,
+                               state.new_product_reorder_level, state.new_product_reorder_quantity, key=key)
+    except ValueError as e:
+        state.add_product_error = f"{e}!"
+    else:
+        state.new_product_name = ""
+        state.new_product_barcode = ""
+        notify(f"Product '{name}' added successfully with ID {key}!")
+
+
+def render():
+    store = get_store()
+    
+    st.markdown("## ➕ Add New Product")
+    
+    # Submitting reruns only this form, not the bulk import below
+    @st.fragment
+    def add_product_form():
+        show_notices()
+        # Auto-generate next ID
+        next_product_id = store.next_product_id()
+        st.info(f"💡 Next available Product ID: {next_product_id}")
+        
+        with st.form("add_product_form"):
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                use_auto_id = st.checkbox("Use Auto-Generated ID", value=True, key="use_auto_id")
+                if use_auto_id:
+                    st.markdown(f"**Product ID:** {next_product_id}")
+                else:
+                    st.number_input("Product ID", min_value=1, step=1, value=next_product_id, key="new_product_id")
+                
+                st.text_input("Product Name *", placeholder="e.g., Soap", key="new_product_name")
+                st.number_input("Price (Rs) *", min_value=0.0, step=0.50, format="%.2f", key="new_product_price")
+                st.text_input("Barcode", placeholder="Optional, e.g. 8901234567890", key="new_product_barcode")
+            
+            with col2:
+                st.number_input("Quantity *", min_value=0, step=1, value=10, key="new_product_quantity")
+                st.date_input("Expiry Date *", key="new_product_expiry")
+                st.number_input("Reorder Level", min_value=0, step=1, key="new_product_reorder_level",
+                                help="Reorder when stock falls to this many units (0 = never)")
+                st.number_input("Reorder Quantity", min_value=0, step=1, key="new_product_reorder_quantity",
+                                help="Units to order at a time")
+                
+                # Category dropdown with option to add new
+                existing_categories = [NEW_CATEGORY] + category_options(store.cache_key("categories"))
+                selected_category = st.selectbox("Category", existing_categories, key="new_product_category")
+                
+                if selected_category == NEW_CATEGORY:
+                    st.text_input("New Category Name", key="new_category_name")
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                st.form_submit_button("✅ Add Product", use_container_width=True, on_click=save_product)
+            with col2:
+                st.form_submit_button("🔄 Reset Form", use_container_width=True)
+            
+            if "add_product_error" in st.session_state:
+                st.error(f"❌ {st.session_state.pop('add_product_error')}")
+    
+    add_product_form()
+    
+    # Bulk import from a supplier sheet
+    st.markdown("---")
+    st.markdown("### 📤 Bulk Import (CSV / Excel)")
+    st.caption("Columns: " + ", ".join(REQUIRED_COLUMNS) + " (required), id, barcode, reorder_level and "
+               "reorder_quantity (optional). "
+               "Rows without an ID get the next free IDs; rows with an existing ID update that product.")
+    st.download_button("📄 Download Template", template_csv(), file_name="product_import_template.csv", mime="text/csv")
+    
+    upload = st.file_uploader("Upload product sheet", type=["csv", "xlsx"])
+    if upload is not None:
+        try:
+            import_df, import_products, import_errors = import_preview(
+                store.cache_key(), upload.getvalue(), upload.name, store.next_product_id()
+            )
+        except ValueError as e:
+            st.error(f"❌ {e}")
+        else:
+            updates = sum(1 for key in import_products if store.get_product(key) is not None)
+            
+            # Dry-run report
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("Rows", len(import_df))
+            col2.metric("Valid", len(import_products))
+            col3.metric("New / Updated", f"{len(import_products) - updates} / {updates}")
+            col4.metric("Rows with errors", import_errors["Row"].nunique())
+            if len(import_errors):
+                st.warning("⚠️ Rows with errors are skipped:")
+                st.dataframe(import_errors, use_container_width=True, hide_index=True)
+            
+            if import_products and st.button(f"✅ Import {len(import_products)} Product(s)", use_container_width=True):
+                try:
+                    inserted, updated = store.upsert_products(import_products)
+                except ValueError as e:
+                    st.error(f"❌ {e}")
+                else:
+                    st.success(f"✅ Imported {inserted} new and updated {updated} existing product(s)!")
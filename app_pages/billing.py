@@ -0,0 +1,172 @@
+"""Generate Bill: barcode/typeahead picker, cart, checkout and receipt."""
+import streamlit as st
+
+import core
+from common import format_currency, get_store, location_name, notify
+from receipts import render_html, render_pdf, render_text
+from store import ExpiredProductError, OutOfStockError
+
+
+def add_to_cart(key, quantity):
+    """Add ``quantity`` of a product to the cart if enough stock is left"""
+    cart = st.session_state.cart
+    try:
+        core.add_to_cart(get_store(), cart, key, quantity)
+    except ExpiredProductError as e:
+        notify(f"{e.name} expired on {e.expiry_date} and cannot be sold!", "❌")
+    except OutOfStockError as e:
+        notify(f"Not enough stock! Only {e.available} left, {cart.quantity(key)} already in cart.", "❌")
+    except ValueError as e:
+        notify(f"{e}!", "❌")
+    else:
+        notify(f"Added {quantity} x {get_store().get_product(key)['name']} to cart!")
+
+
+def scan_product():
+    """Add the product whose barcode or ID was scanned/typed, then clear the box for the next scan"""
+    store = get_store()
+    key = store.lookup_product(st.session_state.pos_query)
+    if key is not None:
+        add_to_cart(key, st.session_state.pos_quantity)
+        st.session_state.pos_query = ""
+
+
+def edit_cart(editor_key):
+    """Apply quantity edits made in the cart table (0 removes the line)"""
+    store = get_store()
+    cart = st.session_state.cart
+    keys = cart.keys()
+    for row, changes in st.session_state[editor_key]["edited_rows"].items():
+        if "Quantity" not in changes:
+            continue
+        key = keys[row]
+        quantity = int(changes["Quantity"] or 0)
+        product = store.get_product(key)
+        if product is not None and quantity > product["quantity"]:
+            notify(f"Not enough stock for {product['name']}! Only {product['quantity']} left.", "❌")
+            quantity = product["quantity"]
+        cart.set_quantity(key, quantity)
+
+
+def render():
+    store = get_store()
+    
+    st.markdown("## 💳 Generate Bill")
+    st.caption(f"🏬 {location_name()}")
+    
+    customer_name = st.text_input("Customer Name")
+    
+    st.markdown("### 🛒 Add Items to Cart")
+    
+    # Scanning a barcode (or typing an ID) and pressing Enter adds it straight away;
+    # anything else shows only the top matches from the search index
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        st.text_input(
+            "🔍 Scan Barcode or Search",
+            key="pos_query",
+            on_change=scan_product,
+            placeholder="Scan a barcode, or type a product ID or 3+ letters of a name"
+        )
+    with col2:
+        st.number_input("Quantity", min_value=1, step=1, value=1, key="pos_quantity")
+    
+    if st.session_state.pos_query.strip():
+        suggestions = store.suggest_products(st.session_state.pos_query)
+        if suggestions:
+            product_names = {}
+            for key in suggestions:
+                product = store.get_product(key)
+                product_names[key] = f"{product['name']} ({format_currency(product['price'])}) - Stock: {product['quantity']}"
+                if store.is_expired(key):
+                    product_names[key] += " - ⚠️ EXPIRED"
+            col1, col2 = st.columns([3, 1])
+            with col1:
+                selected_product = st.selectbox("Matching Products", options=suggestions, format_func=lambda x: product_names[x])
+            with col2:
+                st.markdown("<br>", unsafe_allow_html=True)
+                st.button("➕ Add to Cart", use_container_width=True, on_click=add_to_cart,
+                          args=(selected_product, st.session_state.pos_quantity))
+        else:
+            st.caption("No matching products.")
+    
+    # Display cart
+    if st.session_state.cart:
+        st.markdown("### 🛒 Current Cart")
+        
+        # Quantities are edited in place; the table is only rebuilt when the cart changes
+        cart = st.session_state.cart
+        editor_key = f"cart_editor_{cart.version}"
+        st.data_editor(
+            cart.frame(),
+            disabled=["ID", "Product", "Price", "Total"],
+            column_config={
+                "Price": st.column_config.NumberColumn(format="Rs %.2f"),
+                "Quantity": st.column_config.NumberColumn(min_value=0, step=1, help="Set to 0 to remove the line"),
+                "Total": st.column_config.NumberColumn(format="Rs %.2f")
+            },
+            hide_index=True,
+            use_container_width=True,
+            key=editor_key,
+            on_change=edit_cart,
+            args=(editor_key,)
+        )
+        st.caption(f"{len(cart)} line(s), {cart.units} unit(s)")
+        
+        # Discount and tax options
+        col1, col2 = st.columns(2)
+        with col1:
+            discount_percent = st.number_input("Discount (%)", min_value=0.0, max_value=100.0, value=0.0, step=0.5)
+        with col2:
+            tax_percent = st.number_input("Tax/GST (%)", min_value=0.0, max_value=100.0, value=0.0, step=0.5)
+        
+        totals = core.bill_totals(cart, discount_percent, tax_percent)
+        
+        # Display calculation
+        st.markdown("### 💰 Bill Summary")
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown(f"**Subtotal:** {format_currency(totals['subtotal'])}")
+            st.markdown(f"**Discount ({discount_percent}%):** -{format_currency(totals['discount'])}")
+            st.markdown(f"**Tax/GST ({tax_percent}%):** +{format_currency(totals['tax'])}")
+        with col2:
+            st.markdown(f"### **Grand Total:** {format_currency(totals['total'])}")
+        
+        st.markdown("---")
+        
+        col1, col2, col3 = st.columns([2, 2, 2])
+        
+        with col2:
+            st.button("🗑️ Clear Cart", use_container_width=True, on_click=cart.clear)
+        
+        with col3:
+            if st.button("✅ Generate Bill", use_container_width=True):
+                # Reserve stock and save to history in one atomic step
+                try:
+                    sale_id = core.checkout_cart(store, customer_name, cart, discount_percent, tax_percent)
+                except OutOfStockError as e:
+                    st.error(f"❌ Not enough stock for {e.name}! Only {e.available} left, cart needs {e.requested}.")
+                except ExpiredProductError as e:
+                    st.error(f"❌ {e.name} expired on {e.expiry_date}! Remove it from the cart to continue.")
+                except ValueError as e:
+                    st.error(f"❌ {e}!")
+                else:
+                    st.session_state.last_sale_id = sale_id
+                    st.balloons()
+                    cart.clear()
+    
+    # Receipt of the last bill, rendered from the stored sale so it survives reruns (e.g. downloads)
+    if "last_sale_id" in st.session_state:
+        last_sale = store.get_sales([st.session_state.last_sale_id])
+        if last_sale:
+            sale = last_sale[0]
+            st.markdown("---")
+            st.markdown("## 🧾 Bill Receipt")
+            st.markdown(render_html(sale), unsafe_allow_html=True)
+            col1, col2 = st.columns(2)
+            with col1:
+                st.download_button("📄 Download PDF", render_pdf(sale), file_name=f"receipt_{sale['id']}.pdf",
+                                   mime="application/pdf", use_container_width=True)
+            with col2:
+                st.download_button("🖨️ Download Thermal Text", render_text(sale), file_name=f"receipt_{sale['id']}.txt",
+                                   mime="text/plain", use_container_width=True)
@@ -0,0 +1,41 @@
+"""Categories: list categories and add new ones."""
+import streamlit as st
+
+from common import category_options, get_store, notify, show_notices
+
+
+def save_category():
+    """Add the category typed into the Categories page"""
+    store = get_store()
+    if st.session_state.new_category:
+        store.add_category(st.session_state.new_category)
+        notify("Category added!")
+
+
+def render():
+    store = get_store()
+    
+    st.markdown("## 📊 Product Categories")
+    
+    # The list and the form rerun together, without rebuilding the rest of the page
+    @st.fragment
+    def category_manager():
+        show_notices()
+        current_categories = category_options(store.cache_key("categories"))
+        if current_categories:
+            cols = st.columns(3)
+            for idx, category in enumerate(current_categories):
+                with cols[idx % 3]:
+                    st.markdown(f"""
+                    <div style='padding: 1.5rem; border-radius: 10px; background: linear-gradient(135deg, #667eea22 0%, #764ba222 100%); 
+                    text-align: center; margin-bottom: 1rem;'>
+                        <h3>📁 {category}</h3>
+                    </div>
+                    """, unsafe_allow_html=True)
+        
+        st.markdown("---")
+        st.markdown("### ➕ Add New Category")
+        st.text_input("Category Name", key="new_category")
+        st.button("Add Category", use_container_width=True, on_click=save_category)
+    
+    category_manager()
@@ -0,0 +1,254 @@
+"""Dashboard: totals, expiry and low-stock alerts, stock charts and sales trends."""
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+from caching import cached_view
+from common import format_currency, get_store, location_name
+from instrumentation import timer
+from reorder import suggested_order
+from rollups import trend_start
+
+# Expiry alert windows, in days
+EXPIRY_WINDOWS = [7, 30, 90]
+
+# Sales trend periods -> (rollup grain, number of buckets, the current one included)
+TREND_WINDOWS = {
+    "Last 48 hours": ("hour", 48),
+    "Last 30 days": ("day", 30),
+    "Last 12 months": ("month", 12)
+}
+
+
+def expiry_table(ids, limit=100):
+    """First ``limit`` products of ``ids`` with their days until expiry"""
+    store = get_store()
+    rows = store.product_rows(ids[:limit])
+    return pd.DataFrame({
+        "ID": rows["id"],
+        "Name": rows["name"],
+        "Category": rows["category"],
+        "Stock": rows["quantity"],
+        "Expiry Date": rows["expiry_date"].dt.strftime("%Y-%m-%d"),
+        "Days Left": (rows["expiry_date"] - pd.Timestamp(datetime.now().date())).dt.days
+    })
+
+
+def reorder_table(ids, limit=100):
+    """First ``limit`` low-stock products of ``ids`` with their suggested order"""
+    store = get_store()
+    products = [(key, store.get_product(key)) for key in ids[:limit]]
+    return pd.DataFrame({
+        "ID": [key for key, _ in products],
+        "Name": [p["name"] for _, p in products],
+        "Category": [p["category"] for _, p in products],
+        "Stock": [p["quantity"] for _, p in products],
+        "Reorder Level": [p["reorder_level"] for _, p in products],
+        "Order Quantity": [suggested_order(p) for _, p in products],
+        "Order Cost": [format_currency(suggested_order(p) * p["price"]) for _, p in products]
+    })
+
+
+@cached_view
+def category_stock_table(key):
+    """Stock by category from the running aggregates"""
+    store = get_store()
+    return pd.DataFrame([
+        {
+            "Category": name,
+            "Products": totals["skus"],
+            "Units": totals["units"],
+            "Value": format_currency(totals["value"])
+        }
+        for name, totals in sorted(store.get_stats()["categories"].items())
+    ])
+
+
+@cached_view
+def low_stock_view(key, limit=100):
+    """(table of the ``limit`` most urgent low-stock products, purchase order CSV of all of them)"""
+    store = get_store()
+    return reorder_table(store.low_stock(limit)), store.purchase_order()
+
+
+@cached_view
+def finished_trends(key, grain, start, end):
+    """(series, every product's totals best sellers first, category totals) over the buckets ``start``..``end``"""
+    store = get_store()
+    return (
+        store.sales_series(grain, start, end),
+        store.top_products(start, end, limit=None, grain=grain),
+        store.category_sales(start, end, grain=grain)
+    )
+
+
+def _add_totals(rows, current, key):
+    """Copies of ``rows`` with the units and revenue of ``current``'s rows added, matched on ``key``"""
+    totals = {row[key]: dict(row) for row in rows}
+    for row in current:
+        if row[key] in totals:
+            totals[row[key]]["units"] += row["units"]
+            totals[row[key]]["revenue"] += row["revenue"]
+        else:
+            totals[row[key]] = dict(row)
+    return list(totals.values())
+
+
+def sales_trends(grain, buckets, limit=10):
+    """(revenue, top sellers, sales by category) frames for the Dashboard, or None without sales
+
+    Finished buckets are cached until a late sale lands in one (their
+    bill count keys the cache), so a new sale only costs re-reading the
+    current bucket and adding it on.
+    """
+    store = get_store()
+    start, end, current = trend_start(grain, buckets), trend_start(grain, 2), trend_start(grain, 1)
+    key = store.cache_key() + (store.sales_bill_count(grain, start, end),)
+    series, top, categories = finished_trends(key, grain, start, end)
+    series = series + store.sales_series(grain, current)
+    if not series:
+        return None
+    current_top = store.top_products(current, limit=None, grain=grain)
+    # A product outside the finished top limit + len(current_top) is outsold by at least ``limit`` others
+    top = _add_totals(top[:limit + len(current_top)], current_top, "id")
+    top = sorted(top, key=lambda row: row["units"], reverse=True)[:limit]
+    categories = _add_totals(categories, store.category_sales(current, grain=grain), "category")
+    categories = sorted(categories, key=lambda row: row["revenue"], reverse=True)
+    trend_df = pd.DataFrame(series).rename(columns={"bucket": "Period", "revenue": "Revenue", "bills": "Bills"})
+    top_df = pd.DataFrame(top)
+    top_df["revenue"] = top_df["revenue"].map(format_currency)
+    top_df = top_df.rename(columns={"id": "ID", "name": "Product", "category": "Category",
+                                    "units": "Units Sold", "revenue": "Revenue"})
+    return trend_df, top_df, pd.DataFrame(categories)
+
+
+def render():
+    store = get_store()
+    stats = store.get_stats()
+    
+    st.markdown("## 📊 Dashboard Overview")
+    st.caption(f"🏬 {location_name()}")
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric(
+            label="Total Products",
+            value=stats["total_skus"],
+            delta="Active"
+        )
+    
+    with col2:
+        st.metric(
+            label="Total Inventory Value",
+            value=format_currency(stats["stock_value"])
+        )
+    
+    with col3:
+        st.metric(
+            label="Total Stock",
+            value=stats["total_units"]
+        )
+    
+    with col4:
+        st.metric(
+            label="Categories",
+            value=len(store.get_categories())
+        )
+    
+    st.markdown("---")
+    
+    # Expiry alerts: two bisects on the expiry index, then only the matching products are loaded
+    with timer("dashboard.expiry"):
+        st.markdown("### ⏰ Expiry Alerts")
+        expiry_window = st.selectbox("Expiring within", EXPIRY_WINDOWS, index=1, format_func=lambda days: f"{days} days")
+        expired_ids = store.expired_products()
+        expiring_ids = store.expiring_products(expiry_window)
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("Expired Products", len(expired_ids))
+            if expired_ids:
+                st.error("❌ These products are past their expiry date and are blocked at checkout:")
+                st.dataframe(expiry_table(expired_ids), use_container_width=True, hide_index=True)
+        with col2:
+            st.metric(f"Expiring within {expiry_window} days", len(expiring_ids))
+            if expiring_ids:
+                st.warning("⚠️ Sell or clear these soon:")
+                st.dataframe(expiry_table(expiring_ids), use_container_width=True, hide_index=True)
+        if max(len(expired_ids), len(expiring_ids)) > 100:
+            st.caption("Showing the first 100 products of each list, soonest expiry first.")
+    
+    st.markdown("---")
+    
+    # Low stock comes from the reorder queue, which only ever holds the low products
+    with timer("dashboard.low_stock"):
+        st.markdown("### 🔔 Low Stock & Reorder")
+        low_count, stocked_out = store.low_stock_counts()
+        col1, col2 = st.columns(2)
+        col1.metric("At or Below Reorder Level", low_count)
+        col2.metric("Out of Stock", stocked_out)
+        if low_count:
+            low_stock_df, purchase_order = low_stock_view(store.cache_key("products"))
+            st.dataframe(low_stock_df, use_container_width=True, hide_index=True)
+            if low_count > 100:
+                st.caption("Showing the 100 most urgent products (lowest stock relative to reorder level).")
+            st.download_button(
+                "📥 Download Purchase Order (CSV)",
+                purchase_order,
+                file_name=f"purchase_order_{datetime.now().strftime('%Y%m%d')}.csv",
+                mime="text/csv"
+            )
+        else:
+            st.success("✅ No products are at or below their reorder level. Set reorder levels on the Update Stock page.")
+    
+    st.markdown("---")
+    
+    with timer("dashboard.charts"):
+        # Product overview chart
+        col1, col2 = st.columns(2)
+        
+        # Charted straight from the catalogue's own cached frame: no copy, and nothing to re-cache
+        catalogue_df = store.catalogue_frame()
+        
+        with col1:
+            st.markdown("### 📦 Stock Levels")
+            if stats["total_skus"]:
+                st.bar_chart(catalogue_df, x="name", y="quantity", x_label="Product", y_label="Quantity",
+                             use_container_width=True)
+            else:
+                st.info("No products to display")
+        
+        with col2:
+            st.markdown("### 💰 Product Prices")
+            if stats["total_skus"]:
+                st.bar_chart(catalogue_df, x="name", y="price", x_label="Product", y_label="Price",
+                             use_container_width=True)
+            else:
+                st.info("No products to display")
+
+        # Category totals come straight from the running aggregates
+        if stats["categories"]:
+            st.markdown("### 📁 Stock by Category")
+            st.dataframe(category_stock_table(store.cache_key("products")), use_container_width=True, hide_index=True)
+
+    # Sales trends read the precomputed hourly/daily/monthly rollups
+    st.markdown("---")
+    with timer("dashboard.trends"):
+        st.markdown("### 📈 Sales Trends")
+        trend_window = st.selectbox("Period", list(TREND_WINDOWS), index=1)
+        grain, buckets = TREND_WINDOWS[trend_window]
+        trends = sales_trends(grain, buckets)
+        if trends:
+            trend_df, top_df, category_sales_df = trends
+            col1, col2 = st.columns(2)
+            with col1:
+                st.markdown("#### 💰 Revenue")
+                st.line_chart(trend_df, x="Period", y="Revenue", use_container_width=True)
+            with col2:
+                st.markdown("#### 🏆 Top Sellers")
+                st.dataframe(top_df, use_container_width=True, hide_index=True)
+            st.markdown("#### 📁 Sales by Category")
+            st.bar_chart(category_sales_df, x="category", y="revenue", use_container_width=True)
+        else:
+            st.info("No sales in this period yet!")
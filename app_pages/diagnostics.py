@@ -0,0 +1,94 @@
+"""Diagnostics (hidden, ``?page=diagnostics``): section timers, counters, exports and rerun profiles."""
+from datetime import datetime
+
+import streamlit as st
+
+from common import get_store, notify, show_notices
+from instrumentation import METRICS
+
+
+def set_enabled():
+    """Switch instrumentation on or off for the whole process"""
+    METRICS.enabled = st.session_state.instrumentation_on
+    notify(f"Instrumentation {'on' if METRICS.enabled else 'off'}!")
+
+
+def reset_metrics():
+    METRICS.reset()
+    notify("Metrics reset!")
+
+
+def close_page():
+    """Back to the sidebar's page"""
+    del st.query_params["page"]
+
+
+def profile_next():
+    """Ask app.py to profile the next page render of this session"""
+    st.session_state.profile_next = True
+    notify("The next page you open will be profiled!", "📸")
+
+
+def render():
+    store = get_store()
+    
+    st.markdown("## 🩺 Diagnostics")
+    show_notices()
+    st.button("⬅️ Back to App", on_click=close_page)
+    
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        st.toggle("Instrumentation on (all sessions)", value=METRICS.enabled, key="instrumentation_on",
+                  on_change=set_enabled)
+        st.caption("Start the app with STOCK_PROFILE=1 to switch it on from the first rerun.")
+    with col2:
+        st.button("🧹 Reset Metrics", use_container_width=True, on_click=reset_metrics)
+    
+    counters = dict(METRICS.counters)
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Reruns", counters.get("reruns", 0))
+    col2.metric("Catalogue Size", store.get_stats()["total_skus"])
+    col3.metric("Collecting Since", datetime.fromtimestamp(METRICS.started).strftime("%H:%M:%S"))
+    
+    st.markdown("### ⏱️ Timers")
+    rows = METRICS.rows()
+    if rows:
+        st.dataframe(rows, use_container_width=True, hide_index=True)
+    else:
+        st.info("No timings yet. Switch instrumentation on and use the app.")
+    
+    if METRICS.counters or METRICS.gauges:
+        st.markdown("### 🔢 Counters & Gauges")
+        st.dataframe(
+            [{"Name": name, "Kind": "counter", "Value": value} for name, value in sorted(METRICS.counters.items())] +
+            [{"Name": name, "Kind": "gauge", "Value": value} for name, value in sorted(METRICS.gauges.items())],
+            use_container_width=True, hide_index=True
+        )
+    
+    st.markdown("### ✍️ Write-Behind")
+    writer = store.writer
+    if writer is None:
+        st.caption("Off: every checkout is committed before it returns. Start with STOCK_WRITE_BEHIND=1 to queue them.")
+    else:
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Unwritten Bills", writer.unwritten())
+        col2.metric("Bills Written", writer.written)
+        col3.metric("Batches", writer.batches)
+        col4.metric("Refused", len(writer.failures))
+        if writer.failures:
+            st.dataframe(writer.failures, use_container_width=True, hide_index=True)
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button("📥 Prometheus Text", METRICS.prometheus(), file_name="stock_metrics.prom",
+                           mime="text/plain", use_container_width=True)
+    with col2:
+        st.download_button("📥 JSON Lines", METRICS.json_lines(), file_name="stock_metrics.jsonl",
+                           mime="application/x-ndjson", use_container_width=True)
+    
+    st.markdown("### 📸 Rerun Profile")
+    st.button("Profile Next Page", on_click=profile_next)
+    profile = st.session_state.get("last_profile")
+    if profile:
+        st.caption(f"{profile['page']} at {profile['time']}, {profile['seconds'] * 1000:.0f} ms")
+        st.code(profile["text"], language=None)
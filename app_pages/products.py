@@ -0,0 +1,102 @@
+"""Display Products: searchable, sortable, paginated product table and cards."""
+import pandas as pd
+import streamlit as st
+
+from common import category_options, format_currency, get_store, notify
+from pagination import PAGE_SIZES, page_count, paginate
+
+# Sort options for the product table and cards -> catalogue column
+PRODUCT_SORT_COLUMNS = {
+    "ID": "id",
+    "Name": "name",
+    "Price": "price",
+    "Quantity": "quantity",
+    "Expiry Date": "expiry_date",
+    "Category": "category"
+}
+
+
+def remove_product(key):
+    """Delete a product from its card on the Display Products page"""
+    store = get_store()
+    product = store.get_product(key)
+    if product is not None:
+        store.delete_product(key)
+        notify(f"Deleted {product['name']}!", "🗑️")
+
+
+def render():
+    store = get_store()
+    stats = store.get_stats()
+    
+    st.markdown("## 📦 Available Products")
+    
+    # Search and filter options
+    col1, col2, col3 = st.columns([2, 2, 1])
+    with col1:
+        search_term = st.text_input("🔍 Search Products", placeholder="Enter product name, ID or barcode...")
+    with col2:
+        category_filter = st.selectbox("Filter by Category", ["All"] + category_options(store.cache_key("categories")))
+    with col3:
+        st.markdown("<br>", unsafe_allow_html=True)
+        if st.button("🔄 Refresh", use_container_width=True):
+            st.rerun()
+    
+    # Sorting and page size
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        sort_by = st.selectbox("Sort by", list(PRODUCT_SORT_COLUMNS))
+    with col2:
+        sort_desc = st.selectbox("Order", ["Ascending", "Descending"]) == "Descending"
+    with col3:
+        page_size = st.selectbox("Products per page", PAGE_SIZES, index=1)
+    
+    if stats["total_skus"]:
+        # Filter through the shared search index, then sort on the columnar catalogue
+        matching_ids = store.search_products(search_term, None if category_filter == "All" else category_filter)
+        matching_ids = store.sort_products(matching_ids, PRODUCT_SORT_COLUMNS[sort_by], sort_desc)
+        
+        if matching_ids:
+            # Only the visible page is formatted and rendered
+            pages = page_count(len(matching_ids), page_size)
+            page_number = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, step=1, value=1)
+            page_ids, page_number, pages = paginate(matching_ids, page_number, page_size)
+            st.caption(f"Showing {len(page_ids)} of {len(matching_ids)} product(s) - page {page_number} of {pages}")
+            page_df = store.product_rows(page_ids)
+            
+            df = pd.DataFrame({
+                "ID": page_df["id"],
+                "Name": page_df["name"],
+                "Price": page_df["price"].map(format_currency),
+                "Quantity": page_df["quantity"],
+                "Category": page_df["category"],
+                "Expiry Date": page_df["expiry_date"].dt.strftime("%Y-%m-%d"),
+                "Barcode": page_df["barcode"].fillna("")
+            })
+            
+            st.dataframe(df, use_container_width=True, hide_index=True)
+            
+            # Product cards
+            st.markdown("### Product Cards")
+            cols = st.columns(3)
+            filtered_products = {key: store.get_product(key) for key in page_ids}
+            for idx, (key, product) in enumerate(filtered_products.items()):
+                with cols[idx % 3]:
+                    with st.container():
+                        stock_color = "#28a745" if product['quantity'] > 20 else "#ffc107" if product['quantity'] > 5 else "#dc3545"
+                        st.markdown(f"""
+                        <div style='padding: 1rem; border-radius: 10px; background: linear-gradient(135deg, #667eea22 0%, #764ba222 100%); margin-bottom: 1rem;'>
+                            <h3>🏷️ {product['name']}</h3>
+                            <p><strong>Price:</strong> {format_currency(product['price'])}</p>
+                            <p><strong>Stock:</strong> <span style='color: {stock_color}; font-weight: bold;'>{product['quantity']} units</span></p>
+                            <p><strong>Category:</strong> {product.get('category', 'N/A')}</p>
+                            <p><strong>Expiry:</strong> {product['expiry_date']}</p>
+                        </div>
+                        """, unsafe_allow_html=True)
+                        
+                        # Delete button
+                        st.button(f"🗑️ Delete", key=f"del_{key}", use_container_width=True, on_click=remove_product, args=(key,))
+        else:
+            st.warning("No products match your search criteria!")
+    else:
+        st.info("No products available. Add some products to get started!")
@@ -0,0 +1,143 @@
+"""Sales History: search, receipts, day reprints and export."""
+import os
+from datetime import datetime
+from functools import partial
+
+import streamlit as st
+
+from caching import cached_view
+from common import format_currency, get_store, location_name
+from export import EXPORT_FORMATS, export_sales, parquet_available
+from pagination import PAGE_SIZES, page_count, paginate
+from receipts import RECEIPT_FORMATS, render_batch, render_html, render_pdf, render_text
+
+# Sort options -> SalesIndex order
+SALE_SORT_ORDERS = {
+    "Newest First": "newest",
+    "Oldest First": "oldest",
+    "Highest Amount": "highest",
+    "Lowest Amount": "lowest"
+}
+
+
+def sales_export(store, fmt, start, end):
+    """Deferred download: runs on Streamlit's download thread when the button is clicked, not in the script run"""
+    path = export_sales(store, fmt, start, end)
+    try:
+        with open(path, "rb") as fileobj:
+            return fileobj.read()
+    finally:
+        os.remove(path)
+
+
+@cached_view(max_entries=4)
+def day_receipts(key, day, fmt):
+    """(number of sales, receipts document) for one day's sales"""
+    store = get_store()
+    day_ids = store.query_sales(order="oldest", start=str(day), end=str(day))
+    return len(day_ids), render_batch(store.get_sales(day_ids), fmt) if day_ids else None
+
+
+def render():
+    store = get_store()
+    
+    st.markdown("## 📈 Sales History")
+    st.caption(f"🏬 {location_name()}")
+    
+    summary = store.sales_summary()
+    if summary["count"]:
+        # Summary metrics
+        total_sales = summary["total"]
+        total_transactions = summary["count"]
+        avg_sale = total_sales / total_transactions if total_transactions > 0 else 0
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Total Sales", format_currency(total_sales))
+        with col2:
+            st.metric("Total Transactions", total_transactions)
+        with col3:
+            st.metric("Average Sale", format_currency(avg_sale))
+        
+        st.markdown("---")
+        
+        # Search and filter
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            search_customer = st.text_input("🔍 Search by Customer Name")
+        with col2:
+            sort_order = st.selectbox("Sort by", list(SALE_SORT_ORDERS))
+        with col3:
+            history_range = st.date_input("Date range", value=(), key="history_range")
+        
+        # Filter and sort through the shared sales index
+        start_date, end_date = (history_range + (None, None))[:2] if history_range else (None, None)
+        filtered_ids = store.query_sales(search_customer, SALE_SORT_ORDERS[sort_order], start_date, end_date or start_date)
+        
+        st.markdown(f"### Showing {len(filtered_ids)} transaction(s)")
+        
+        if filtered_ids:
+            col1, col2 = st.columns(2)
+            with col1:
+                sales_page_size = st.selectbox("Sales per page", PAGE_SIZES, index=1)
+            pages = page_count(len(filtered_ids), sales_page_size)
+            with col2:
+                sales_page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, step=1, value=1)
+            page_ids, sales_page, pages = paginate(filtered_ids, sales_page, sales_page_size)
+        else:
+            page_ids = []
+        
+        for sale in store.get_sales(page_ids):
+            with st.expander(f"🧾 Sale #{sale['id']} - {sale['customer']} - {format_currency(sale['total'])} - {sale['date']}"):
+                st.markdown(render_html(sale), unsafe_allow_html=True)
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.download_button("📄 Reprint PDF", render_pdf(sale), file_name=f"receipt_{sale['id']}.pdf",
+                                       mime="application/pdf", key=f"pdf_{sale['id']}", use_container_width=True)
+                with col2:
+                    st.download_button("🖨️ Reprint Thermal Text", render_text(sale), file_name=f"receipt_{sale['id']}.txt",
+                                       mime="text/plain", key=f"txt_{sale['id']}", use_container_width=True)
+        
+        # Reprint every receipt of one day as a single document
+        st.markdown("---")
+        st.markdown("### 🖨️ Reprint a Day's Receipts")
+        col1, col2 = st.columns(2)
+        with col1:
+            reprint_day = st.date_input("Day", value=datetime.now().date(), key="reprint_day")
+        with col2:
+            reprint_format = st.selectbox("Receipt format", list(RECEIPT_FORMATS))
+        if st.button(f"🖨️ Reprint Receipts ({reprint_format})", use_container_width=True):
+            day_count, day_document = day_receipts(store.cache_key("sales"), reprint_day, reprint_format)
+            if day_count:
+                extension, mime = RECEIPT_FORMATS[reprint_format]
+                st.download_button(
+                    label=f"⬇️ Download {day_count} Receipt(s)",
+                    data=day_document,
+                    file_name=f"receipts_{reprint_day}.{extension}",
+                    mime=mime,
+                    use_container_width=True
+                )
+            else:
+                st.info("No sales on that day.")
+        
+        # Export option
+        st.markdown("---")
+        st.markdown("### 📥 Export Sales Data")
+        export_formats = [fmt for fmt in EXPORT_FORMATS if fmt != "Parquet" or parquet_available()]
+        col1, col2 = st.columns(2)
+        with col1:
+            export_format = st.selectbox("Format", export_formats)
+        with col2:
+            export_range = st.date_input("Date range (optional)", value=())
+        start_date, end_date = (export_range + (None, None))[:2] if export_range else (None, None)
+        extension, mime = EXPORT_FORMATS[export_format]
+        # The export only runs when the button is clicked (a callable is a deferred download, Streamlit 1.52+)
+        st.download_button(
+            label=f"📥 Export Sales Data ({export_format})",
+            data=partial(sales_export, store, export_format, start_date, end_date or start_date),
+            file_name=f"sales_history_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}",
+            mime=mime,
+            use_container_width=True
+        )
+    else:
+        st.info("No sales history available yet!")
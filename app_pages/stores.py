@@ -0,0 +1,103 @@
+"""Stores: totals across every location, stock transfers between them and new locations."""
+import pandas as pd
+import streamlit as st
+
+from common import format_currency, get_locations, notify, pick_product, show_notices
+from locations import MAIN
+from rollups import trend_start
+
+
+def send_transfer():
+    """Move the units picked in the transfer form"""
+    state = st.session_state
+    if state.get("transfer_query_pick") is None:
+        notify("Pick a product to transfer!", "❌")
+        return
+    try:
+        transfer_id = get_locations().transfer(state.transfer_query_pick, state.transfer_quantity,
+                                               state.transfer_from, state.transfer_to)
+    except ValueError as e:
+        notify(f"{e}!", "❌")
+    else:
+        notify(f"Transfer #{transfer_id} done!")
+
+
+def save_location():
+    """Add the location typed into the Stores page"""
+    state = st.session_state
+    try:
+        get_locations().add_location(state.new_location,
+                                     state.location if state.copy_catalogue else None)
+    except ValueError as e:
+        notify(f"{e}!", "❌")
+    else:
+        notify(f"{state.new_location.strip()} added!")
+        state.new_location = ""
+
+
+def render():
+    locations = get_locations()
+    names = locations.names()
+    
+    st.markdown("## 🏬 Stores")
+    show_notices()
+    
+    # Every figure comes from the totals each store keeps current, not from scanning its products or sales
+    rollup = locations.rollup()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Locations", len(rollup))
+    col2.metric("Units, All Stores", sum(row["units"] for row in rollup))
+    col3.metric("Stock Value, All Stores", format_currency(sum(row["stock_value"] for row in rollup)))
+    col4.metric("Revenue, All Stores", format_currency(sum(row["revenue"] for row in rollup)))
+    
+    st.dataframe(pd.DataFrame({
+        "Store": [row["name"] for row in rollup],
+        "Products": [row["products"] for row in rollup],
+        "Units": [row["units"] for row in rollup],
+        "Stock Value": [format_currency(row["stock_value"]) for row in rollup],
+        "Low Stock": [row["low_stock"] for row in rollup],
+        "Out of Stock": [row["stocked_out"] for row in rollup],
+        "Sales": [row["sales"] for row in rollup],
+        "Revenue": [format_currency(row["revenue"]) for row in rollup]
+    }), use_container_width=True, hide_index=True)
+    
+    series = locations.sales_series("day", trend_start("day", 30))
+    if series:
+        st.markdown("### 💰 Revenue by Store, Last 30 Days")
+        trend = pd.DataFrame(series).pivot_table(index="bucket", columns="location", values="revenue", fill_value=0)
+        st.line_chart(trend, use_container_width=True)
+    
+    st.markdown("---")
+    st.markdown("### 🚚 Transfer Stock")
+    if len(names) < 2:
+        st.info("Add a second location below to move stock between stores.")
+    else:
+        col1, col2 = st.columns(2)
+        source = col1.selectbox("From", list(names), format_func=names.get, key="transfer_from",
+                                index=list(names).index(st.session_state.get("location", MAIN)))
+        col2.selectbox("To", [key for key in names if key != source], format_func=names.get, key="transfer_to")
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            pick_product("🔍 Product", "transfer_query", locations.store(source))
+        col2.number_input("Quantity", min_value=1, step=1, key="transfer_quantity")
+        st.button("🚚 Send Stock", use_container_width=True, on_click=send_transfer)
+    
+    transfers = locations.transfers(limit=20)
+    if transfers:
+        st.markdown("#### Recent Transfers")
+        st.dataframe(pd.DataFrame({
+            "Transfer": [f"#{t['id']}" for t in transfers],
+            "Date": [t["date"] for t in transfers],
+            "Product": [t["product_id"] for t in transfers],
+            "Units": [t["quantity"] for t in transfers],
+            "From": [names[t["source"]] for t in transfers],
+            "To": [names[t["destination"]] for t in transfers],
+            "Status": [t["status"].title() for t in transfers]
+        }), use_container_width=True, hide_index=True)
+    
+    st.markdown("---")
+    st.markdown("### ➕ Add Location")
+    st.text_input("Location Name", key="new_location")
+    st.checkbox(f"Copy the products of {names[st.session_state.get('location', MAIN)]} (at zero stock)",
+                value=True, key="copy_catalogue")
+    st.button("Add Location", use_container_width=True, on_click=save_location)
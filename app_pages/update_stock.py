@@ -0,0 +1,224 @@
+"""Update Stock: single adjustments, stock-takes and stock history."""
+from datetime import datetime, time, timedelta
+
+import pandas as pd
+import streamlit as st
+
+import core
+from caching import cached_view
+from common import category_options, format_currency, get_store, notify, pick_product, show_notices
+from importer import count_template_csv, read_counts
+from reorder import is_low
+
+
+@cached_view
+def count_sheet(key):
+    """Stock-take count sheet CSV of every product"""
+    store = get_store()
+    return count_template_csv(store.get_products())
+
+
+def change_stock(key, sign, quantity_key):
+    """Add (sign=1) or remove (sign=-1) the quantity entered in ``quantity_key``"""
+    quantity = st.session_state[quantity_key]
+    try:
+        core.adjust_stock(get_store(), key, sign * quantity)
+    except ValueError as e:
+        notify(f"{e}!", "❌")
+    else:
+        notify(f"{'Added' if sign > 0 else 'Removed'} {quantity} units!")
+
+
+def save_reorder_point(key):
+    """Save the reorder level and quantity entered on the Update Stock page"""
+    store = get_store()
+    store.set_reorder_points({
+        key: (st.session_state[f"reorder_level_{key}"], st.session_state[f"reorder_quantity_{key}"])
+    })
+    notify("Reorder point saved!")
+
+
+def render():
+    store = get_store()
+    
+    st.markdown("## 🔄 Update Product Stock")
+    
+    # An adjustment reruns only this section: one store call and a small redraw
+    @st.fragment
+    def update_stock_form():
+        show_notices()
+        if store.get_stats()["total_skus"]:
+            selected = pick_product("🔍 Find Product", "stock_query")
+            product = None if selected is None else store.get_product(selected)
+            
+            if product:
+                current_qty = product["quantity"]
+                st.info(f"Current Stock: {current_qty} units")
+                if is_low(product):
+                    st.warning(f"⚠️ At or below its reorder level of {product['reorder_level']} units")
+                
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    st.number_input("Quantity to Add", min_value=0, step=1, key="add_qty")
+                    st.button("➕ Add Stock", use_container_width=True, on_click=change_stock, args=(selected, 1, "add_qty"))
+                
+                with col2:
+                    st.number_input("Quantity to Remove", min_value=0, step=1, key="remove_qty")
+                    st.button("➖ Remove Stock", use_container_width=True, on_click=change_stock, args=(selected, -1, "remove_qty"))
+                
+                # Keyed per product so switching products shows that product's values
+                with st.expander("🔔 Reorder Point"):
+                    col1, col2 = st.columns(2)
+                    col1.number_input("Reorder Level", min_value=0, step=1, value=product["reorder_level"],
+                                      key=f"reorder_level_{selected}", help="Reorder when stock falls to this many units (0 = never)")
+                    col2.number_input("Reorder Quantity", min_value=0, step=1, value=product["reorder_quantity"],
+                                      key=f"reorder_quantity_{selected}", help="Units to order at a time")
+                    st.button("💾 Save Reorder Point", use_container_width=True, on_click=save_reorder_point, args=(selected,))
+        else:
+            st.info("No products available!")
+    
+    mode = st.radio("Mode", ["Single Product", "Stock-Take", "Stock History"], horizontal=True, label_visibility="collapsed")
+    
+    if mode == "Single Product":
+        update_stock_form()
+    elif mode == "Stock-Take":
+        # Stock-take: counted quantities for many products, applied in one transaction
+        st.caption("Enter counted quantities in the grid or upload a count sheet. "
+                   "Every difference is applied in one go and written to the stock audit log.")
+        source = st.radio("Counts from", ["Grid", "Count Sheet"], horizontal=True)
+        counts = None
+        
+        if source == "Grid":
+            take_category = st.selectbox("Category to Count", ["All"] + category_options(store.cache_key("categories")))
+            frame = store.catalogue_frame()
+            if take_category != "All":
+                frame = frame[frame["category"] == take_category]
+            grid = pd.DataFrame({
+                "ID": frame["id"],
+                "Name": frame["name"],
+                "Category": frame["category"],
+                "On Record": frame["quantity"],
+                "Counted": frame["quantity"]
+            })
+            edited = st.data_editor(
+                grid,
+                disabled=["ID", "Name", "Category", "On Record"],
+                column_config={"Counted": st.column_config.NumberColumn(min_value=0, step=1, required=True)},
+                hide_index=True,
+                use_container_width=True,
+                key=f"stocktake_grid_{take_category}"
+            )
+            # Only edited lines are applied, so sales made while counting are not undone
+            changed = edited[edited["Counted"] != edited["On Record"]]
+            st.caption(f"{len(changed)} of {len(edited)} line(s) differ from the stock on record")
+            if len(changed) and st.button(f"✅ Apply {len(changed)} Count(s)", use_container_width=True):
+                counts = dict(zip(changed["ID"].astype(int), changed["Counted"].astype(int)))
+        else:
+            st.download_button(
+                "📄 Download Count Sheet",
+                count_sheet(store.cache_key("products")),
+                file_name="stock_take_count_sheet.csv",
+                mime="text/csv"
+            )
+            count_upload = st.file_uploader("Upload count sheet (id or barcode, counted)", type=["csv", "xlsx"])
+            if count_upload is not None:
+                try:
+                    sheet_counts, count_errors = read_counts(
+                        count_upload.getvalue(), count_upload.name, store.get_products().keys(), store.get_barcodes()
+                    )
+                except ValueError as e:
+                    st.error(f"❌ {e}")
+                else:
+                    if len(count_errors):
+                        st.warning(f"⚠️ {count_errors['Row'].nunique()} row(s) with errors are skipped:")
+                        st.dataframe(count_errors, use_container_width=True, hide_index=True)
+                    if sheet_counts and st.button(f"✅ Apply {len(sheet_counts)} Count(s)", use_container_width=True):
+                        counts = sheet_counts
+        
+        if counts:
+            try:
+                report = store.apply_counts(counts, reference=f"Stock-take {datetime.now().strftime('%Y-%m-%d %H:%M')}")
+            except ValueError as e:
+                st.error(f"❌ {e}")
+            else:
+                st.session_state.stocktake_report = pd.DataFrame(report)
+                st.toast(f"Stock-take applied to {len(report)} product(s)!", icon="✅")
+        
+        # Variance report of the last stock-take in this session
+        if "stocktake_report" in st.session_state:
+            report_df = st.session_state.stocktake_report
+            variances = report_df[report_df["variance"] != 0]
+            st.markdown("### 📊 Variance Report")
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("Lines Counted", len(report_df))
+            col2.metric("Lines with Variance", len(variances))
+            col3.metric("Net Units", int(report_df["variance"].sum()))
+            col4.metric("Net Value", format_currency(report_df["value"].sum()))
+            if len(variances):
+                st.dataframe(pd.DataFrame({
+                    "ID": variances["id"],
+                    "Name": variances["name"],
+                    "Category": variances["category"],
+                    "On Record": variances["expected"],
+                    "Counted": variances["counted"],
+                    "Variance": variances["variance"],
+                    "Value": variances["value"].map(format_currency)
+                }), use_container_width=True, hide_index=True)
+            st.download_button(
+                "📥 Download Variance Report",
+                report_df.to_csv(index=False),
+                file_name=f"variance_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                mime="text/csv"
+            )
+        
+    else:
+        # Point-in-time stock, rebuilt from the nearest ledger snapshot
+        st.markdown("### 🕰️ Stock on a Past Date")
+        col1, col2 = st.columns(2)
+        with col1:
+            as_of_day = st.date_input("Date", value=datetime.now().date(), key="stock_as_of_day")
+        with col2:
+            as_of_time = st.time_input("Time", value=time(23, 59), key="stock_as_of_time")
+        try:
+            past_stock = store.stock_at(f"{as_of_day} {as_of_time.strftime('%H:%M')}:59")
+        except ValueError as e:
+            st.warning(f"⚠️ {e}")
+        else:
+            current = store.get_products()
+            keys = sorted(key for key in past_stock.keys() | current.keys() if past_stock.get(key) or key in current)
+            if keys:
+                st.dataframe(pd.DataFrame({
+                    "ID": keys,
+                    "Name": [current[key]["name"] if key in current else "(deleted)" for key in keys],
+                    "Stock Then": [past_stock.get(key, 0) for key in keys],
+                    "Stock Now": [current[key]["quantity"] if key in current else 0 for key in keys]
+                }), use_container_width=True, hide_index=True)
+            else:
+                st.info("No stock on record at that time.")
+        
+        # Ledger entries, optionally for one product
+        st.markdown("### 🧾 Stock Movements")
+        history_product = pick_product("🔍 Product (leave empty for all products)", "history_query")
+        # A search with no match lists nothing rather than every product's movements
+        searched = st.session_state.history_query.strip()
+        recent = [] if searched and history_product is None else store.stock_movements(limit=100, product_id=history_product)
+        if recent:
+            st.dataframe(pd.DataFrame({
+                "Date": [m["date"] for m in recent],
+                "ID": [m["product_id"] for m in recent],
+                "Kind": [m["kind"].title() for m in recent],
+                "Change": [m["delta"] for m in recent],
+                "New Quantity": [m["quantity"] for m in recent],
+                "Reference": [m["reference"] or "" for m in recent]
+            }), use_container_width=True, hide_index=True)
+        else:
+            st.info("No stock movements recorded yet.")
+        
+        # Compaction folds old movements into a snapshot
+        with st.expander("🗜️ Compact Ledger"):
+            keep_days = st.number_input("Keep movements from the last N days", min_value=1, step=1, value=365)
+            if st.button("Compact Now", use_container_width=True):
+                cutoff = (datetime.now() - timedelta(days=keep_days)).strftime("%Y-%m-%d %H:%M:%S")
+                removed = store.compact_ledger(cutoff)
+                st.success(f"✅ Folded {removed} movement(s) older than {cutoff[:10]} into a snapshot!")
@@ -0,0 +1,133 @@
+"""Requests and bills per second through the JSON API (api.py), single vs batched checkout.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_api --clients 16 --bills 2000 --batch 50
+
+The API is started with uvicorn on a free local port against a temporary
+database, then ``--clients`` threads post ``--bills`` random 3-line bills:
+
+* single - one POST /checkout per bill;
+* batch - POST /checkout/batch with ``--batch`` bills per request;
+* reads - GET /products/{id}, to show the per-request overhead.
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+
+PRODUCTS = 1000
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def seed(path):
+    from store import InventoryStore
+
+    store = InventoryStore(path)
+    store.upsert_products({
+        key: {"name": f"Product {key}", "price": 10.0, "quantity": 10 ** 7, "expiry_date": "2030-01-01",
+              "category": "Bench", "barcode": None}
+        for key in range(1, PRODUCTS + 1)
+    })
+    store.close()
+
+
+def call(base, path, body=None):
+    data = None if body is None else json.dumps(body).encode()
+    request = urllib.request.Request(base + path, data=data, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+
+def bill(rng, n):
+    return {"customer": f"Till {n}", "lines": [{"id": key, "quantity": 1}
+                                               for key in rng.sample(range(1, PRODUCTS + 1), 3)]}
+
+
+def run_clients(clients, work):
+    threads = [threading.Thread(target=work, args=(n,)) for n in range(clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - start
+
+
+def report(label, requests, bills, elapsed):
+    print(f"  {label:8} {requests:6} requests in {elapsed:6.2f}s = {requests / elapsed:7,.0f} req/s"
+          + (f", {bills / elapsed:7,.0f} bills/s" if bills else ""))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=16, help="concurrent client threads")
+    parser.add_argument("--bills", type=int, default=2000, help="bills per scenario")
+    parser.add_argument("--batch", type=int, default=50, help="bills per batch request")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    server = None
+    try:
+        path = os.path.join(directory, "bench.db")
+        seed(path)
+        server = subprocess.Popen([sys.executable, "-m", "api", "--port", str(port)],
+                                  env=dict(os.environ, STOCK_DB_PATH=path))
+        for _ in range(100):
+            try:
+                call(base, "/health")
+                break
+            except OSError:
+                time.sleep(0.1)
+
+        per_client = args.bills // args.clients
+        print(f"{args.clients} clients, {per_client * args.clients} bills per scenario:")
+
+        def single(n):
+            rng = random.Random(n)
+            for _ in range(per_client):
+                call(base, "/checkout", bill(rng, n))
+
+        report("single", per_client * args.clients, per_client * args.clients, run_clients(args.clients, single))
+
+        requests = max(1, per_client // args.batch)
+
+        def batch(n):
+            rng = random.Random(n)
+            for _ in range(requests):
+                results = call(base, "/checkout/batch", {"bills": [bill(rng, n) for _ in range(args.batch)]})
+                assert all("sale_id" in result for result in results["results"]), results
+
+        report("batch", requests * args.clients, requests * args.clients * args.batch,
+               run_clients(args.clients, batch))
+
+        def reads(n):
+            rng = random.Random(n)
+            for _ in range(per_client):
+                call(base, f"/products/{rng.randint(1, PRODUCTS)}")
+
+        report("reads", per_client * args.clients, 0, run_clients(args.clients, reads))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
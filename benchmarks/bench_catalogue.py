@@ -0,0 +1,93 @@
+"""Memory and latency of the dict-of-dicts product layout vs the columnar Catalogue.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_catalogue --sizes 100000 1000000
+
+For each catalogue size this reports the memory held by each layout and
+the time of the operations the pages perform: dashboard totals, a
+category filter, sorting by price and building the chart DataFrame.
+"""
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+
+import pandas as pd
+
+from catalogue import Catalogue
+
+CATEGORIES = ["Grocery", "Cosmetics", "Dairy", "Bakery", "Beverages", "Household", "Snacks", "Frozen"]
+
+
+def make_products(count, seed=0):
+    rng = random.Random(seed)
+    return {
+        key: {
+            "name": f"Product {key}",
+            "price": round(rng.uniform(5, 5000), 2),
+            "quantity": rng.randint(0, 500),
+            "expiry_date": f"20{rng.randint(25, 30)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "category": rng.choice(CATEGORIES),
+            "barcode": None
+        }
+        for key in range(1, count + 1)
+    }
+
+
+def measure_memory(build):
+    gc.collect()
+    tracemalloc.start()
+    obj = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return obj, size
+
+
+def timed(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def bench(size):
+    products, dict_bytes = measure_memory(lambda: make_products(size))
+    catalogue, columnar_bytes = measure_memory(lambda: Catalogue(products))
+    ids = list(products)
+
+    rows = [
+        ("totals",
+         lambda: (sum(p["quantity"] for p in products.values()),
+                  sum(p["price"] * p["quantity"] for p in products.values())),
+         catalogue.totals),
+        ("category filter",
+         lambda: [k for k, p in products.items() if p["category"] == "Dairy"],
+         lambda: catalogue.in_category("Dairy")),
+        ("sort by price",
+         lambda: sorted(ids, key=lambda k: products[k]["price"]),
+         lambda: catalogue.sort(ids, "price")),
+        ("chart DataFrame",
+         lambda: pd.DataFrame([{"Product": p["name"], "Quantity": p["quantity"]} for p in products.values()]),
+         lambda: catalogue._take(slice(0, catalogue.size))[["name", "quantity"]]),
+    ]
+
+    print(f"\n{size:,} products")
+    print(f"  memory           dict {dict_bytes / 2**20:8.1f} MiB   columnar {columnar_bytes / 2**20:8.1f} MiB")
+    for label, dict_fn, columnar_fn in rows:
+        print(f"  {label:<16} dict {timed(dict_fn):8.1f} ms    columnar {timed(columnar_fn):8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = parser.parse_args()
+    for size in args.sizes:
+        bench(size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Concurrent checkout throughput for InventoryStore.checkout.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_checkout --tills 20 --bills 200
+
+Two scenarios are measured against a fresh temporary database:
+
+* throughput - every till checks out random 3-line carts from a large
+  catalogue with plenty of stock;
+* last units - every till races for the same low-stock product, which
+  checks that stock never goes negative and exactly the available units
+  are sold.
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+
+from store import InventoryStore, OutOfStockError
+
+
+def make_store(directory, products, stock):
+    store = InventoryStore(os.path.join(directory, "bench.db"), pool_size=4)
+    # Replaces the seed products too, whose expiry dates are in the past
+    store.upsert_products({
+        key: {"name": f"Product {key}", "price": 10.0, "quantity": stock,
+              "expiry_date": "2030-01-01", "category": "Bench", "barcode": None}
+        for key in range(1, products + 1)
+    })
+    return store
+
+
+def run_tills(tills, work):
+    threads = [threading.Thread(target=work, args=(n,)) for n in range(tills)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - start
+
+
+def bench_throughput(store, tills, bills, products):
+    def work(n):
+        rng = random.Random(n)
+        for _ in range(bills):
+            items = [
+                {"key": key, "name": f"Product {key}", "price": 10.0, "quantity": 1, "total": 10.0}
+                for key in rng.sample(range(1, products + 1), 3)
+            ]
+            store.checkout(f"Till {n}", items, 30.0, 0, 0, 30.0, "2030-01-01 00:00:00")
+
+    elapsed = run_tills(tills, work)
+    total = tills * bills
+    print(f"throughput: {total} bills from {tills} tills in {elapsed:.2f}s "
+          f"= {total / elapsed:,.0f} checkouts/s")
+
+
+def bench_last_units(store, tills, units):
+    store.adjust_stock(1, units - store.get_product(1)["quantity"])
+    sold = []
+    rejected = []
+
+    def work(n):
+        item = {"key": 1, "name": "Product 1", "price": 10.0, "quantity": 1, "total": 10.0}
+        for _ in range(units):
+            try:
+                store.checkout(f"Till {n}", [item], 10.0, 0, 0, 10.0, "2030-01-01 00:00:00")
+                sold.append(n)
+            except OutOfStockError:
+                rejected.append(n)
+
+    elapsed = run_tills(tills, work)
+    remaining = store.get_product(1)["quantity"]
+    print(f"last units: {units} units, {len(sold)} sold, {len(rejected)} rejected, "
+          f"{remaining} left in {elapsed:.2f}s")
+    assert len(sold) == units and remaining == 0, "oversold or undersold!"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tills", type=int, default=20, help="concurrent checkout threads")
+    parser.add_argument("--bills", type=int, default=100, help="bills per till")
+    parser.add_argument("--products", type=int, default=1000, help="catalogue size")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    try:
+        store = make_store(directory, args.products, args.tills * args.bills * 3)
+        bench_throughput(store, args.tills, args.bills, args.products)
+        bench_last_units(store, args.tills, args.tills * 5)
+        store.close()
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
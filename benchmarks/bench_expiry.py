@@ -0,0 +1,75 @@
+"""Expiry queries: ExpiryIndex vs a scan of every product's expiry date.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_expiry --sizes 10000 100000 1000000
+
+For each size an ExpiryIndex is built over synthetic products with
+expiry dates spread over a few years, then "expired", "expiring within
+30 days" and single-product checks are timed against parsing and
+filtering the whole catalogue, which is what each rerun would cost
+without the index.
+"""
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+from expiry import ExpiryIndex, parse_expiry
+
+TODAY = date(2026, 6, 1)
+
+
+def make_products(count, seed=0):
+    rng = random.Random(seed)
+    start = TODAY - timedelta(days=365)
+    return {
+        key: {"expiry_date": (start + timedelta(days=rng.randint(0, 4 * 365))).isoformat()}
+        for key in range(1, count + 1)
+    }
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def bench(size, rng):
+    products = make_products(size)
+    start = time.perf_counter()
+    index = ExpiryIndex(products)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    today = TODAY.toordinal()
+    expired_ms, expired = timed(lambda: index.expired(TODAY), 20)
+    expiring_ms, expiring = timed(lambda: index.expiring(TODAY, 30), 20)
+    scan_ms, scanned = timed(
+        lambda: [key for key, p in products.items() if (parse_expiry(p["expiry_date"]) or today) < today], 1
+    )
+    assert sorted(scanned) == sorted(expired), "index and scan disagree"
+
+    keys = [rng.randint(1, size) for _ in range(10000)]
+    start = time.perf_counter()
+    for key in keys:
+        index.is_expired(key, TODAY)
+    check_us = (time.perf_counter() - start) / len(keys) * 1e6
+
+    print(f"{size:>10,} products: build {build_ms:8.1f} ms  expired ({len(expired):,}) {expired_ms:7.2f} ms  "
+          f"expiring 30d ({len(expiring):,}) {expiring_ms:6.3f} ms  check {check_us:5.2f} us  "
+          f"(full scan {scan_ms:8.1f} ms)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    for size in args.sizes:
+        bench(size, rng)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Rows-per-second of the bulk product import (read, validate, upsert).
+
+Run from the repository root:
+
+    python -m benchmarks.bench_import --rows 50000
+
+A synthetic supplier sheet is generated as CSV with a sprinkling of bad
+rows (negative prices, bad dates, duplicate IDs), then each stage of the
+import pipeline is timed against a fresh temporary database.
+"""
+import argparse
+import io
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from importer import read_upload, validate
+from store import InventoryStore
+
+
+def make_sheet(rows, seed=0):
+    rng = random.Random(seed)
+    out = io.StringIO()
+    out.write("id,name,price,quantity,expiry_date,category,barcode\n")
+    for n in range(rows):
+        key = "" if n % 2 else str(1000 + n)
+        price = f"{rng.uniform(1, 999):.2f}"
+        expiry = f"20{rng.randint(26, 30)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+        if n % 997 == 0:
+            price = "-5"
+        if n % 1009 == 0:
+            expiry = "31/02/2027"
+        if n % 1013 == 0 and key:
+            key = "1000"
+        out.write(f"{key},Item {n},{price},{rng.randint(0, 500)},{expiry},Cat {n % 40},{8900000000000 + n}\n")
+    return out.getvalue().encode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50_000)
+    args = parser.parse_args()
+
+    sheet = make_sheet(args.rows)
+    directory = tempfile.mkdtemp()
+    try:
+        store = InventoryStore(os.path.join(directory, "bench.db"))
+
+        start = time.perf_counter()
+        df = read_upload(sheet, "sheet.csv")
+        read_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        products, errors = validate(df, store.next_product_id(), store.get_barcodes())
+        validate_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        inserted, updated = store.upsert_products(products)
+        upsert_time = time.perf_counter() - start
+
+        total = read_time + validate_time + upsert_time
+        print(f"{args.rows:,} rows: {len(products):,} valid, {errors['Row'].nunique():,} rejected, "
+              f"{inserted:,} inserted, {updated:,} updated")
+        for label, seconds in [("read", read_time), ("validate", validate_time),
+                               ("upsert", upsert_time), ("total", total)]:
+            print(f"  {label:<9} {seconds:7.2f}s  {args.rows / seconds:>12,.0f} rows/s")
+        store.close()
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
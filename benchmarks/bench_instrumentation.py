@@ -0,0 +1,80 @@
+"""Cost of the instrumentation layer (instrumentation.py) when switched off and on.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_instrumentation --calls 1000000
+
+Reports nanoseconds per call of an empty function, bare and behind
+``@timed``, and of an empty ``with timer(...)`` block, with
+instrumentation off and on; then the time of a Display Products data
+path (search, sort, one page of rows) on a 100k product catalogue, off
+and on.
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks import synthetic
+from instrumentation import METRICS, timed, timer
+from store import InventoryStore
+
+
+def per_call_ns(fn, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls * 1e9
+
+
+def empty():
+    pass
+
+
+@timed("bench.empty")
+def timed_empty():
+    pass
+
+
+def timer_block():
+    with timer("bench.block"):
+        pass
+
+
+def products_page(store):
+    store.product_rows(store.sort_products(store.search_products("tea"), "price")[:50])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=1000000, help="calls per micro-benchmark")
+    parser.add_argument("--pages", type=int, default=200, help="products page renders per run")
+    args = parser.parse_args()
+
+    print(f"per call (mean of {args.calls:,}):")
+    bare = per_call_ns(empty, args.calls)
+    print(f"  {'plain function':22} {bare:8.0f} ns")
+    for enabled in (False, True):
+        METRICS.enabled = enabled
+        state = "on" if enabled else "off"
+        print(f"  {'@timed, ' + state:22} {per_call_ns(timed_empty, args.calls):8.0f} ns")
+        print(f"  {'with timer(), ' + state:22} {per_call_ns(timer_block, args.calls):8.0f} ns")
+
+    directory = tempfile.mkdtemp()
+    try:
+        store = InventoryStore(os.path.join(directory, "bench.db"))
+        store.upsert_products(synthetic.products(100000))
+        print(f"products page, 100k products (mean of {args.pages}):")
+        for enabled in (False, True, False, True):
+            METRICS.enabled = enabled
+            ms = per_call_ns(lambda: products_page(store), args.pages) / 1e6
+            print(f"  instrumentation {'on ' if enabled else 'off'}   {ms:8.3f} ms")
+        store.close()
+    finally:
+        METRICS.enabled = False
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Partitioned stores: cross-store rollups, tills spread over locations, and transfers.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_locations --locations 4 --products 100000 --tills 8 --bills 300
+
+Builds ``--locations`` stores with ``--products`` products each, then
+reports:
+
+* rollup - ``Locations.rollup()`` (each store's running totals) against
+  adding up every product of every store, the way a single flat
+  catalogue would have to;
+* checkout - ``--tills`` tills checking out 3-line carts, first all at
+  the main store, then spread over every location. Each store has its
+  own lock and database file, but in one process the GIL still caps the
+  total, so expect about the same figure: partitioning keeps a store's
+  checkouts off the others' data, it does not add CPU;
+* transfer - transfers per second between two locations.
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from benchmarks import synthetic
+from benchmarks.bench_checkout import run_tills
+from locations import MAIN, Locations
+
+
+def mean_ms(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def full_scan(locations):
+    """Stock units and value of every location, from every product"""
+    totals = []
+    for location_id in locations.names():
+        products = locations.store(location_id).get_products().values()
+        totals.append((sum(p["quantity"] for p in products), sum(p["quantity"] * p["price"] for p in products)))
+    return totals
+
+
+def bench_checkout(locations, tills, bills, keys, spread):
+    ids = list(locations.names())
+
+    def work(n):
+        store = locations.store(ids[n % len(ids)] if spread else MAIN)
+        rng = random.Random(n)
+        for _ in range(bills):
+            items = [
+                {"key": key, "name": store.get_product(key)["name"], "price": 10.0, "quantity": 1, "total": 10.0}
+                for key in rng.sample(keys, 3)
+            ]
+            store.checkout(f"Till {n}", items, 30.0, 0, 0, 30.0, "2030-01-01 00:00:00")
+
+    elapsed = run_tills(tills, work)
+    where = f"spread over {len(ids)} stores" if spread else "all at one store"
+    print(f"  {tills} tills {where:22} {tills * bills / elapsed:8,.0f} checkouts/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--locations", type=int, default=4, help="stores, the main one included")
+    parser.add_argument("--products", type=int, default=100000, help="products per store")
+    parser.add_argument("--tills", type=int, default=8, help="concurrent checkout threads")
+    parser.add_argument("--bills", type=int, default=300, help="bills per till")
+    parser.add_argument("--transfers", type=int, default=500, help="transfers to time")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    try:
+        locations = Locations(os.path.join(directory, "bench.db"))
+        catalogue = synthetic.products(args.products)
+        # Plenty of stock and no expiry, so every bill goes through
+        catalogue = {key: dict(p, quantity=10 ** 6, expiry_date="2030-01-01") for key, p in catalogue.items()}
+        start = time.perf_counter()
+        for n in range(2, args.locations + 1):
+            locations.add_location(f"Branch {n}")
+        for location_id in locations.names():
+            locations.store(location_id).upsert_products(catalogue)
+        print(f"{args.locations} stores x {args.products:,} products built in {time.perf_counter() - start:.1f}s")
+
+        print("rollup:")
+        print(f"  {'Locations.rollup()':28} {mean_ms(locations.rollup, 100):10.3f} ms")
+        print(f"  {'scan of every product':28} {mean_ms(lambda: full_scan(locations), 3):10.3f} ms")
+
+        print("checkout:")
+        keys = list(catalogue)
+        for spread in (False, True):
+            bench_checkout(locations, args.tills, args.bills, keys, spread)
+
+        print("transfer:")
+        branch = list(locations.names())[1] if args.locations > 1 else None
+        if branch is not None:
+            rng = random.Random(0)
+            start = time.perf_counter()
+            for _ in range(args.transfers):
+                locations.transfer(rng.choice(keys), 1, MAIN, branch)
+            elapsed = time.perf_counter() - start
+            print(f"  {args.transfers} transfers in {elapsed:.2f}s = {args.transfers / elapsed:,.0f}/s")
+        locations.close()
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Time to first render and per-rerun CPU of every app page, measured with AppTest.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_pages --products 2000 --reruns 10
+
+A temporary database is seeded with ``--products`` products and a few
+hundred sales, then:
+
+* time to first render - for each page a fresh Python process imports
+  Streamlit and opens the page through its ``?page=`` link; the import
+  time, the first script run and whether pandas had to be loaded are
+  reported;
+* per-rerun CPU - one process opens each page and reruns it ``--reruns``
+  times; mean CPU (process) time and wall time per rerun are reported.
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from app_pages import PAGES
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+# Run in a fresh interpreter for each page: prints import seconds, first run seconds, pandas loaded
+COLD_RUN = """
+import sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+imported = time.perf_counter()
+at = AppTest.from_file(sys.argv[1], default_timeout=300)
+at.query_params["page"] = sys.argv[2]
+at.run()
+assert not at.exception, at.exception
+print(imported - start, time.perf_counter() - imported, "pandas" in sys.modules)
+"""
+
+
+def seed(path, products, sales=300):
+    # Imported here so store.DEFAULT_DB_PATH picks up STOCK_DB_PATH, set by main() first
+    from store import InventoryStore
+
+    store = InventoryStore(path)
+    store.upsert_products({
+        key: {"name": f"Product {key}", "price": 10.0, "quantity": 1000, "expiry_date": "2030-01-01",
+              "category": f"Cat {key % 20}", "reorder_level": 5 if key % 50 == 0 else 0}
+        for key in range(1, products + 1)
+    })
+    date = time.strftime("%Y-%m-%d %H:%M:%S")
+    for n in range(sales):
+        key = n % products + 1
+        store.checkout(f"Customer {n % 30}", [{"key": key, "name": f"Product {key}", "price": 10.0, "quantity": 1,
+                                                "total": 10.0}], 10.0, 0, 0, 10.0, date)
+    store.close()
+
+
+def cold(env):
+    print("time to first render (fresh process per page):")
+    for label, module in PAGES.items():
+        out = subprocess.run(
+            [sys.executable, "-c", COLD_RUN, APP, module],
+            env=env, capture_output=True, text=True, check=True
+        ).stdout.split()
+        imported, first_run, pandas = float(out[-3]), float(out[-2]), out[-1] == "True"
+        print(f"  {label:20} import {imported:5.2f}s  first run {first_run:5.2f}s  "
+              f"total {imported + first_run:5.2f}s  pandas {'loaded' if pandas else 'not loaded'}")
+
+
+def rerun_times(reruns):
+    """Yield ``(page module, cpu ms, wall ms)`` per rerun of every page, opened in one AppTest session"""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP, default_timeout=300).run()
+    for label, module in PAGES.items():
+        at.sidebar.radio[0].set_value(label).run()
+        cpu, wall = time.process_time(), time.perf_counter()
+        for _ in range(reruns):
+            at.run()
+        assert not at.exception, at.exception
+        yield module, (time.process_time() - cpu) / reruns * 1000, (time.perf_counter() - wall) / reruns * 1000
+
+
+def warm(reruns):
+    print(f"per rerun (mean of {reruns}):")
+    for module, cpu, wall in rerun_times(reruns):
+        print(f"  {module:20} cpu {cpu:7.1f} ms  wall {wall:7.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--products", type=int, default=2000, help="catalogue size")
+    parser.add_argument("--reruns", type=int, default=10, help="reruns per page")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.environ["STOCK_DB_PATH"] = os.path.join(directory, "bench.db")
+        seed(path, args.products)
+        cold(dict(os.environ))
+        warm(args.reruns)
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
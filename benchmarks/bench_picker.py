@@ -0,0 +1,70 @@
+"""Billing picker latency: barcode scans and typeahead suggestions vs catalogue size.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_picker --sizes 10000 100000 1000000
+
+For each size a SearchIndex is built over synthetic products with
+realistic names and barcodes, then random barcode scans and 3-5 letter
+typeahead terms are timed. The old picker formatted every product into
+selectbox options on each rerun; that cost is shown for comparison.
+"""
+import argparse
+import random
+import time
+
+from search import SearchIndex
+
+WORDS = ["soap", "oil", "shampoo", "biscuit", "rice", "sugar", "salt", "tea", "coffee", "milk",
+         "butter", "bread", "juice", "paste", "powder", "noodles", "chips", "jam", "honey", "flour"]
+BRANDS = ["Amul", "Tata", "Dabur", "Parle", "Nestle", "Surf", "Lux", "Vim", "Haldiram", "Britannia"]
+
+
+def make_products(count, seed=0):
+    rng = random.Random(seed)
+    return {
+        key: {
+            "name": f"{rng.choice(BRANDS)} {rng.choice(WORDS)} {rng.randint(50, 999)}g",
+            "price": round(rng.uniform(5, 500), 2),
+            "quantity": rng.randint(0, 500),
+            "category": "Grocery",
+            "barcode": str(8900000000000 + key)
+        }
+        for key in range(1, count + 1)
+    }
+
+
+def per_call(fn, args):
+    start = time.perf_counter()
+    for arg in args:
+        fn(arg)
+    return (time.perf_counter() - start) / len(args) * 1e6
+
+
+def bench(size, rng):
+    products = make_products(size)
+    index = SearchIndex(products)
+    scans = [str(8900000000000 + rng.randint(1, size)) for _ in range(2000)]
+    terms = [rng.choice(WORDS + BRANDS).lower()[:rng.randint(3, 5)] for _ in range(200)]
+
+    scan_us = per_call(index.lookup, scans)
+    suggest_us = per_call(lambda term: index.suggest(term, 10), terms)
+    start = time.perf_counter()
+    {key: f"{p['name']} (Rs {p['price']:,.2f}) - Stock: {p['quantity']}" for key, p in products.items()}
+    options_ms = (time.perf_counter() - start) * 1000
+    print(f"{size:>10,} products: scan {scan_us:6.2f} us  typeahead top-10 {suggest_us / 1000:7.2f} ms  "
+          f"(all-options selectbox {options_ms:8.1f} ms)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    for size in args.sizes:
+        bench(size, rng)
+
+
+if __name__ == "__main__":
+    main()
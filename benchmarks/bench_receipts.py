@@ -0,0 +1,65 @@
+"""Receipt rendering throughput for a day's batch reprint.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_receipts --sales 5000 --lines 8
+
+A temporary database is filled with one day of sales, then each format
+is timed end to end (loading the day's sales with their items and
+rendering one batch document) and reported in receipts per second.
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from receipts import RECEIPT_FORMATS, render_batch
+from store import InventoryStore
+
+
+def fill(store, sales, lines, day, seed=0):
+    rng = random.Random(seed)
+    store.upsert_products({
+        key: {"name": f"Product {key}", "price": round(rng.uniform(5, 500), 2), "quantity": sales * lines,
+              "expiry_date": "2030-01-01", "category": "Bench", "barcode": None}
+        for key in range(1, 201)
+    })
+    for n in range(sales):
+        items = []
+        for key in rng.sample(range(1, 201), lines):
+            price = store.get_product(key)["price"]
+            quantity = rng.randint(1, 4)
+            items.append({"key": key, "name": f"Product {key}", "price": price, "quantity": quantity,
+                          "total": price * quantity})
+        subtotal = sum(item["total"] for item in items)
+        date = f"{day} {n * 86399 // sales // 3600:02d}:{n % 60:02d}:00"
+        store.checkout(f"Customer {n % 500}", items, subtotal, 0, subtotal * 0.18, subtotal * 1.18, date)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sales", type=int, default=5000)
+    parser.add_argument("--lines", type=int, default=8)
+    args = parser.parse_args()
+
+    day = "2026-01-15"
+    directory = tempfile.mkdtemp()
+    try:
+        store = InventoryStore(os.path.join(directory, "bench.db"))
+        fill(store, args.sales, args.lines, day)
+        for fmt in RECEIPT_FORMATS:
+            start = time.perf_counter()
+            ids = store.query_sales(order="oldest", start=day, end=day)
+            document = render_batch(store.get_sales(ids), fmt)
+            elapsed = time.perf_counter() - start
+            print(f"{fmt:<8} {len(ids):,} receipts in {elapsed:5.2f}s = {len(ids) / elapsed:8,.0f} receipts/s "
+                  f"({len(document) / 1e6:.1f} MB)")
+        store.close()
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Low-stock list: ReorderQueue vs a scan of every product, as stock changes.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_reorder --sizes 10000 100000 1000000
+
+For each size a ReorderQueue is built over synthetic products with
+reorder levels, then random stock changes are applied through
+``update(key, old, new)`` (as checkout and Update Stock do) and the 100
+most urgent products are listed. Finding them by scanning and sorting
+the whole catalogue is shown for comparison.
+"""
+import argparse
+import random
+import time
+
+from reorder import ReorderQueue, is_low
+
+
+def make_products(count, rng):
+    return {
+        key: {"quantity": rng.randint(0, 200), "reorder_level": rng.randint(0, 40), "reorder_quantity": 50}
+        for key in range(1, count + 1)
+    }
+
+
+def bench(size, rng):
+    products = make_products(size, rng)
+    start = time.perf_counter()
+    queue = ReorderQueue(products)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    changes = 10000
+    start = time.perf_counter()
+    for _ in range(changes):
+        key = rng.randint(1, size)
+        old = products[key]
+        new = products[key] = dict(old, quantity=max(old["quantity"] + rng.randint(-5, 5), 0))
+        queue.update(key, old, new)
+    update_us = (time.perf_counter() - start) / changes * 1e6
+
+    start = time.perf_counter()
+    top = queue.items(100)
+    top_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    scanned = sorted((p["quantity"] / p["reorder_level"], key) for key, p in products.items() if is_low(p))
+    scan_ms = (time.perf_counter() - start) * 1000
+    assert [key for _, key in scanned[:100]] == top, "queue and scan disagree"
+
+    print(f"{size:>10,} products ({len(queue):,} low): build {build_ms:8.1f} ms  update {update_us:5.2f} us  "
+          f"top-100 {top_ms:6.3f} ms  (full scan {scan_ms:8.1f} ms)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    for size in args.sizes:
+        bench(size, rng)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Stock-take scaling: InventoryStore.apply_counts at growing batch sizes.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_stocktake --sizes 1000 10000 100000
+
+For each size a fresh temporary database is filled with that many
+products, then every product is counted with a random variance and the
+whole batch applied in one transaction. Time per line should stay flat
+as the batch grows.
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from store import InventoryStore
+
+
+def run(size, seed=0):
+    rng = random.Random(seed)
+    directory = tempfile.mkdtemp()
+    try:
+        store = InventoryStore(os.path.join(directory, "bench.db"))
+        store.upsert_products({
+            key: {"name": f"Product {key}", "price": 10.0, "quantity": 100,
+                  "expiry_date": "2030-01-01", "category": f"Cat {key % 20}", "barcode": None}
+            for key in range(1, size + 1)
+        })
+        counts = {key: 100 + rng.randint(-5, 5) for key in range(1, size + 1)}
+
+        start = time.perf_counter()
+        report = store.apply_counts(counts, reference="bench")
+        elapsed = time.perf_counter() - start
+
+        changed = sum(1 for line in report if line["variance"])
+        logged = len(store.stock_movements(limit=size + 1))
+        assert logged == changed, (logged, changed)
+        store.close()
+        return elapsed, changed
+    finally:
+        shutil.rmtree(directory)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        elapsed, changed = run(size)
+        print(f"{size:>8,} lines ({changed:,} changed): {elapsed:6.2f}s  "
+              f"{elapsed / size * 1e6:6.1f} us/line  {size / elapsed:>10,.0f} lines/s")
+
+
+if __name__ == "__main__":
+    main()
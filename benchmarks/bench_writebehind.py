@@ -0,0 +1,140 @@
+"""Checkout latency with and without write-behind, loss after a crash, and startup with the sales index snapshot.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_writebehind --tills 8 --bills 500 --pause 0.005 --sales 200000
+
+Three measurements, each on a fresh temporary database:
+
+* latency - every till checks out random 3-line carts, first with each
+  bill committed before checkout returns, then with write-behind; prints
+  p50/p99/max checkout latency, throughput and how long closing the
+  store took to write what was still queued. Tills pause ``--pause``
+  seconds between bills, then run flat out: once they offer more bills
+  than the disk can take, write-behind tills wait for room in the queue;
+* crash - a child process checks out bills with write-behind on and is
+  killed with ``os._exit`` mid-stream; counts the accepted bills missing
+  from the database after reopening it;
+* startup - opens a database holding ``--sales`` sales with the sales
+  index rebuilt from every row, then again from the snapshot that
+  ``close`` left behind.
+"""
+import argparse
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import writebehind
+from benchmarks import synthetic
+from benchmarks.bench_checkout import make_store, run_tills
+from store import InventoryStore
+
+CRASH_CHILD = """
+import os, random, sys
+from store import InventoryStore
+store = InventoryStore(sys.argv[1], pool_size=4, write_behind=True)
+rng = random.Random(0)
+for n in range(int(sys.argv[2])):
+    key = rng.randint(1, 1000)
+    item = {"key": key, "name": f"Product {key}", "price": 10.0, "quantity": 1, "total": 10.0}
+    print(store.checkout("Till", [item], 10.0, 0, 0, 10.0, "2030-01-01 00:00:00"), flush=True)
+os._exit(1)
+"""
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def bench_latency(directory, tills, bills, products, pause, write_behind):
+    store = make_store(directory, products, tills * bills)
+    if write_behind:
+        store.close()
+        store = InventoryStore(os.path.join(directory, "bench.db"), pool_size=4, write_behind=True)
+    latencies = []
+
+    def work(n):
+        rng = random.Random(n)
+        for _ in range(bills):
+            items = [
+                {"key": key, "name": f"Product {key}", "price": 10.0, "quantity": 1, "total": 10.0}
+                for key in rng.sample(range(1, products + 1), 3)
+            ]
+            start = time.perf_counter()
+            store.checkout(f"Till {n}", items, 30.0, 0, 0, 30.0, "2030-01-01 00:00:00")
+            latencies.append(time.perf_counter() - start)
+            if pause:
+                time.sleep(pause)
+
+    elapsed = run_tills(tills, work)
+    start = time.perf_counter()
+    store.close()
+    closing = time.perf_counter() - start
+    latencies.sort()
+    label = f"{'write-behind' if write_behind else 'synchronous'}, {f'{pause * 1000:g} ms pause' if pause else 'flat out'}"
+    print(f"  {label:28} p50 {percentile(latencies, 0.5) * 1000:6.2f} ms   "
+          f"p99 {percentile(latencies, 0.99) * 1000:6.2f} ms   max {latencies[-1] * 1000:7.2f} ms   "
+          f"{len(latencies) / elapsed:7,.0f} bills/s   close {closing * 1000:6.1f} ms")
+
+
+def bench_crash(directory, bills):
+    path = os.path.join(directory, "crash.db")
+    make_store(directory, 1000, bills).close()
+    shutil.move(os.path.join(directory, "bench.db"), path)
+    child = subprocess.run([sys.executable, "-c", CRASH_CHILD, path, str(bills)],
+                           capture_output=True, text=True, cwd=os.getcwd())
+    accepted = [int(line) for line in child.stdout.split()]
+    store = InventoryStore(path)
+    written = store.sales_index.count
+    mismatches = store.ledger_mismatches()
+    store.close()
+    print(f"  {len(accepted):,} bills accepted, {written:,} on disk after the crash, "
+          f"{len(accepted) - written:,} lost (bound: {writebehind.MAX_PENDING:,} bills); "
+          f"ledger mismatches: {len(mismatches)}")
+
+
+def bench_startup(directory, sales):
+    path = os.path.join(directory, "startup.db")
+    synthetic.build(path, 10000, sales).close()
+    for label in ("rebuilt from every sale", "from the snapshot"):
+        if label.startswith("rebuilt") and os.path.exists(writebehind.index_path(path)):
+            os.remove(writebehind.index_path(path))
+        start = time.perf_counter()
+        store = InventoryStore(path)
+        elapsed = time.perf_counter() - start
+        store.close()
+        print(f"  {sales:,} sales, index {label:24} {elapsed * 1000:8.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tills", type=int, default=8, help="concurrent checkout threads")
+    parser.add_argument("--bills", type=int, default=500, help="bills per till")
+    parser.add_argument("--products", type=int, default=5000, help="catalogue size")
+    parser.add_argument("--pause", type=float, default=0.005, help="seconds each till waits between bills")
+    parser.add_argument("--crash-bills", type=int, default=20000, help="bills the crashing child checks out")
+    parser.add_argument("--sales", type=int, default=200000, help="sales in the startup database")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    try:
+        print(f"latency, {args.tills} tills x {args.bills} bills:")
+        for pause in (args.pause, 0):
+            for write_behind in (False, True):
+                bench_latency(directory, args.tills, args.bills, args.products, pause, write_behind)
+                for name in os.listdir(directory):
+                    os.remove(os.path.join(directory, name))
+        print("crash:")
+        bench_crash(directory, args.crash_bills)
+        print("startup:")
+        bench_startup(directory, args.sales)
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""Benchmark suite: every page's data path, checkout throughput and an AppTest rerun load test on synthetic stores.
+
+Run from the repository root:
+
+    python -m benchmarks.suite --products 10000 100000 --bills 100000 --record
+    python -m benchmarks.suite --products 10000 100000 1000000 --bills 1000000 --cache-dir .bench-data --record
+    python -m benchmarks.suite --compare benchmarks/results/<earlier run>.json
+
+For each catalogue size a database is built with benchmarks.synthetic
+(``--bills`` bills over the last year; ``--cache-dir`` keeps it for the
+next run, as a million bills take minutes to load), then:
+
+* data paths - the store calls each page makes on a rerun, best of
+  ``--repeat`` runs, plus opening the store (loading every index);
+* checkout - single bills and batches of 500 through checkout_many;
+* reruns - unless ``--no-apptest``, every page is opened with AppTest and
+  rerun ``--reruns`` times in a fresh process.
+
+Every figure is milliseconds (checkout: per bill), so lower is better.
+``--record`` saves them under benchmarks/results/ with the commit and
+machine; ``--compare`` prints the ratio to an earlier file and flags
+anything more than ``--threshold`` times (and 0.5 ms) slower.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+from benchmarks import synthetic
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+# Run in a fresh interpreter on the built database: prints [[page, cpu ms, wall ms], ...]
+RERUNS = """
+import json, sys
+from benchmarks.bench_pages import rerun_times
+print(json.dumps(list(rerun_times(int(sys.argv[1])))))
+"""
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def data_paths(store, repeat):
+    """``{name: ms}`` for the store calls behind each page, on a read-only store"""
+    from export import write_csv
+    from pagination import paginate
+
+    today = date.today()
+    yesterday = str(today - timedelta(days=1))
+    month_ago = str(today - timedelta(days=30))
+    all_ids = store.search_products()
+    busiest = store.query_sales(order="highest")[0]
+    customer = store.get_sales([busiest])[0]["customer"]
+    barcode = store.get_product(all_ids[len(all_ids) // 2])["barcode"]
+
+    def page(ids):
+        return store.product_rows(paginate(ids, 1, 50)[0])
+
+    paths = {
+        "dashboard.stats": store.get_stats,
+        "dashboard.expiry": lambda: (store.expired_products(), store.expiring_products(30)),
+        "dashboard.low_stock": lambda: (store.low_stock_counts(), store.low_stock(100), store.purchase_order()),
+        "dashboard.charts": store.catalogue_frame,
+        "dashboard.trends": lambda: (store.sales_series("day", month_ago), store.top_products(month_ago),
+                                     store.category_sales(month_ago)),
+        "products.all_by_price": lambda: page(store.sort_products(store.search_products(), "price", True)),
+        "products.search": lambda: page(store.sort_products(store.search_products("tea"), "name")),
+        "products.category": lambda: page(store.sort_products(store.search_products("", "Dairy"), "quantity")),
+        "billing.suggest": lambda: (store.suggest_products("cre"), store.suggest_products("golden mil")),
+        "billing.scan": lambda: store.lookup_product(barcode),
+        "categories.list": lambda: sorted(store.get_categories()),
+        "history.newest": lambda: store.get_sales(paginate(store.query_sales(), 1, 20)[0]),
+        "history.customer": lambda: store.get_sales(paginate(store.query_sales(customer, "highest"), 1, 20)[0]),
+        "history.one_day": lambda: store.get_sales(store.query_sales(order="oldest", start=yesterday, end=yesterday)),
+        "history.export_csv": lambda: write_csv(store, io.BytesIO()),
+    }
+    return {name: timed(fn, 1 if name == "history.export_csv" else repeat) for name, fn in paths.items()}
+
+
+def checkout(store, count=500, batch=500):
+    """``{name: ms per bill}`` for single checkouts and one checkout_many batch of new bills"""
+    from store import ExpiredProductError, OutOfStockError
+
+    catalogue = store.get_products()
+    fresh = list(synthetic.bills(catalogue, count + batch, seed=99, days=1))
+    results = {}
+    start = time.perf_counter()
+    for bill in fresh[:count]:
+        try:
+            store.checkout(**bill)
+        except (OutOfStockError, ExpiredProductError):
+            # Out of stock bills still did the work of finding out
+            pass
+    results["checkout.single"] = (time.perf_counter() - start) * 1000 / count
+    start = time.perf_counter()
+    store.checkout_many(fresh[count:])
+    results["checkout.batch"] = (time.perf_counter() - start) * 1000 / batch
+    return results
+
+
+def reruns(path, count):
+    """``{name: ms}`` of CPU per rerun of every page, from AppTest in a fresh process"""
+    try:
+        out = subprocess.run(
+            [sys.executable, "-c", RERUNS, str(count)],
+            env=dict(os.environ, STOCK_DB_PATH=path), cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout
+    except subprocess.CalledProcessError as e:
+        # e.g. killed for running out of memory on a huge catalogue: report it and keep the other figures
+        print(f"  AppTest reruns failed ({e}); skipped")
+        return {}
+    return {f"rerun.{page}": cpu for page, cpu, wall in json.loads(out.splitlines()[-1])}
+
+
+def run(size, bills, args, directory):
+    from store import InventoryStore
+
+    print(f"\n{size:,} products, {bills:,} bills")
+    start = time.perf_counter()
+    path = synthetic.cached_build(directory, size, bills)
+    print(f"  database ready in {time.perf_counter() - start:.1f}s")
+
+    results = {}
+    start = time.perf_counter()
+    store = InventoryStore(path)
+    results["store.open"] = (time.perf_counter() - start) * 1000
+    results.update(data_paths(store, args.repeat))
+    # Dropped before AppTest loads a second copy of every index in its own process
+    store.close()
+    store = None
+    if not args.no_apptest:
+        results.update(reruns(path, args.reruns))
+    # Checkout writes, so it runs last and on a copy when the database is cached for later runs
+    scratch = os.path.join(tempfile.mkdtemp(), "checkout.db")
+    shutil.copy(path, scratch)
+    store = InventoryStore(scratch)
+    try:
+        results.update(checkout(store))
+    finally:
+        store.close()
+        shutil.rmtree(os.path.dirname(scratch))
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def show(results, baseline, threshold):
+    """Print every figure, with its ratio to ``baseline`` when given; returns the number of regressions"""
+    regressions = 0
+    for size, figures in results.items():
+        before = (baseline or {}).get(size, {})
+        print(f"\n{int(size):,} products")
+        for name, ms in figures.items():
+            line = f"  {name:24} {ms:10.2f} ms"
+            if name.startswith("checkout."):
+                line += f"  ({1000 / ms:,.0f} bills/s)"
+            if name in before:
+                ratio = ms / before[name] if before[name] else 1
+                line += f"  x{ratio:.2f} vs baseline"
+                # Sub-millisecond figures jitter by more than any threshold
+                if ratio > threshold and ms - before[name] > 0.5:
+                    line += "  SLOWER"
+                    regressions += 1
+            print(line)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--products", type=int, nargs="+", default=[10000, 100000], help="catalogue sizes")
+    parser.add_argument("--bills", type=int, default=100000, help="sales history size")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per data path (best is kept)")
+    parser.add_argument("--reruns", type=int, default=5, help="AppTest reruns per page")
+    parser.add_argument("--no-apptest", action="store_true", help="skip the AppTest rerun load test")
+    parser.add_argument("--cache-dir", help="keep built databases here for later runs")
+    parser.add_argument("--record", action="store_true", help="save results under benchmarks/results/")
+    parser.add_argument("--compare", help="results file to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="slowdown ratio flagged as a regression")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+
+    directory = args.cache_dir or tempfile.mkdtemp()
+    os.makedirs(directory, exist_ok=True)
+    try:
+        results = {str(size): run(size, args.bills, args, directory) for size in args.products}
+    finally:
+        if not args.cache_dir:
+            shutil.rmtree(directory)
+
+    regressions = show(results, baseline, args.threshold)
+    if args.record:
+        commit = git_commit()
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"{datetime.now():%Y%m%d-%H%M%S}-{commit}.json")
+        with open(path, "w") as f:
+            json.dump({
+                "commit": commit,
+                "date": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "machine": f"{platform.system()} {platform.machine()}, {os.cpu_count()} CPUs",
+                "bills": args.bills,
+                "results": results
+            }, f, indent=2)
+        print(f"\nrecorded {os.path.relpath(path, ROOT)}")
+    if regressions:
+        print(f"\n{regressions} figure(s) more than {args.threshold}x slower than the baseline")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
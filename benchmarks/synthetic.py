@@ -0,0 +1,107 @@
+"""Reproducible synthetic catalogues and sales histories for the benchmarks.
+
+The same ``seed`` always gives the same products and bills, so results from
+different commits are comparable. Bills only sell products that have not
+expired on the sale date, and each product starts with its total demand
+plus 0-500 units, so after the history is loaded the stock, low-stock and
+expiry views look like a real shop's rather than all-zero or all-full.
+"""
+import os
+import random
+from datetime import date, datetime, timedelta
+
+CATEGORIES = ["Grocery", "Cosmetics", "Dairy", "Bakery", "Beverages", "Household", "Snacks", "Frozen",
+              "Produce", "Pharmacy", "Stationery", "Pet Care"]
+WORDS = ["Fresh", "Classic", "Organic", "Premium", "Family", "Mini", "Extra", "Golden", "Daily", "Royal",
+         "Crunchy", "Soft", "Herbal", "Spicy", "Sweet", "Lite"]
+ITEMS = ["Soap", "Oil", "Shampoo", "Biscuit", "Rice", "Tea", "Coffee", "Milk", "Bread", "Juice", "Chips",
+         "Paste", "Noodles", "Butter", "Cheese", "Sugar", "Salt", "Flour", "Cream", "Lotion"]
+
+
+def products(count, seed=0, today=None):
+    """``{id: product}`` for ``count`` products; about 3% expired and 5% with a reorder point"""
+    rng = random.Random(seed)
+    today = today or date.today()
+    catalogue = {}
+    for key in range(1, count + 1):
+        expired = rng.random() < 0.03
+        expiry = today + timedelta(days=rng.randint(-60, -1) if expired else rng.randint(1, 1000))
+        reorder_level = rng.randint(10, 200) if rng.random() < 0.05 else 0
+        catalogue[key] = {
+            "name": f"{rng.choice(WORDS)} {rng.choice(ITEMS)} {key}",
+            "price": round(rng.uniform(5, 2000), 2),
+            "quantity": rng.randint(0, 500),
+            "expiry_date": expiry.isoformat(),
+            "category": rng.choice(CATEGORIES),
+            "barcode": f"890{key:010d}",
+            "reorder_level": reorder_level,
+            "reorder_quantity": reorder_level * 2
+        }
+    return catalogue
+
+
+def bills(catalogue, count, seed=0, days=365, customers=5000, today=None):
+    """Yield ``count`` bills (InventoryStore.checkout keyword arguments) spread over the last ``days`` days, oldest first.
+
+    Product popularity is skewed (a few sell far more than the rest), bills
+    have 1-6 lines and some carry a discount or tax.
+    """
+    rng = random.Random(seed + 1)
+    today = today or date.today()
+    start = datetime.combine(today - timedelta(days=days), datetime.min.time())
+    step = days * 86400 / max(count, 1)
+    keys = list(catalogue)
+    expiry = {key: product["expiry_date"] for key, product in catalogue.items()}
+    for n in range(count):
+        when = (start + timedelta(seconds=n * step)).strftime("%Y-%m-%d %H:%M:%S")
+        lines = {}
+        for _ in range(rng.randint(1, 6)):
+            # Squaring the uniform draw favours low IDs: a long-tail popularity curve
+            key = keys[int(rng.random() ** 2 * len(keys))]
+            if expiry[key] >= when[:10]:
+                lines[key] = lines.get(key, 0) + rng.randint(1, 3)
+        if not lines:
+            continue
+        items = [
+            {"key": key, "name": catalogue[key]["name"], "price": catalogue[key]["price"], "quantity": quantity,
+             "total": round(catalogue[key]["price"] * quantity, 2)}
+            for key, quantity in lines.items()
+        ]
+        subtotal = round(sum(item["total"] for item in items), 2)
+        discount = round(subtotal * rng.choice((0, 0, 0, 5, 10)) / 100, 2)
+        tax = round((subtotal - discount) * rng.choice((0, 5, 12, 18)) / 100, 2)
+        yield {"customer": f"Customer {int(rng.random() ** 3 * customers)}", "items": items,
+               "subtotal": subtotal, "discount": discount, "tax": tax,
+               "total": round(subtotal - discount + tax, 2), "date": when}
+
+
+def build(path, product_count, bill_count, seed=0, chunk=2000):
+    """Create a database at ``path`` with the synthetic catalogue and ``bill_count`` bills; returns the open store"""
+    from store import InventoryStore
+
+    catalogue = products(product_count, seed)
+    for bill in bills(catalogue, bill_count, seed):
+        for item in bill["items"]:
+            catalogue[item["key"]]["quantity"] += item["quantity"]
+    store = InventoryStore(path)
+    # Replaces the seed products too (IDs 1-4)
+    store.upsert_products(catalogue)
+    batch = []
+    for bill in bills(catalogue, bill_count, seed):
+        batch.append(bill)
+        if len(batch) == chunk:
+            store.checkout_many(batch)
+            batch = []
+    if batch:
+        store.checkout_many(batch)
+    return store
+
+
+def cached_build(directory, product_count, bill_count, seed=0):
+    """Path of a built database in ``directory``, reusing one from an earlier run with the same parameters"""
+    path = os.path.join(directory, f"synthetic-{product_count}p-{bill_count}b-s{seed}-{date.today()}.db")
+    if not os.path.exists(path):
+        # Closing the last connection checkpoints the WAL, so the file alone is complete
+        build(path + ".partial", product_count, bill_count, seed).close()
+        os.replace(path + ".partial", path)
+    return path
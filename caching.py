@@ -0,0 +1,92 @@
+"""Derived views cached across sessions, with hit/miss counters.
+
+``cached_view`` wraps ``st.cache_resource``: a result is computed once and
+the same object is handed to every session of the process, never pickled
+or copied - so callers must not modify what a view returns. Views take the store's
+``cache_key(...)`` as their first argument, and every write to the store
+changes that key, so the next call after a write recomputes while
+untouched views keep hitting. Superseded entries are evicted by
+``max_entries``.
+"""
+import functools
+import threading
+
+import streamlit as st
+
+from instrumentation import timer
+
+
+class CacheStats:
+    """Calls and misses per cached view, shared by every session"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = {}
+        self.misses = {}
+
+    def _count(self, counter, name):
+        with self._lock:
+            counter[name] = counter.get(name, 0) + 1
+
+    def totals(self):
+        """``(calls, hits, misses)`` over all views"""
+        with self._lock:
+            calls = sum(self.calls.values())
+            misses = sum(self.misses.values())
+        return calls, calls - misses, misses
+
+    def rows(self):
+        """One dict per view: calls, hits, misses and hit rate"""
+        with self._lock:
+            return [
+                {
+                    "View": name,
+                    "Calls": calls,
+                    "Hits": calls - self.misses.get(name, 0),
+                    "Misses": self.misses.get(name, 0),
+                    "Hit Rate": f"{(calls - self.misses.get(name, 0)) / calls:.0%}"
+                }
+                for name, calls in sorted(self.calls.items())
+            ]
+
+    def reset(self):
+        with self._lock:
+            self.calls.clear()
+            self.misses.clear()
+
+
+STATS = CacheStats()
+# Every view by name, for clear_all; a page module Streamlit reloads after an edit replaces its entries
+_VIEWS = {}
+
+
+def cached_view(fn=None, max_entries=8):
+    """Decorator: cache ``fn`` across sessions with st.cache_resource and count its hits and misses"""
+    if fn is None:
+        return functools.partial(cached_view, max_entries=max_entries)
+    name = fn.__name__
+
+    # functools.wraps keeps fn's name and source, which st.cache_resource keys the cache on
+    @functools.wraps(fn)
+    def compute(*args, **kwargs):
+        STATS._count(STATS.misses, name)
+        with timer(f"view.{name}"):
+            return fn(*args, **kwargs)
+
+    cached = st.cache_resource(max_entries=max_entries, show_spinner=False)(compute)
+
+    @functools.wraps(fn)
+    def view(*args, **kwargs):
+        STATS._count(STATS.calls, name)
+        return cached(*args, **kwargs)
+
+    view.clear = cached.clear
+    _VIEWS[name] = view
+    return view
+
+
+def clear_all():
+    """Drop every cached view and reset the counters"""
+    for view in _VIEWS.values():
+        view.clear()
+    STATS.reset()
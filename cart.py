@@ -0,0 +1,131 @@
+"""Billing cart keyed by product, with exact (Decimal) running totals.
+
+Adding a product that is already in the cart increases that line instead
+of appending a duplicate, and the subtotal is adjusted by the change in
+each line, so totals never need re-summing however large the cart gets.
+Amounts are ``Decimal`` rounded to paise; ``items()`` converts them to the
+plain dicts ``InventoryStore.checkout`` stores.
+"""
+from decimal import ROUND_HALF_UP, Decimal
+
+PAISE = Decimal("0.01")
+ZERO = Decimal("0.00")
+
+# Columns of Cart.frame()
+FRAME_COLUMNS = ["ID", "Product", "Price", "Quantity", "Total"]
+
+
+def to_money(value):
+    """Decimal rounded to paise; floats go through str() so 0.1 stays 0.10"""
+    if not isinstance(value, Decimal):
+        value = Decimal(str(value))
+    return value.quantize(PAISE, rounding=ROUND_HALF_UP)
+
+
+def percent_of(amount, percent):
+    """``percent`` % of ``amount``, rounded to paise"""
+    return to_money(amount * to_money(percent) / 100)
+
+
+class Cart:
+    """Cart lines ``{product_id: line}`` in the order products were first added.
+
+    ``version`` goes up on every change, so views of the cart can be keyed on it.
+    """
+
+    def __init__(self):
+        self._lines = {}
+        self._frame = None
+        self.version = 0
+        self.subtotal = ZERO
+        self.units = 0
+
+    def __len__(self):
+        return len(self._lines)
+
+    def __bool__(self):
+        return bool(self._lines)
+
+    def __contains__(self, key):
+        return key in self._lines
+
+    def __iter__(self):
+        return iter(self._lines.values())
+
+    def keys(self):
+        return list(self._lines)
+
+    def quantity(self, key):
+        """Units of ``key`` already in the cart"""
+        line = self._lines.get(key)
+        return line["quantity"] if line else 0
+
+    def add(self, key, name, price, quantity):
+        """Add ``quantity`` units, merging with an existing line; returns the line's new quantity"""
+        line = self._lines.get(key)
+        if line is None:
+            line = self._lines[key] = {"key": key, "name": name, "price": to_money(price), "quantity": 0, "total": ZERO}
+        self._set(line, line["quantity"] + quantity)
+        return line["quantity"]
+
+    def set_quantity(self, key, quantity):
+        """Change a line's quantity; 0 or less removes the line"""
+        line = self._lines[key]
+        if quantity <= 0:
+            self.remove(key)
+        else:
+            self._set(line, quantity)
+
+    def remove(self, key):
+        line = self._lines.pop(key)
+        self.subtotal -= line["total"]
+        self.units -= line["quantity"]
+        self._changed()
+
+    def clear(self):
+        self._lines.clear()
+        self.subtotal = ZERO
+        self.units = 0
+        self._changed()
+
+    def _set(self, line, quantity):
+        total = line["price"] * quantity
+        self.subtotal += total - line["total"]
+        self.units += quantity - line["quantity"]
+        line["quantity"] = quantity
+        line["total"] = total
+        self._changed()
+
+    def _changed(self):
+        self._frame = None
+        self.version += 1
+
+    def totals(self, discount_percent=0, tax_percent=0):
+        """Subtotal, discount, tax and grand total; tax applies after the discount"""
+        discount = percent_of(self.subtotal, discount_percent)
+        tax = percent_of(self.subtotal - discount, tax_percent)
+        return {
+            "subtotal": self.subtotal,
+            "discount": discount,
+            "tax": tax,
+            "total": self.subtotal - discount + tax
+        }
+
+    def items(self):
+        """Lines as plain dicts (floats) for InventoryStore.checkout"""
+        return [dict(line, price=float(line["price"]), total=float(line["total"])) for line in self._lines.values()]
+
+    def frame(self):
+        """DataFrame of the lines (see FRAME_COLUMNS), rebuilt only after the cart changes"""
+        if self._frame is None:
+            import pandas as pd
+
+            lines = self._lines.values()
+            self._frame = pd.DataFrame({
+                "ID": [line["key"] for line in lines],
+                "Product": [line["name"] for line in lines],
+                "Price": [float(line["price"]) for line in lines],
+                "Quantity": [line["quantity"] for line in lines],
+                "Total": [float(line["total"]) for line in lines]
+            }, columns=FRAME_COLUMNS)
+        return self._frame
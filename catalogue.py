@@ -0,0 +1,166 @@
+import numpy as np
+
+# Columns available for sorting and to the DataFrame returned by frame()/rows()
+COLUMNS = ["id", "name", "price", "quantity", "expiry_date", "category", "barcode"]
+
+# Backing array attribute for each column
+_ARRAYS = {
+    "id": "_ids",
+    "name": "_names",
+    "price": "_prices",
+    "quantity": "_quantities",
+    "expiry_date": "_expiry",
+    "category": "_category_codes",
+    "barcode": "_barcodes"
+}
+
+
+class Catalogue:
+    """Columnar copy of the product catalogue backed by NumPy arrays.
+
+    Each product occupies one row across the column arrays and ``_rows``
+    maps product ID to row. Deletes move the last row into the hole, so
+    live rows are always ``[0, size)``. Kept current through
+    ``update(key, old, new)`` like InventoryStats; stock changes only
+    overwrite one cell. Categories are stored as integer codes and exposed
+    as a pandas Categorical, expiry dates as datetime64[D].
+    """
+
+    def __init__(self, products=None, capacity=1024):
+        products = products or {}
+        capacity = max(capacity, len(products))
+        self.size = 0
+        self.version = 0
+        self._rows = {}
+        self._ids = np.zeros(capacity, dtype=np.int64)
+        self._names = np.empty(capacity, dtype=object)
+        self._prices = np.zeros(capacity, dtype=np.float64)
+        self._quantities = np.zeros(capacity, dtype=np.int64)
+        self._expiry = np.full(capacity, np.datetime64("NaT"), dtype="datetime64[D]")
+        self._category_codes = np.zeros(capacity, dtype=np.int32)
+        self._barcodes = np.empty(capacity, dtype=object)
+        self._category_names = []
+        self._category_lookup = {}
+        self._frame = None
+        for key, product in products.items():
+            self.update(key, None, product)
+
+    def _grow(self):
+        for attr in _ARRAYS.values():
+            column = getattr(self, attr)
+            grown = np.empty(len(column) * 2, dtype=column.dtype)
+            grown[:len(column)] = column
+            setattr(self, attr, grown)
+
+    def _category_code(self, name):
+        if name not in self._category_lookup:
+            self._category_lookup[name] = len(self._category_names)
+            self._category_names.append(name)
+        return self._category_lookup[name]
+
+    def _write(self, row, key, product):
+        self._ids[row] = key
+        self._names[row] = product["name"]
+        self._prices[row] = product["price"]
+        self._quantities[row] = product["quantity"]
+        try:
+            self._expiry[row] = np.datetime64(product["expiry_date"], "D")
+        except ValueError:
+            self._expiry[row] = np.datetime64("NaT")
+        self._category_codes[row] = self._category_code(product["category"])
+        self._barcodes[row] = product.get("barcode")
+
+    def update(self, key, old, new):
+        self.version += 1
+        self._frame = None
+        if old is not None and new is not None:
+            row = self._rows[key]
+            if old["quantity"] != new["quantity"] and all(
+                old.get(field) == new.get(field) for field in ("name", "price", "expiry_date", "category", "barcode")
+            ):
+                self._quantities[row] = new["quantity"]
+            else:
+                self._write(row, key, new)
+        elif new is not None:
+            if self.size == len(self._ids):
+                self._grow()
+            self._rows[key] = self.size
+            self._write(self.size, key, new)
+            self.size += 1
+        elif old is not None:
+            row = self._rows.pop(key)
+            last = self.size - 1
+            if row != last:
+                for attr in _ARRAYS.values():
+                    column = getattr(self, attr)
+                    column[row] = column[last]
+                self._rows[int(self._ids[row])] = row
+            self._names[last] = None
+            self._barcodes[last] = None
+            self.size = last
+
+    # ------------------------------------------------------------ vectorized reads
+
+    def _row_indices(self, ids):
+        rows = self._rows
+        return np.fromiter((rows[key] for key in ids), dtype=np.int64, count=len(ids))
+
+    def _take(self, rows):
+        # pandas is only needed once a page asks for a DataFrame
+        import pandas as pd
+
+        return pd.DataFrame({
+            "id": self._ids[rows],
+            "name": self._names[rows],
+            "price": self._prices[rows],
+            "quantity": self._quantities[rows],
+            "expiry_date": self._expiry[rows],
+            "category": pd.Categorical.from_codes(self._category_codes[rows], categories=self._category_names),
+            "barcode": self._barcodes[rows]
+        })
+
+    def frame(self):
+        """DataFrame of the whole catalogue, cached until the next change. Do not modify it."""
+        if self._frame is None:
+            self._frame = self._take(np.arange(self.size))
+        return self._frame
+
+    def rows(self, ids):
+        """DataFrame of the given product IDs, in that order"""
+        return self._take(self._row_indices(ids))
+
+    def sort(self, ids, column="id", descending=False):
+        """``ids`` ordered by one of COLUMNS (names compare case-insensitively)"""
+        if len(ids) == self.size:
+            # Every product: skip the ID -> row lookups, the order is about to be replaced anyway
+            rows = np.arange(self.size)
+        else:
+            rows = self._row_indices(ids)
+        if column == "name":
+            values = np.char.lower(self._names[rows].astype(str))
+        elif column == "category":
+            values = np.array(self._category_names, dtype=object)[self._category_codes[rows]].astype(str)
+        elif column == "barcode":
+            values = self._barcodes[rows].astype(str)
+        else:
+            values = getattr(self, _ARRAYS[column])[rows]
+        order = np.argsort(values, kind="stable")
+        if descending:
+            order = order[::-1]
+        return self._ids[rows][order].tolist()
+
+    def totals(self):
+        """Total units and stock value computed with vectorized sums"""
+        quantities = self._quantities[:self.size]
+        return {
+            "total_skus": self.size,
+            "total_units": int(quantities.sum()),
+            "stock_value": float((self._prices[:self.size] * quantities).sum())
+        }
+
+    def in_category(self, category):
+        """IDs of every product in ``category``"""
+        code = self._category_lookup.get(category)
+        if code is None:
+            return []
+        return self._ids[:self.size][self._category_codes[:self.size] == code].tolist()
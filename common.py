@@ -0,0 +1,64 @@
+"""Pieces shared by the app pages: the location stores, formatting, category options, toasts and the product picker."""
+import streamlit as st
+
+from caching import cached_view
+from instrumentation import timed
+from locations import MAIN, Locations
+
+# Category selectbox entry that switches to typing a new category
+NEW_CATEGORY = "-- Select or Add New --"
+
+# Every location's store (one set per Streamlit process, shared by every session)
+@st.cache_resource
+def get_locations():
+    return Locations()
+
+def get_store():
+    """Store of the location picked in the sidebar (the main store until one is picked)"""
+    return get_locations().store(st.session_state.get("location", MAIN))
+
+def location_name():
+    return get_locations().names()[st.session_state.get("location", MAIN)]
+
+# Helper function to format currency
+@timed("format_currency")
+def format_currency(amount):
+    """Format amount as Rs with Indian numbering system"""
+    return f"Rs {amount:,.2f}"
+
+# Views derived from the store are computed once and shared by every session
+# (see caching.cached_view); the first argument is a store.cache_key(), which
+# every write changes
+@cached_view
+def category_options(key):
+    """Sorted category names"""
+    return sorted(get_store().get_categories())
+
+# Button/form callbacks run before the (fragment) rerun the click triggers,
+# so each action redraws its section once, with the new data, and never sleeps
+def notify(message, icon="✅"):
+    """Queue a toast for the next render (callbacks must not draw elements themselves)"""
+    st.session_state.setdefault("notices", []).append((message, icon))
+
+def show_notices():
+    """Show queued toasts"""
+    for message, icon in st.session_state.pop("notices", []):
+        st.toast(message, icon=icon)
+
+# Typeahead instead of a selectbox of the whole catalogue: only the top matches reach the browser
+def pick_product(label, query_key, store=None):
+    """Product picker over ``store``'s search index (default: the sidebar's); returns the picked ID or None"""
+    store = store or get_store()
+    query = st.text_input(label, key=query_key,
+                          placeholder="Scan a barcode, or type a product ID or 3+ letters of a name")
+    if not query.strip():
+        return None
+    suggestions = store.suggest_products(query)
+    if not suggestions:
+        st.caption("No matching products.")
+        return None
+    names = {}
+    for key in suggestions:
+        product = store.get_product(key)
+        names[key] = f"{key} - {product['name']} ({product['quantity']} units)"
+    return st.selectbox("Matching Products", options=suggestions, format_func=names.get, key=f"{query_key}_pick")
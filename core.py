@@ -0,0 +1,135 @@
+"""Headless inventory and billing operations, shared by the Streamlit pages and the HTTP API (api.py).
+
+Every function takes the InventoryStore and plain values and raises
+ValueError for bad input, or the store's OutOfStockError /
+ExpiredProductError, so the same rules apply whichever front end a till
+uses. Bills are priced with ``Cart`` (exact Decimal totals), exactly as
+the Generate Bill page prices them.
+"""
+from cart import Cart
+from expiry import parse_expiry
+from movements import ADJUSTMENT, RECEIPT
+from store import ExpiredProductError, OutOfStockError, _now
+
+
+def add_product(store, name, price, quantity, expiry_date, category, barcode=None,
+                reorder_level=0, reorder_quantity=0, key=None):
+    """Validate and insert a product; ``key`` None takes the next free ID. Returns the product ID."""
+    name = (name or "").strip()
+    category = (category or "").strip()
+    if key is not None and store.get_product(key) is not None:
+        raise ValueError(f"Product ID {key} already exists")
+    if not name:
+        raise ValueError("Please enter product name")
+    if price <= 0:
+        raise ValueError("Price must be greater than 0")
+    if quantity < 0:
+        raise ValueError("Quantity cannot be negative")
+    if parse_expiry(expiry_date) is None:
+        raise ValueError("Expiry date must be a date (YYYY-MM-DD)")
+    if not category:
+        raise ValueError("Please select or enter a category")
+    if reorder_level < 0 or reorder_quantity < 0:
+        raise ValueError("Reorder levels and quantities cannot be negative")
+    key = store.next_product_id() if key is None else key
+    store.add_product(key, name, price, quantity, expiry_date, category, (barcode or "").strip() or None,
+                      reorder_level, reorder_quantity)
+    return key
+
+
+def adjust_stock(store, key, delta, kind=RECEIPT):
+    """Add ``delta`` units (negative removes) to product ``key``; returns the new quantity"""
+    if store.get_product(key) is None:
+        raise ValueError(f"Product {key} not found")
+    if delta == 0:
+        raise ValueError("Quantity must not be 0")
+    return store.adjust_stock(key, delta, kind=kind if delta > 0 else ADJUSTMENT)
+
+
+def add_to_cart(store, cart, key, quantity):
+    """Add ``quantity`` units of product ``key`` to ``cart`` if it can be sold and enough stock is left"""
+    product = store.get_product(key)
+    if product is None:
+        raise ValueError(f"Product {key} not found")
+    if quantity <= 0:
+        raise ValueError("Quantity must be at least 1")
+    if store.is_expired(key):
+        raise ExpiredProductError(key, product["name"], product["expiry_date"])
+    if cart.quantity(key) + quantity > product["quantity"]:
+        raise OutOfStockError(key, product["name"], cart.quantity(key) + quantity, product["quantity"])
+    return cart.add(key, product["name"], product["price"], quantity)
+
+
+def build_cart(store, lines):
+    """Cart at current prices for ``[{"id": product_id, "quantity": units}, ...]``"""
+    cart = Cart()
+    for line in lines:
+        try:
+            key, quantity = int(line["id"]), int(line.get("quantity", 1))
+        except (KeyError, TypeError, ValueError):
+            raise ValueError("Each line needs a product id and a whole-number quantity")
+        add_to_cart(store, cart, key, quantity)
+    return cart
+
+
+def bill_totals(cart, discount_percent=0, tax_percent=0):
+    """Subtotal, discount, tax and total of ``cart`` (see Cart.totals), checking the percentages"""
+    for label, percent in (("Discount", discount_percent), ("Tax", tax_percent)):
+        if not 0 <= percent <= 100:
+            raise ValueError(f"{label} must be between 0 and 100%")
+    return cart.totals(discount_percent, tax_percent)
+
+
+def _bill(customer, cart, discount_percent, tax_percent, date):
+    """Keyword arguments of ``InventoryStore.checkout`` for one bill"""
+    customer = (customer or "").strip()
+    if not customer:
+        raise ValueError("Please enter customer name")
+    if not cart:
+        raise ValueError("Cart is empty")
+    totals = bill_totals(cart, discount_percent, tax_percent)
+    return {
+        "customer": customer,
+        "items": cart.items(),
+        "subtotal": float(totals["subtotal"]),
+        "discount": float(totals["discount"]),
+        "tax": float(totals["tax"]),
+        "total": float(totals["total"]),
+        "date": date or _now()
+    }
+
+
+def checkout_cart(store, customer, cart, discount_percent=0, tax_percent=0, date=None):
+    """Check out ``cart`` for ``customer`` (``date`` None = now); returns the new sale ID"""
+    return store.checkout(**_bill(customer, cart, discount_percent, tax_percent, date))
+
+
+def checkout_bills(store, bills, date=None):
+    """Check out many bills in one store transaction.
+
+    Each bill is a dict with ``customer``, ``lines`` (as for build_cart) and
+    optional ``discount_percent``/``tax_percent``. A bad bill is rejected on
+    its own. Returns one dict per bill, in order: ``{"sale_id", "total"}``
+    or ``{"error"}``.
+    """
+    results = [None] * len(bills)
+    prepared = []
+    for index, bill in enumerate(bills):
+        try:
+            cart = build_cart(store, bill.get("lines") or [])
+            prepared.append((index, _bill(bill.get("customer"), cart, bill.get("discount_percent", 0),
+                                          bill.get("tax_percent", 0), date)))
+        except (ValueError, OutOfStockError, ExpiredProductError) as e:
+            results[index] = {"error": str(e)}
+    outcomes = store.checkout_many([bill for _, bill in prepared]) if prepared else []
+    for (index, bill), outcome in zip(prepared, outcomes):
+        if isinstance(outcome, Exception):
+            results[index] = {"error": str(outcome)}
+        else:
+            results[index] = {"sale_id": outcome, "total": bill["total"]}
+    return results
+
+
+def sales(store, customer="", start=None, end=None, limit=50):
+    """Newest ``limit`` sales (with items) matching the Sales History filters"""
+    return store.get_sales(store.query_sales(customer, "newest", start, end)[:limit])
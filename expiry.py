@@ -0,0 +1,66 @@
+import bisect
+from datetime import date
+
+
+def parse_expiry(value):
+    """Day number (date.toordinal) of an ISO expiry date, or None if it is not a date"""
+    try:
+        return date.fromisoformat(str(value)[:10]).toordinal()
+    except ValueError:
+        return None
+
+
+class ExpiryIndex:
+    """Product IDs ordered by expiry date.
+
+    Dates are parsed once into day numbers and kept in a sorted list of
+    ``(day, id)`` pairs, so "expired before" and "expiring within" are a
+    bisect plus the matching slice: O(log n + k). Kept current through
+    ``update(key, old, new)`` like InventoryStats; stock-only changes do
+    not touch it.
+    """
+
+    def __init__(self, products=None):
+        self._days = {}
+        self._by_day = []
+        for key, product in (products or {}).items():
+            day = parse_expiry(product["expiry_date"])
+            if day is not None:
+                self._days[key] = day
+                self._by_day.append((day, key))
+        # One sort at startup instead of an insort per product
+        self._by_day.sort()
+
+    def __len__(self):
+        return len(self._by_day)
+
+    def update(self, key, old, new):
+        if old is not None and new is not None and old["expiry_date"] == new["expiry_date"]:
+            return
+        day = self._days.pop(key, None)
+        if day is not None:
+            del self._by_day[bisect.bisect_left(self._by_day, (day, key))]
+        if new is not None:
+            day = parse_expiry(new["expiry_date"])
+            if day is not None:
+                self._days[key] = day
+                bisect.insort(self._by_day, (day, key))
+
+    def is_expired(self, key, today):
+        """Whether ``key`` expired before ``today`` (a date)"""
+        day = self._days.get(key)
+        return day is not None and day < today.toordinal()
+
+    def expired(self, today):
+        """IDs that expired before ``today``, soonest expiry first"""
+        end = bisect.bisect_left(self._by_day, (today.toordinal(),))
+        return [key for _, key in self._by_day[:end]]
+
+    def expiring(self, today, days):
+        """IDs expiring from ``today`` up to ``days`` days later (inclusive), soonest first"""
+        start = bisect.bisect_left(self._by_day, (today.toordinal(),))
+        end = bisect.bisect_left(self._by_day, (today.toordinal() + days + 1,))
+        return [key for _, key in self._by_day[start:end]]
+
+    def count_expired(self, today):
+        return bisect.bisect_left(self._by_day, (today.toordinal(),))
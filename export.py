@@ -0,0 +1,113 @@
+import csv
+import gzip
+import importlib.util
+import io
+import os
+import tempfile
+import time
+
+from instrumentation import timed
+
+# Column headers of the sales export, matching the rows from InventoryStore.iter_sale_items
+EXPORT_COLUMNS = ["Sale #", "Date", "Customer", "Product", "Quantity", "Price", "Item Total", "Bill Total"]
+
+# Export formats offered on the Sales History page: label -> (file extension, MIME type)
+EXPORT_FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "CSV (gzip)": ("csv.gz", "application/gzip"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet")
+}
+
+# Finished exports are written here and removed once older than EXPORT_MAX_AGE seconds
+EXPORT_DIR = os.path.join(tempfile.gettempdir(), "stock-exports")
+EXPORT_MAX_AGE = 3600
+
+
+def parquet_available():
+    """Whether pyarrow is installed for Parquet export"""
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def iter_csv_chunks(store, start=None, end=None, chunk_rows=5000):
+    """Yield the sales export as encoded CSV chunks of at most ``chunk_rows`` item rows"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(EXPORT_COLUMNS)
+    for rows in store.iter_sale_items(start, end, chunk_rows):
+        writer.writerows(rows)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        # Header only: nothing matched the date range
+        yield buffer.getvalue().encode("utf-8")
+
+
+def write_csv(store, fileobj, start=None, end=None, compress=False, chunk_rows=5000):
+    """Stream the sales export as CSV (optionally gzip-compressed) into a binary file"""
+    out = gzip.GzipFile(fileobj=fileobj, mode="wb") if compress else fileobj
+    try:
+        for chunk in iter_csv_chunks(store, start, end, chunk_rows):
+            out.write(chunk)
+    finally:
+        if compress:
+            out.close()
+
+
+def write_parquet(store, fileobj, start=None, end=None, chunk_rows=50000):
+    """Stream the sales export into a Parquet file, one row group per chunk"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("Sale #", pa.int64()),
+        ("Date", pa.string()),
+        ("Customer", pa.string()),
+        ("Product", pa.string()),
+        ("Quantity", pa.int64()),
+        ("Price", pa.float64()),
+        ("Item Total", pa.float64()),
+        ("Bill Total", pa.float64())
+    ])
+    with pq.ParquetWriter(fileobj, schema, compression="snappy") as writer:
+        for rows in store.iter_sale_items(start, end, chunk_rows):
+            columns = list(zip(*rows))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+                schema=schema
+            ))
+
+
+def prune_exports(max_age=EXPORT_MAX_AGE):
+    """Delete export files older than ``max_age`` seconds"""
+    cutoff = time.time() - max_age
+    for entry in os.scandir(EXPORT_DIR):
+        try:
+            if entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+        except OSError:
+            # Still open elsewhere (Windows) or already gone
+            pass
+
+
+@timed("export.sales")
+def export_sales(store, fmt="CSV", start=None, end=None):
+    """Write the sales export in ``fmt`` (a key of EXPORT_FORMATS) to a file in EXPORT_DIR; returns its path.
+
+    Rows are streamed in chunks straight to disk, so the export is never
+    held in memory as a whole.
+    """
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    prune_exports()
+    extension = EXPORT_FORMATS[fmt][0]
+    descriptor, path = tempfile.mkstemp(prefix="sales_", suffix=f".{extension}", dir=EXPORT_DIR)
+    try:
+        with os.fdopen(descriptor, "wb") as fileobj:
+            if fmt == "Parquet":
+                write_parquet(store, fileobj, start, end)
+            else:
+                write_csv(store, fileobj, start, end, compress=fmt == "CSV (gzip)")
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
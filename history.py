@@ -0,0 +1,118 @@
+import bisect
+
+from search import TextIndex
+
+# Sale orderings understood by SalesIndex.query
+SALE_ORDERS = ["newest", "oldest", "highest", "lowest"]
+
+
+class SalesIndex:
+    """Sale IDs indexed by customer, date and bill total.
+
+    Sales are append-only, so the index is built once from the database and
+    then grows by one ``add`` per checkout. Customer names are matched as
+    case-insensitive substrings through a TextIndex over the distinct names,
+    dates and totals through sorted lists searched with bisect. Running
+    ``count`` and ``total_amount`` back the Sales History summary metrics.
+    """
+
+    def __init__(self, sales=()):
+        self._ids = []
+        self._totals = {}
+        self._by_date = []
+        self._by_total = []
+        self._by_customer = {}
+        self._customers = TextIndex()
+        self.count = 0
+        self.total_amount = 0.0
+        self.extend(sales)
+
+    @property
+    def last_id(self):
+        """Highest sale ID indexed so far (0 when empty)"""
+        return self._ids[-1] if self._ids else 0
+
+    def extend(self, sales):
+        """Index many sale rows (``id``, ``customer``, ``total``, ``date``) at once, in ID order"""
+        for sale in sales:
+            self._append(sale["id"], sale["customer"], sale["total"], sale["date"])
+            self._by_date.append((sale["date"], sale["id"]))
+            self._by_total.append((sale["total"], sale["id"]))
+        # One sort per batch instead of an insort per sale
+        self._by_date.sort()
+        self._by_total.sort()
+
+    def __contains__(self, sale_id):
+        return sale_id in self._totals
+
+    def add(self, sale_id, customer, total, date):
+        self._append(sale_id, customer, total, date)
+        bisect.insort(self._by_date, (date, sale_id))
+        bisect.insort(self._by_total, (total, sale_id))
+
+    def remove(self, sale_id):
+        """Drop a sale, e.g. a write-behind bill the database refused (no-op if it is not indexed)"""
+        total = self._totals.pop(sale_id, None)
+        if total is None:
+            return
+        self._ids.pop(bisect.bisect_left(self._ids, sale_id))
+        for entries in self._by_date, self._by_total:
+            for i, (_, key) in enumerate(entries):
+                if key == sale_id:
+                    del entries[i]
+                    break
+        for ids in self._by_customer.values():
+            if sale_id in ids:
+                ids.remove(sale_id)
+                break
+        self.count -= 1
+        self.total_amount -= total
+
+    def _append(self, sale_id, customer, total, date):
+        if self._ids and sale_id < self._ids[-1]:
+            # Another process's sale, picked up after later ones of this process
+            bisect.insort(self._ids, sale_id)
+        else:
+            self._ids.append(sale_id)
+        self._totals[sale_id] = total
+        name = customer.lower()
+        if name not in self._by_customer:
+            self._by_customer[name] = []
+            self._customers.add(name, name)
+        self._by_customer[name].append(sale_id)
+        self.count += 1
+        self.total_amount += total
+
+    def query(self, customer="", order="newest", start=None, end=None):
+        """Sale IDs matching the filters, in ``order`` (one of SALE_ORDERS).
+
+        ``start``/``end`` are optional ``YYYY-MM-DD`` strings, both inclusive.
+        """
+        selected = None
+        if customer:
+            selected = set()
+            for name in self._customers.search(customer):
+                selected.update(self._by_customer[name])
+        if start or end:
+            lo = bisect.bisect_left(self._by_date, (str(start),)) if start else 0
+            hi = bisect.bisect_right(self._by_date, (f"{end}~",)) if end else len(self._by_date)
+            in_range = {sale_id for _, sale_id in self._by_date[lo:hi]}
+            selected = in_range if selected is None else selected & in_range
+
+        if selected is not None and len(selected) * 8 < len(self._ids):
+            # Few matches: sorting them directly beats walking the full ordering
+            if order in ("highest", "lowest"):
+                return sorted(selected, key=lambda i: (self._totals[i], i), reverse=order == "highest")
+            return sorted(selected, reverse=order == "newest")
+
+        if order == "oldest":
+            ordered = self._ids
+        elif order == "newest":
+            ordered = reversed(self._ids)
+        elif order == "lowest":
+            ordered = (sale_id for _, sale_id in self._by_total)
+        else:
+            ordered = (sale_id for _, sale_id in reversed(self._by_total))
+        if selected is None:
+            return list(ordered)
+        return [sale_id for sale_id in ordered if sale_id in selected]
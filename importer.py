@@ -0,0 +1,208 @@
+import io
+
+import pandas as pd
+
+# Columns every import file must have, and the optional ones
+REQUIRED_COLUMNS = ["name", "price", "quantity", "expiry_date", "category"]
+OPTIONAL_COLUMNS = ["id", "barcode", "reorder_level", "reorder_quantity"]
+
+# Optional whole-number columns; a blank cell keeps the product's current value
+REORDER_COLUMNS = ["reorder_level", "reorder_quantity"]
+
+# Header spellings accepted for each column (compared lowercased with spaces -> "_")
+COLUMN_ALIASES = {
+    "product_id": "id",
+    "product_name": "name",
+    "price_(rs)": "price",
+    "qty": "quantity",
+    "stock": "quantity",
+    "expiry": "expiry_date",
+    "reorder_point": "reorder_level",
+    "min_stock": "reorder_level",
+    "order_quantity": "reorder_quantity",
+    "count": "counted",
+    "counted_quantity": "counted",
+    "physical_count": "counted",
+}
+
+# Largest product ID an import may give. IDs are read as floats, exact up to 2 ** 53;
+# this leaves room below that for the IDs handed to blank rows after it
+MAX_ID = 10 ** 15
+
+# Stock-take count sheets: a product (ID or barcode) and its counted quantity
+COUNT_COLUMNS = ["id", "barcode", "counted"]
+
+
+def template_csv():
+    """Empty import sheet with the expected header"""
+    return ",".join(OPTIONAL_COLUMNS[:1] + REQUIRED_COLUMNS + OPTIONAL_COLUMNS[1:]) + "\n"
+
+
+def count_template_csv(products):
+    """Count sheet listing ``{id: product_dict}`` with an empty counted column"""
+    return pd.DataFrame({
+        "id": list(products),
+        "name": [p["name"] for p in products.values()],
+        "barcode": [p.get("barcode") or "" for p in products.values()],
+        "counted": ""
+    }).to_csv(index=False, lineterminator="\n")
+
+
+def _read_frame(data, filename):
+    """Read an uploaded CSV or Excel file into a DataFrame of strings with normalized headers"""
+    if filename.lower().endswith((".xlsx", ".xls")):
+        try:
+            df = pd.read_excel(io.BytesIO(data), dtype=str)
+        except ImportError:
+            raise ValueError("Reading Excel files needs the openpyxl package (pip install openpyxl)")
+    else:
+        df = pd.read_csv(io.BytesIO(data), dtype=str, keep_default_na=False)
+    df.columns = [
+        COLUMN_ALIASES.get(col, col)
+        for col in (str(c).strip().lower().replace(" ", "_") for c in df.columns)
+    ]
+    return df
+
+
+def read_upload(data, filename):
+    """Read an uploaded product sheet, checking it has every required column"""
+    df = _read_frame(data, filename)
+    missing = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError(f"Missing column(s): {', '.join(missing)}")
+    return df
+
+
+def validate(df, next_id, existing_barcodes=None):
+    """Check every row of an import with column-wise operations.
+
+    ``next_id`` is the first ID handed to rows without one and
+    ``existing_barcodes`` maps barcodes already in the store to their
+    product ID. Returns ``(products, errors)``: ``{id: product_dict}`` for
+    the valid rows and a DataFrame with one ``Row``/``Column``/``Error``
+    line per problem (``Row`` is the spreadsheet row, header = 1).
+    """
+    existing_barcodes = existing_barcodes or {}
+    problems = []
+
+    def flag(mask, column, message):
+        for row in mask[mask].index:
+            problems.append({"Row": row + 2, "Column": column, "Error": message})
+
+    text = {col: df[col].fillna("").astype(str).str.strip() for col in REQUIRED_COLUMNS}
+    flag(text["name"] == "", "name", "Name is empty")
+    flag(text["category"] == "", "category", "Category is empty")
+
+    price = pd.to_numeric(text["price"], errors="coerce")
+    flag(price.isna(), "price", "Price is not a number")
+    flag(price <= 0, "price", "Price must be greater than 0")
+
+    quantity = pd.to_numeric(text["quantity"], errors="coerce")
+    flag(quantity.isna() | (quantity % 1 != 0), "quantity", "Quantity is not a whole number")
+    flag(quantity < 0, "quantity", "Quantity cannot be negative")
+
+    # ISO dates parse in one vectorized pass; only the leftovers go through the slow mixed-format parser
+    expiry = pd.to_datetime(text["expiry_date"], errors="coerce", format="%Y-%m-%d")
+    retry = expiry.isna() & (text["expiry_date"] != "")
+    if retry.any():
+        expiry[retry] = pd.to_datetime(text["expiry_date"][retry], errors="coerce", format="mixed", dayfirst=True)
+    flag(expiry.isna(), "expiry_date", "Expiry date is not a valid date")
+
+    # IDs: blank ones are assigned from next_id, given ones must be unique positive integers
+    raw_ids = df["id"].fillna("").astype(str).str.strip() if "id" in df.columns else pd.Series("", index=df.index)
+    ids = pd.to_numeric(raw_ids, errors="coerce")
+    blank_id = raw_ids == ""
+    bad_id = ~blank_id & (ids.isna() | (ids % 1 != 0) | (ids <= 0))
+    too_large = ~blank_id & ~bad_id & (ids > MAX_ID)
+    flag(bad_id, "id", "ID must be a positive whole number")
+    flag(too_large, "id", f"ID cannot be larger than {MAX_ID}")
+    # Only IDs that passed move next_id on
+    good_id = ~blank_id & ~bad_id & ~too_large
+    if good_id.any():
+        next_id = max(next_id, int(ids[good_id].max()) + 1)
+    flag(~blank_id & ids.duplicated(keep=False) & ids.notna(), "id", "ID appears more than once in the file")
+    auto_ids = pd.Series(range(next_id, next_id + int(blank_id.sum())), index=df.index[blank_id], dtype="float64")
+    ids = ids.where(~blank_id, auto_ids)
+
+    barcodes = df["barcode"].fillna("").astype(str).str.strip() if "barcode" in df.columns else pd.Series("", index=df.index)
+    has_barcode = barcodes != ""
+    flag(has_barcode & barcodes.duplicated(keep=False), "barcode", "Barcode appears more than once in the file")
+    owner = barcodes.map(existing_barcodes)
+    flag(has_barcode & owner.notna() & (owner != ids), "barcode", "Barcode already belongs to another product")
+
+    reorder = {}
+    for col in REORDER_COLUMNS:
+        if col in df.columns:
+            raw = df[col].fillna("").astype(str).str.strip()
+            values = pd.to_numeric(raw, errors="coerce")
+            flag((raw != "") & (values.isna() | (values % 1 != 0) | (values < 0)), col,
+                 "Must be a whole number, 0 or more")
+            reorder[col] = values
+
+    errors = pd.DataFrame(problems, columns=["Row", "Column", "Error"]).sort_values("Row", kind="stable")
+    valid = ~df.index.isin(errors["Row"] - 2)
+    products = {
+        int(key): {
+            "name": name,
+            "price": float(p),
+            "quantity": int(q),
+            "expiry_date": e.strftime("%Y-%m-%d"),
+            "category": category,
+            "barcode": barcode or None
+        }
+        for key, name, p, q, e, category, barcode in zip(
+            ids[valid], text["name"][valid], price[valid], quantity[valid],
+            expiry[valid], text["category"][valid], barcodes[valid]
+        )
+    }
+    for col, values in reorder.items():
+        for key, value in zip(ids[valid], values[valid]):
+            if pd.notna(value):
+                products[int(key)][col] = int(value)
+    return products, errors.reset_index(drop=True)
+
+
+def read_counts(data, filename, known_ids, barcodes=None):
+    """Read a stock-take count sheet.
+
+    Rows name a product by ``id`` or, failing that, ``barcode`` (looked up
+    in ``barcodes``) and give its ``counted`` quantity. Returns
+    ``(counts, errors)``: ``{id: counted}`` for the valid rows and the same
+    ``Row``/``Column``/``Error`` report as ``validate``.
+    """
+    df = _read_frame(data, filename)
+    if "counted" not in df.columns and "quantity" in df.columns:
+        df = df.rename(columns={"quantity": "counted"})
+    missing = [col for col in ["counted"] if col not in df.columns]
+    if "id" not in df.columns and "barcode" not in df.columns:
+        missing.insert(0, "id or barcode")
+    if missing:
+        raise ValueError(f"Missing column(s): {', '.join(missing)}")
+
+    problems = []
+
+    def flag(mask, column, message):
+        for row in mask[mask].index:
+            problems.append({"Row": row + 2, "Column": column, "Error": message})
+
+    blank = pd.Series("", index=df.index)
+    raw_ids = df["id"].fillna("").astype(str).str.strip() if "id" in df.columns else blank
+    codes = df["barcode"].fillna("").astype(str).str.strip() if "barcode" in df.columns else blank
+    ids = pd.to_numeric(raw_ids, errors="coerce")
+    ids = ids.where(raw_ids != "", codes.map(barcodes or {}))
+    flag(ids.isna() & (raw_ids == "") & (codes == ""), "id", "Row has no ID or barcode")
+    flag(ids.isna() & (codes != "") & (raw_ids == ""), "barcode", "Unknown barcode")
+    bad_id = (raw_ids != "") & (ids.isna() | (ids % 1 != 0))
+    flag(bad_id, "id", "ID must be a whole number")
+    flag(ids.notna() & ~bad_id & ~ids.isin(list(known_ids)), "id", "Unknown product ID")
+    flag(ids.notna() & ids.duplicated(keep=False), "id", "Product counted more than once in the file")
+
+    raw_counted = df["counted"].fillna("").astype(str).str.strip()
+    counted = pd.to_numeric(raw_counted, errors="coerce")
+    flag(counted.isna() | (counted % 1 != 0), "counted", "Count is not a whole number")
+    flag(counted < 0, "counted", "Count cannot be negative")
+
+    errors = pd.DataFrame(problems, columns=["Row", "Column", "Error"]).sort_values("Row", kind="stable")
+    valid = ~df.index.isin(errors["Row"] - 2)
+    counts = {int(key): int(value) for key, value in zip(ids[valid], counted[valid])}
+    return counts, errors.reset_index(drop=True)
@@ -0,0 +1,183 @@
+"""Opt-in timers and counters for page sections and core operations.
+
+Off by default: set ``STOCK_PROFILE=1`` or switch it on from the hidden
+Diagnostics page (``?page=diagnostics``). While off, ``timer()`` returns a
+shared do-nothing context manager and ``timed`` functions make one
+attribute check before calling straight through, so instrumented code
+costs next to nothing.
+
+While on, every timer keeps its count, total and maximum plus the last
+``SAMPLES`` durations (for p50/p95), and counters and gauges hold
+numbers such as reruns and catalogue size. ``METRICS.prometheus()`` and
+``METRICS.json_lines()`` export them all. Everything is shared by every
+session of the process.
+"""
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+# Recent durations kept per timer for the percentiles
+SAMPLES = 512
+
+_OFF = contextlib.nullcontext()
+
+
+class Metrics:
+    """Timers, counters and gauges, shared by every session"""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.timers = {}
+        self.counters = {}
+        self.gauges = {}
+        self.started = time.time()
+
+    def record(self, name, seconds):
+        with self._lock:
+            timer = self.timers.get(name)
+            if timer is None:
+                timer = self.timers[name] = {"count": 0, "total": 0.0, "max": 0.0, "recent": deque(maxlen=SAMPLES)}
+            timer["count"] += 1
+            timer["total"] += seconds
+            timer["max"] = max(timer["max"], seconds)
+            timer["recent"].append(seconds)
+
+    def count(self, name, amount=1):
+        if self.enabled:
+            with self._lock:
+                self.counters[name] = self.counters.get(name, 0) + amount
+
+    def gauge(self, name, value):
+        if self.enabled:
+            with self._lock:
+                self.gauges[name] = value
+
+    def timer(self, name):
+        """Context manager timing its block as ``name`` (a no-op while disabled)"""
+        return _Timing(self, name) if self.enabled else _OFF
+
+    def reset(self):
+        with self._lock:
+            self.timers.clear()
+            self.counters.clear()
+            self.gauges.clear()
+            self.started = time.time()
+
+    def rows(self):
+        """One dict per timer, slowest total first, for the Diagnostics table"""
+        with self._lock:
+            timers = [(name, dict(timer, recent=sorted(timer["recent"]))) for name, timer in self.timers.items()]
+        rows = []
+        for name, timer in sorted(timers, key=lambda item: -item[1]["total"]):
+            recent = timer["recent"]
+            rows.append({
+                "Timer": name,
+                "Calls": timer["count"],
+                "Total ms": round(timer["total"] * 1000, 1),
+                "Mean ms": round(timer["total"] / timer["count"] * 1000, 2),
+                "p50 ms": round(recent[len(recent) // 2] * 1000, 2),
+                "p95 ms": round(recent[min(len(recent) - 1, int(len(recent) * 0.95))] * 1000, 2),
+                "Max ms": round(timer["max"] * 1000, 2)
+            })
+        return rows
+
+    def prometheus(self, prefix="stock"):
+        """Prometheus text exposition format"""
+        with self._lock:
+            timers = {name: dict(timer) for name, timer in self.timers.items()}
+            counters = dict(self.counters)
+            gauges = dict(self.gauges)
+        lines = [
+            f"# HELP {prefix}_timer_seconds Time spent in instrumented page sections and operations",
+            f"# TYPE {prefix}_timer_seconds summary"
+        ]
+        for name, timer in sorted(timers.items()):
+            lines.append(f'{prefix}_timer_seconds_count{{name="{name}"}} {timer["count"]}')
+            lines.append(f'{prefix}_timer_seconds_sum{{name="{name}"}} {timer["total"]:.6f}')
+        lines += [f"# HELP {prefix}_timer_max_seconds Slowest call of each timer",
+                  f"# TYPE {prefix}_timer_max_seconds gauge"]
+        lines += [f'{prefix}_timer_max_seconds{{name="{name}"}} {timer["max"]:.6f}'
+                  for name, timer in sorted(timers.items())]
+        for name, value in sorted(counters.items()):
+            lines += [f"# TYPE {prefix}_{name}_total counter", f"{prefix}_{name}_total {value}"]
+        for name, value in sorted(gauges.items()):
+            lines += [f"# TYPE {prefix}_{name} gauge", f"{prefix}_{name} {value}"]
+        return "\n".join(lines) + "\n"
+
+    def json_lines(self):
+        """One JSON object per timer, counter and gauge, each on its own line"""
+        stamp = round(time.time(), 3)
+        lines = [
+            json.dumps({"time": stamp, "type": "timer", "name": row["Timer"], "count": row["Calls"],
+                        "total_ms": row["Total ms"], "mean_ms": row["Mean ms"], "p50_ms": row["p50 ms"],
+                        "p95_ms": row["p95 ms"], "max_ms": row["Max ms"]})
+            for row in self.rows()
+        ]
+        with self._lock:
+            lines += [json.dumps({"time": stamp, "type": "counter", "name": name, "value": value})
+                      for name, value in sorted(self.counters.items())]
+            lines += [json.dumps({"time": stamp, "type": "gauge", "name": name, "value": value})
+                      for name, value in sorted(self.gauges.items())]
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+class _Timing:
+    """Times one ``with`` block (a class: cheaper than a generator-based context manager)"""
+
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.metrics.record(self.name, time.perf_counter() - self.start)
+
+
+METRICS = Metrics(enabled=os.environ.get("STOCK_PROFILE") == "1")
+
+
+def timer(name):
+    """``with timer("section"):`` times the block while instrumentation is on"""
+    return METRICS.timer(name)
+
+
+def profile(fn, limit=30):
+    """Run ``fn()`` under cProfile; returns ``(seconds, top functions by cumulative time as text)``"""
+    import cProfile
+    import io
+    import pstats
+
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    try:
+        profiler.runcall(fn)
+    finally:
+        seconds = time.perf_counter() - start
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(limit)
+    return seconds, out.getvalue()
+
+
+def timed(name):
+    """Decorator: time every call of the function as ``name`` while instrumentation is on"""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not METRICS.enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                METRICS.record(name, time.perf_counter() - start)
+        return wrapper
+    return decorate
@@ -0,0 +1,291 @@
+"""Branches: one inventory partition per location, stock transfers between them and cross-store rollups.
+
+Each location is a complete InventoryStore over its own SQLite file - its
+products and quantities, sales, ledger, rollup tables and in-memory
+indexes - so a branch's tills, dashboard and sales history only ever read
+and lock that branch's data. Location 1 is the original database
+(``STOCK_DB_PATH``); it also keeps the list of locations and the transfer
+log, and branch ``n`` lives beside it as ``<name>-store<n>.db``. A product
+keeps its ID in every location that stocks it.
+
+``rollup`` and ``sales_series`` add up totals every store already keeps
+current (InventoryStats, the reorder queue, SalesIndex, the sales rollup
+tables), so a cross-store view costs a few reads per location instead of
+a scan of every product or sale.
+
+A transfer takes units out of one store and puts them into another. Two
+SQLite files cannot commit together, so the transfer is logged first and
+each leg goes into its store's ledger with a ``Transfer #<id>``
+reference; ``recover`` finishes or cancels a transfer that a crash left
+half done by looking for those entries.
+"""
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+
+import movements
+from store import DEFAULT_DB_PATH, WRITE_BEHIND, InventoryStore, _now
+
+log = logging.getLogger(__name__)
+
+# The original database's location
+MAIN = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS locations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL UNIQUE
+);
+INSERT OR IGNORE INTO locations (id, name) VALUES (1, 'Main Store');
+CREATE TABLE IF NOT EXISTS transfers (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    product_id INTEGER NOT NULL,
+    quantity INTEGER NOT NULL,
+    source INTEGER NOT NULL REFERENCES locations (id),
+    destination INTEGER NOT NULL REFERENCES locations (id),
+    status TEXT NOT NULL,
+    date TEXT NOT NULL
+);
+"""
+
+# Transfer states: logged, taken out of the source, put into the destination, abandoned
+PENDING = "pending"
+SENT = "sent"
+RECEIVED = "received"
+CANCELLED = "cancelled"
+
+# Unfinished transfers younger than this may still be in progress in another process
+RECOVER_AFTER = timedelta(minutes=1)
+
+
+def partition_path(main_path, location_id):
+    """Database file of ``location_id``: ``main_path`` itself for MAIN, else ``<main>-store<id>.db`` beside it"""
+    if location_id == MAIN:
+        return main_path
+    base, extension = os.path.splitext(main_path)
+    return f"{base}-store{location_id}{extension or '.db'}"
+
+
+class Locations:
+    """Every location's store, each opened on first use and kept for the process.
+
+    Shared by all sessions like a single store (see ``get_locations`` in
+    common.py). Raises LookupError for an unknown location ID and
+    ValueError for a location or transfer that cannot be made.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH, write_behind=WRITE_BEHIND):
+        self.path = path
+        self.write_behind = write_behind
+        # Guards opening stores and serialises transfers
+        self._lock = threading.RLock()
+        self.main = InventoryStore(path, write_behind=write_behind)
+        self._stores = {MAIN: self.main}
+        with self.main.pool.connection() as conn:
+            conn.executescript(SCHEMA)
+        self._load_names()
+        self.recover()
+
+    def _load_names(self):
+        """Re-read the locations table, which other processes (e.g. the JSON API) may have added to"""
+        with self.main.pool.connection() as conn:
+            self._names = dict(conn.execute("SELECT id, name FROM locations ORDER BY id").fetchall())
+
+    def names(self):
+        """``{location_id: name}`` in the order locations were added"""
+        self._load_names()
+        return dict(self._names)
+
+    def store(self, location_id):
+        """The InventoryStore of ``location_id``, refreshed from its database (see InventoryStore.refresh)"""
+        store = self._stores.get(location_id)
+        if store is None:
+            with self._lock:
+                if location_id not in self._names:
+                    self._load_names()
+                if location_id not in self._names:
+                    raise LookupError(f"Location {location_id} not found")
+                store = self._stores.get(location_id)
+                if store is None:
+                    store = self._stores[location_id] = InventoryStore(
+                        partition_path(self.path, location_id), write_behind=self.write_behind, seed=False
+                    )
+        store.refresh()
+        return store
+
+    def add_location(self, name, copy_from=None):
+        """Add a location with an empty store, or with ``copy_from``'s products at zero stock; returns its ID"""
+        name = (name or "").strip()
+        if not name:
+            raise ValueError("Please enter a location name")
+        with self._lock:
+            if name.lower() in {existing.lower() for existing in self.names().values()}:
+                raise ValueError(f"Location {name} already exists")
+            source = None if copy_from is None else self.store(copy_from)
+            with self.main.pool.transaction() as conn:
+                location_id = conn.execute("INSERT INTO locations (name) VALUES (?)", (name,)).lastrowid
+            self._names[location_id] = name
+            store = self.store(location_id)
+        if source is not None:
+            store.upsert_products({key: dict(p, quantity=0) for key, p in source.get_products().items()})
+        return location_id
+
+    # -------------------------------------------------------------- transfers
+
+    def transfer(self, key, quantity, source, destination):
+        """Move ``quantity`` units of product ``key`` from location ``source`` to ``destination``.
+
+        A destination that does not stock the product yet gets it with the
+        source's details. Returns the transfer ID.
+        """
+        if source == destination:
+            raise ValueError("Pick two different locations")
+        if quantity <= 0:
+            raise ValueError("Quantity must be at least 1")
+        with self._lock:
+            from_store, to_store = self.store(source), self.store(destination)
+            product = from_store.get_product(key)
+            if product is None:
+                raise ValueError(f"Product {key} not found at {self._names[source]}")
+            stocked = to_store.get_product(key)
+            if stocked is not None and stocked["name"] != product["name"]:
+                raise ValueError(f"Product {key} is {stocked['name']} at {self._names[destination]}, "
+                                 f"not {product['name']}")
+            if product["quantity"] < quantity:
+                raise ValueError(f"Not enough stock at {self._names[source]}: {product['quantity']} units")
+            if stocked is None:
+                # Before any unit leaves the source, so a destination that refuses it (e.g. its
+                # barcode belongs to another product there) stops the transfer with nothing moved
+                self._stock(to_store, key, product)
+            with self.main.pool.transaction() as conn:
+                transfer_id = conn.execute(
+                    "INSERT INTO transfers (product_id, quantity, source, destination, status, date) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, quantity, source, destination, PENDING, _now())
+                ).lastrowid
+            transfer = self.get_transfer(transfer_id)
+            try:
+                from_store.adjust_stock(key, -quantity, self._reference(transfer, out=True), movements.TRANSFER)
+            except ValueError:
+                # Sold out between the check and the adjustment
+                self._set_status(transfer_id, CANCELLED)
+                raise
+            self._set_status(transfer_id, SENT)
+            self._receive(transfer)
+        return transfer_id
+
+    def _receive(self, transfer):
+        """Put a sent transfer's units into its destination"""
+        key = transfer["product_id"]
+        to_store = self.store(transfer["destination"])
+        if to_store.get_product(key) is None:
+            # Only when recovering: transfer() stocks the product before sending
+            product = self.store(transfer["source"]).get_product(key)
+            if product is None:
+                log.warning("Transfer #%s stays in transit: product %s is gone from its source", transfer["id"], key)
+                return
+            self._stock(to_store, key, product)
+        to_store.adjust_stock(key, transfer["quantity"], self._reference(transfer, out=False), movements.TRANSFER)
+        self._set_status(transfer["id"], RECEIVED)
+
+    @staticmethod
+    def _stock(store, key, product):
+        """Add ``product`` to ``store`` at zero stock; raises ValueError if ``store`` refuses it"""
+        store.add_product(key, product["name"], product["price"], 0, product["expiry_date"], product["category"],
+                          product["barcode"], product["reorder_level"], product["reorder_quantity"])
+
+    def _reference(self, transfer, out):
+        """Ledger reference of a transfer's leg in the source (``out``) or destination store"""
+        if out:
+            return f"Transfer #{transfer['id']} to {self._names[transfer['destination']]}"
+        return f"Transfer #{transfer['id']} from {self._names[transfer['source']]}"
+
+    def get_transfer(self, transfer_id):
+        """One transfer as a dict (``id``, ``product_id``, ``quantity``, ``source``, ``destination``, ``status``, ``date``)"""
+        with self.main.pool.connection() as conn:
+            row = conn.execute("SELECT * FROM transfers WHERE id = ?", (transfer_id,)).fetchone()
+        if row is None:
+            raise LookupError(f"Transfer {transfer_id} not found")
+        return dict(row)
+
+    def _set_status(self, transfer_id, status):
+        with self.main.pool.transaction() as conn:
+            conn.execute("UPDATE transfers SET status = ? WHERE id = ?", (status, transfer_id))
+
+    def recover(self):
+        """Finish or cancel transfers a crash interrupted; returns how many there were.
+
+        A pending transfer whose units never left the source is cancelled;
+        one that left is completed. Transfers younger than RECOVER_AFTER
+        are skipped, since another process may still be making them, and
+        one that cannot be finished is logged and left for the next try.
+        """
+        cutoff = (datetime.now() - RECOVER_AFTER).strftime("%Y-%m-%d %H:%M:%S")
+        with self.main.pool.connection() as conn:
+            unfinished = [dict(row) for row in conn.execute(
+                "SELECT * FROM transfers WHERE status IN (?, ?) AND date < ? ORDER BY id", (PENDING, SENT, cutoff)
+            )]
+        with self._lock:
+            for transfer in unfinished:
+                try:
+                    self._recover(transfer)
+                except Exception:
+                    log.exception("Transfer #%s could not be recovered", transfer["id"])
+        return len(unfinished)
+
+    def _recover(self, transfer):
+        key = transfer["product_id"]
+        if transfer["status"] == PENDING:
+            if self.store(transfer["source"]).find_movement(key, self._reference(transfer, out=True)) is None:
+                self._set_status(transfer["id"], CANCELLED)
+                return
+            self._set_status(transfer["id"], SENT)
+        if self.store(transfer["destination"]).find_movement(key, self._reference(transfer, out=False)):
+            self._set_status(transfer["id"], RECEIVED)
+        else:
+            self._receive(transfer)
+        log.warning("Recovered transfer #%s", transfer["id"])
+
+    def transfers(self, limit=50, location_id=None):
+        """Newest transfers first, optionally only those in or out of ``location_id``"""
+        where = "" if location_id is None else "WHERE source = ? OR destination = ?"
+        params = [] if location_id is None else [location_id, location_id]
+        with self.main.pool.connection() as conn:
+            rows = conn.execute(f"SELECT * FROM transfers {where} ORDER BY id DESC LIMIT ?", params + [limit])
+            return [dict(row) for row in rows]
+
+    # ---------------------------------------------------------------- rollups
+
+    def rollup(self):
+        """One row of stock and sales totals per location, from each store's running aggregates"""
+        rows = []
+        for location_id, name in self.names().items():
+            store = self.store(location_id)
+            stats = store.get_stats()
+            low, stocked_out = store.low_stock_counts()
+            sales = store.sales_summary()
+            rows.append({
+                "id": location_id,
+                "name": name,
+                "products": stats["total_skus"],
+                "units": stats["total_units"],
+                "stock_value": stats["stock_value"],
+                "low_stock": low,
+                "stocked_out": stocked_out,
+                "sales": sales["count"],
+                "revenue": sales["total"]
+            })
+        return rows
+
+    def sales_series(self, grain="day", start=None, end=None):
+        """``[{"location", "bucket", "bills", "revenue"}]`` from every store's sales rollup table"""
+        return [
+            dict(row, location=name)
+            for location_id, name in self.names().items()
+            for row in self.store(location_id).sales_series(grain, start, end)
+        ]
+
+    def close(self):
+        for store in self._stores.values():
+            store.close()
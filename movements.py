@@ -0,0 +1,227 @@
+"""Append-only ledger of stock movements kept in SQLite, with snapshots.
+
+Every write that changes a product's quantity appends one row per product
+to ``stock_movements`` in the same transaction: the change (``delta``),
+the quantity it left behind and what caused it (``kind`` plus a free-text
+``reference`` such as ``Sale #12`` or the stock-take it belongs to).
+
+A snapshot stores every product's quantity as of one movement ID, so the
+stock at any point is the nearest earlier snapshot plus the movements
+after it - never a scan of the whole history. The store copies one every
+``SNAPSHOT_INTERVAL`` movements on a background thread (``copy_snapshot``),
+outside the writes that recorded them, and ``compact`` folds old
+movements into a snapshot and deletes them; that is the only way rows
+leave the ledger.
+"""
+
+SCHEMA = """
+CREATE TABLE stock_movements (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    product_id INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    delta INTEGER NOT NULL,
+    quantity INTEGER NOT NULL,
+    reference TEXT,
+    date TEXT NOT NULL
+);
+CREATE INDEX idx_stock_movements_product ON stock_movements (product_id, id);
+CREATE INDEX idx_stock_movements_date ON stock_movements (date);
+"""
+
+# Snapshot tables; the first snapshot is the stock on record when the migration runs
+SNAPSHOT_SCHEMA = """
+CREATE TABLE stock_snapshots (
+    movement_id INTEGER PRIMARY KEY,
+    date TEXT NOT NULL
+);
+CREATE TABLE stock_snapshot_lines (
+    movement_id INTEGER NOT NULL REFERENCES stock_snapshots (movement_id) ON DELETE CASCADE,
+    product_id INTEGER NOT NULL,
+    quantity INTEGER NOT NULL,
+    PRIMARY KEY (movement_id, product_id)
+);
+INSERT INTO stock_snapshots (movement_id, date)
+SELECT COALESCE(MAX(id), 0), datetime('now', 'localtime') FROM stock_movements;
+INSERT INTO stock_snapshot_lines (movement_id, product_id, quantity)
+SELECT (SELECT MAX(movement_id) FROM stock_snapshots), id, quantity FROM products;
+"""
+
+# Movement kinds
+RECEIPT = "receipt"
+SALE = "sale"
+ADJUSTMENT = "adjustment"
+COUNT = "count"
+DELETE = "delete"
+TRANSFER = "transfer"
+
+# Movements between automatic snapshots, and snapshot lines written per transaction when copying one
+SNAPSHOT_INTERVAL = 10000
+SNAPSHOT_CHUNK = 10000
+
+# Snapshots copied in chunks are marked complete once every line is in
+SNAPSHOT_COMPLETE_SCHEMA = """
+ALTER TABLE stock_snapshots ADD COLUMN complete INTEGER NOT NULL DEFAULT 1;
+"""
+
+
+def record_movements(conn, rows):
+    """Append ``(product_id, kind, delta, quantity, reference, date)`` rows"""
+    conn.executemany(
+        "INSERT INTO stock_movements (product_id, kind, delta, quantity, reference, date) VALUES (?, ?, ?, ?, ?, ?)",
+        rows
+    )
+
+
+def find_movement(conn, product_id, reference):
+    """Newest movement of ``product_id`` with ``reference`` (e.g. ``Transfer #3``), or None"""
+    return conn.execute(
+        "SELECT id, product_id, kind, delta, quantity, reference, date FROM stock_movements "
+        "WHERE product_id = ? AND reference = ? ORDER BY id DESC LIMIT 1",
+        (product_id, reference)
+    ).fetchone()
+
+
+def recent_movements(conn, limit=100, product_id=None):
+    """Newest movements first, optionally for one product"""
+    if product_id is None:
+        return conn.execute(
+            "SELECT id, product_id, kind, delta, quantity, reference, date FROM stock_movements "
+            "ORDER BY id DESC LIMIT ?",
+            (limit,)
+        ).fetchall()
+    return conn.execute(
+        "SELECT id, product_id, kind, delta, quantity, reference, date FROM stock_movements "
+        "WHERE product_id = ? ORDER BY id DESC LIMIT ?",
+        (product_id, limit)
+    ).fetchall()
+
+
+def _last_movement(conn, date=None):
+    """ID of the last movement (on or before ``date``), 0 if there is none"""
+    if date is None:
+        row = conn.execute("SELECT MAX(id) FROM stock_movements").fetchone()
+    else:
+        row = conn.execute("SELECT MAX(id) FROM stock_movements WHERE date <= ?", (date,)).fetchone()
+    return row[0] or 0
+
+
+def _last_snapshot(conn, movement_id=None):
+    """Movement ID of the latest snapshot (at or before ``movement_id``), or None"""
+    if movement_id is None:
+        return conn.execute("SELECT MAX(movement_id) FROM stock_snapshots WHERE complete").fetchone()[0]
+    return conn.execute(
+        "SELECT MAX(movement_id) FROM stock_snapshots WHERE complete AND movement_id <= ?", (movement_id,)
+    ).fetchone()[0]
+
+
+def _add_snapshot(conn, movement_id, date, complete=True):
+    """Insert a snapshot header, replacing one a background copy left incomplete (its lines cascade)"""
+    conn.execute("DELETE FROM stock_snapshots WHERE movement_id = ? AND NOT complete", (movement_id,))
+    conn.execute(
+        "INSERT INTO stock_snapshots (movement_id, date, complete) VALUES (?, ?, ?)",
+        (movement_id, date, int(complete))
+    )
+
+
+def take_snapshot(conn, date):
+    """Snapshot the products table as of the last movement; call inside the writing transaction"""
+    movement_id = _last_movement(conn)
+    if _last_snapshot(conn) == movement_id:
+        return movement_id
+    _add_snapshot(conn, movement_id, date)
+    conn.execute(
+        "INSERT INTO stock_snapshot_lines (movement_id, product_id, quantity) SELECT ?, id, quantity FROM products",
+        (movement_id,)
+    )
+    return movement_id
+
+
+def copy_snapshot(read_conn, transaction, date, chunk_rows=SNAPSHOT_CHUNK):
+    """Snapshot the products table without holding the write lock for the whole copy.
+
+    The quantities are read in one read transaction on ``read_conn``, which
+    WAL keeps at a fixed point, and written ``chunk_rows`` lines at a time
+    through ``transaction()`` (e.g. ``ConnectionPool.transaction``), so
+    checkouts get the lock between chunks. The snapshot only counts once
+    it is marked complete. Returns the movement ID it covers.
+    """
+    read_conn.execute("BEGIN")
+    try:
+        movement_id = _last_movement(read_conn)
+        if _last_snapshot(read_conn) == movement_id:
+            return movement_id
+        with transaction() as conn:
+            if _last_snapshot(conn) == movement_id:
+                return movement_id
+            _add_snapshot(conn, movement_id, date, complete=False)
+        rows = read_conn.execute("SELECT id, quantity FROM products")
+        while True:
+            chunk = rows.fetchmany(chunk_rows)
+            if not chunk:
+                break
+            with transaction() as conn:
+                conn.executemany(
+                    "INSERT INTO stock_snapshot_lines (movement_id, product_id, quantity) VALUES (?, ?, ?)",
+                    [(movement_id, key, quantity) for key, quantity in chunk]
+                )
+        with transaction() as conn:
+            conn.execute("UPDATE stock_snapshots SET complete = 1 WHERE movement_id = ?", (movement_id,))
+        return movement_id
+    finally:
+        read_conn.execute("COMMIT")
+
+
+def movements_since_snapshot(conn):
+    """Number of movements recorded after the latest snapshot"""
+    return _last_movement(conn) - (_last_snapshot(conn) or 0)
+
+
+def _stock_at_movement(conn, movement_id, product_id=None):
+    """``{product_id: quantity}`` just after ``movement_id``: nearest snapshot plus the movements since"""
+    base = _last_snapshot(conn, movement_id)
+    if base is None:
+        raise ValueError("No stock history that far back (it may have been compacted)")
+    product_filter = "" if product_id is None else " AND product_id = ?"
+    extra = [] if product_id is None else [product_id]
+    stock = dict(conn.execute(
+        f"SELECT product_id, quantity FROM stock_snapshot_lines WHERE movement_id = ?{product_filter}",
+        [base] + extra
+    ).fetchall())
+    for key, delta in conn.execute(
+        f"SELECT product_id, SUM(delta) FROM stock_movements WHERE id > ? AND id <= ?{product_filter} "
+        "GROUP BY product_id",
+        [base, movement_id] + extra
+    ):
+        stock[key] = stock.get(key, 0) + delta
+    return stock
+
+
+def stock_at(conn, date=None, product_id=None):
+    """``{product_id: quantity}`` as of ``date`` (``YYYY-MM-DD HH:MM:SS``; None = now).
+
+    Products deleted since the snapshot it starts from appear with
+    quantity 0. Raises ValueError if the movements for that time have been
+    compacted away.
+    """
+    return _stock_at_movement(conn, _last_movement(conn, date), product_id)
+
+
+def compact(conn, before, date):
+    """Fold movements dated before ``before`` into a snapshot and delete them.
+
+    The newest folded movement stays as the snapshot's anchor and older
+    snapshots go too, so point-in-time queries reach back to ``before`` at
+    most. Returns the number of movements removed.
+    """
+    movement_id = conn.execute("SELECT MAX(id) FROM stock_movements WHERE date < ?", (before,)).fetchone()[0]
+    if movement_id is None:
+        return 0
+    if _last_snapshot(conn, movement_id) != movement_id:
+        stock = _stock_at_movement(conn, movement_id)
+        _add_snapshot(conn, movement_id, date)
+        conn.executemany(
+            "INSERT INTO stock_snapshot_lines (movement_id, product_id, quantity) VALUES (?, ?, ?)",
+            [(movement_id, key, quantity) for key, quantity in stock.items() if quantity]
+        )
+    conn.execute("DELETE FROM stock_snapshots WHERE movement_id < ?", (movement_id,))
+    return conn.execute("DELETE FROM stock_movements WHERE id < ?", (movement_id,)).rowcount
@@ -0,0 +1,20 @@
+import math
+
+PAGE_SIZES = [12, 24, 48, 96]
+
+
+def page_count(total, page_size):
+    """Number of pages needed for ``total`` items (at least 1)"""
+    return max(1, math.ceil(total / page_size))
+
+
+def paginate(items, page, page_size):
+    """Slice of ``items`` for 1-based ``page``, clamped to the valid range.
+
+    Returns ``(page_items, page, pages)`` so callers can show "page x of y"
+    even when the requested page no longer exists after filtering.
+    """
+    pages = page_count(len(items), page_size)
+    page = min(max(1, int(page)), pages)
+    start = (page - 1) * page_size
+    return items[start:start + page_size], page, pages
@@ -0,0 +1,196 @@
+"""Receipts rendered from stored sale records (see InventoryStore.get_sales).
+
+Templates are ``string.Template`` objects built once at import, so a
+render is a handful of substitutions. Three outputs share one layout:
+
+* HTML for the app (one ``st.markdown`` call per receipt);
+* plain text sized for a thermal printer, optionally wrapped in ESC/POS
+  control codes;
+* PDF, written directly (one receipt-shaped page per sale, Courier text)
+  so no PDF library is needed.
+
+The ``render_*`` functions take one sale; ``render_batch`` takes many and
+returns a single HTML/text/PDF document for reprinting them together.
+"""
+import html
+from string import Template
+
+# Characters per line on a 80 mm thermal roll
+TEXT_WIDTH = 42
+
+TITLE = "INVOICE"
+FOOTER = "Thank you for your business!"
+
+# Output formats -> (file extension, MIME type)
+RECEIPT_FORMATS = {
+    "HTML": ("html", "text/html"),
+    "PDF": ("pdf", "application/pdf"),
+    "Text": ("txt", "text/plain"),
+    "ESC/POS": ("bin", "application/octet-stream")
+}
+
+HTML_RECEIPT = Template("""<div style='padding: 2rem; border-radius: 10px; background: white; border: 2px solid #667eea; margin-bottom: 1rem; page-break-after: always;'>
+<h2 style='text-align: center; color: #667eea;'>📋 INVOICE</h2>
+<hr>
+<p><strong>Bill No:</strong> $id</p>
+<p><strong>Customer:</strong> $customer</p>
+<p><strong>Date:</strong> $date</p>
+<hr>
+<table style='width: 100%;'>
+$lines
+</table>
+<hr>
+$totals
+<hr>
+<h3 style='color: #667eea;'>Grand Total: $total</h3>
+<p style='text-align: center; margin-top: 2rem;'>Thank you for your business! 🙏</p>
+</div>""")
+HTML_LINE = Template("<tr><td><strong>$name</strong></td><td>$quantity x $price</td><td style='text-align: right;'>$total</td></tr>")
+HTML_TOTAL = Template("<p><strong>$label:</strong> $amount</p>")
+HTML_DOCUMENT = Template("""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>$title</title></head>
+<body style='font-family: sans-serif; max-width: 40rem; margin: auto;'>
+$receipts
+</body></html>
+""")
+
+TEXT_HEADER = Template("Bill No: $id\nDate: $date\nCustomer: $customer")
+
+# ESC/POS control sequences
+ESC_INIT = b"\x1b@"
+ESC_CENTER = b"\x1ba\x01"
+ESC_LEFT = b"\x1ba\x00"
+ESC_BOLD_ON = b"\x1bE\x01"
+ESC_BOLD_OFF = b"\x1bE\x00"
+ESC_FEED_CUT = b"\n\n\n\x1dV\x00"
+
+# PDF page geometry, in points (Courier is 0.6 em wide)
+PDF_FONT_SIZE = 9
+PDF_LEADING = 11
+PDF_MARGIN = 18
+
+
+def _money(amount):
+    return f"Rs {amount:,.2f}"
+
+
+def _totals(sale):
+    """(label, text) rows shown above the grand total; zero discount/tax are left out"""
+    rows = [("Subtotal", _money(sale["subtotal"]))]
+    if sale["discount"]:
+        rows.append(("Discount", f"-{_money(sale['discount'])}"))
+    if sale["tax"]:
+        rows.append(("Tax/GST", f"+{_money(sale['tax'])}"))
+    return rows
+
+
+def render_html(sale):
+    """One receipt as an HTML fragment"""
+    return HTML_RECEIPT.substitute(
+        id=sale["id"],
+        customer=html.escape(sale["customer"]),
+        date=sale["date"],
+        lines="\n".join(
+            HTML_LINE.substitute(
+                name=html.escape(item["name"]),
+                quantity=item["quantity"],
+                price=_money(item["price"]),
+                total=_money(item["total"])
+            )
+            for item in sale["items"]
+        ),
+        totals="\n".join(HTML_TOTAL.substitute(label=label, amount=amount) for label, amount in _totals(sale)),
+        total=_money(sale["total"])
+    )
+
+
+def _text_parts(sale, width):
+    """(body, total line) of the text receipt; the title and footer are added by the callers"""
+    rule = "-" * width
+    lines = [TEXT_HEADER.substitute(id=sale["id"], date=sale["date"], customer=sale["customer"][:width - 10]), rule]
+    for item in sale["items"]:
+        lines.append(item["name"][:width])
+        detail = f"  {item['quantity']} x {_money(item['price'])}"
+        amount = _money(item["total"])
+        lines.append(detail + amount.rjust(width - len(detail)))
+    lines.append(rule)
+    for label, amount in _totals(sale):
+        lines.append(label + amount.rjust(width - len(label)))
+    lines.append(rule)
+    total = _money(sale["total"])
+    return "\n".join(lines), "TOTAL" + total.rjust(width - 5)
+
+
+def render_text(sale, width=TEXT_WIDTH):
+    """One receipt as plain text, ``width`` characters per line"""
+    body, total = _text_parts(sale, width)
+    return f"{TITLE.center(width).rstrip()}\n{body}\n{total}\n\n{FOOTER.center(width).rstrip()}\n"
+
+
+def render_escpos(sale, width=TEXT_WIDTH):
+    """One receipt as bytes for an ESC/POS thermal printer: bold centred title, bold total, paper cut"""
+    body, total = _text_parts(sale, width)
+    return b"".join([
+        ESC_INIT, ESC_CENTER, ESC_BOLD_ON, TITLE.encode(), b"\n", ESC_BOLD_OFF, ESC_LEFT,
+        body.encode("cp437", "replace"), b"\n",
+        ESC_BOLD_ON, total.encode("cp437"), ESC_BOLD_OFF, b"\n\n",
+        ESC_CENTER, FOOTER.encode(), ESC_FEED_CUT
+    ])
+
+
+def _pdf_string(line):
+    escaped = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    return b"(" + escaped.encode("latin-1", "replace") + b")"
+
+
+def _pdf(pages, width):
+    """Minimal PDF with one page per list of text lines, set in Courier"""
+    page_width = width * PDF_FONT_SIZE * 0.6 + 2 * PDF_MARGIN
+    # 1: catalog, 2: page tree, 3: font, then a page and a content stream per page
+    objects = [None, None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Courier >>"]
+    kids = []
+    for lines in pages:
+        page_height = len(lines) * PDF_LEADING + 2 * PDF_MARGIN
+        stream = b"BT /F1 %d Tf %d TL %d %.1f Td " % (
+            PDF_FONT_SIZE, PDF_LEADING, PDF_MARGIN, page_height - PDF_MARGIN - PDF_FONT_SIZE
+        ) + b" T* ".join(_pdf_string(line) + b" Tj" for line in lines) + b" ET"
+        page_number = len(objects) + 1
+        kids.append(b"%d 0 R" % page_number)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %.1f %.1f] /Resources << /Font << /F1 3 0 R >> >> "
+            b"/Contents %d 0 R >>" % (page_width, page_height, page_number + 1)
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[1] = b"<< /Type /Pages /Kids [" + b" ".join(kids) + b"] /Count %d >>" % len(pages)
+
+    out = [b"%PDF-1.4\n"]
+    offsets = []
+    position = len(out[0])
+    for number, body in enumerate(objects, start=1):
+        chunk = b"%d 0 obj\n" % number + body + b"\nendobj\n"
+        offsets.append(position)
+        out.append(chunk)
+        position += len(chunk)
+    out.append(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    out.extend(b"%010d 00000 n \n" % offset for offset in offsets)
+    out.append(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, position))
+    return b"".join(out)
+
+
+def render_pdf(sale, width=TEXT_WIDTH):
+    """One receipt as a single-page PDF"""
+    return render_batch([sale], "PDF", width)
+
+
+def render_batch(sales, fmt="HTML", width=TEXT_WIDTH):
+    """Many receipts as one document in a RECEIPT_FORMATS format (str for HTML/Text, bytes otherwise)"""
+    if fmt == "HTML":
+        return HTML_DOCUMENT.substitute(title="Receipts", receipts="\n".join(render_html(sale) for sale in sales))
+    if fmt == "Text":
+        return "\n\n".join(render_text(sale, width) for sale in sales)
+    if fmt == "ESC/POS":
+        return b"".join(render_escpos(sale, width) for sale in sales)
+    if fmt == "PDF":
+        return _pdf([render_text(sale, width).rstrip("\n").split("\n") for sale in sales], width)
+    raise ValueError(f"Unknown receipt format: {fmt}")
@@ -0,0 +1,94 @@
+"""Reorder points, the low-stock queue and suggested purchase orders.
+
+A product with a ``reorder_level`` above 0 is low once its quantity falls
+to that level. How urgently it needs ordering is its cover: quantity
+divided by reorder level, so a stock-out (0) comes first and a product
+exactly at its level (1) last.
+"""
+import bisect
+import csv
+import io
+
+# Column headers of the purchase order export, matching purchase_order_rows
+PO_COLUMNS = ["ID", "Product", "Category", "Barcode", "In Stock", "Reorder Level", "Order Quantity",
+              "Unit Price", "Line Cost"]
+
+
+def is_low(product):
+    """Whether a product is at or below its reorder level (0 = no reorder point)"""
+    level = product.get("reorder_level", 0)
+    return level > 0 and product["quantity"] <= level
+
+
+def suggested_order(product):
+    """Units to order: the product's reorder quantity, but at least enough to restock to twice its reorder level"""
+    return max(product.get("reorder_quantity", 0), 2 * product.get("reorder_level", 0) - product["quantity"])
+
+
+class ReorderQueue:
+    """Low-stock product IDs ordered by cover (quantity / reorder level), lowest first.
+
+    Only products at or below their reorder level are held, as a sorted
+    list of ``(cover, id)`` pairs, so listing the k most urgent is
+    O(k) and a stock change moves at most one entry (a bisect each way).
+    Kept current through ``update(key, old, new)`` like InventoryStats.
+    """
+
+    def __init__(self, products=None):
+        self._cover = {}
+        self._queue = []
+        for key, product in (products or {}).items():
+            if is_low(product):
+                self._cover[key] = product["quantity"] / product["reorder_level"]
+                self._queue.append((self._cover[key], key))
+        self._queue.sort()
+
+    def __len__(self):
+        return len(self._queue)
+
+    def __contains__(self, key):
+        return key in self._cover
+
+    def update(self, key, old, new):
+        cover = new["quantity"] / new["reorder_level"] if new is not None and is_low(new) else None
+        current = self._cover.get(key)
+        if cover == current:
+            return
+        if current is not None:
+            del self._queue[bisect.bisect_left(self._queue, (current, key))]
+            del self._cover[key]
+        if cover is not None:
+            self._cover[key] = cover
+            bisect.insort(self._queue, (cover, key))
+
+    def items(self, limit=None):
+        """Most urgent IDs first, at most ``limit`` of them"""
+        return [key for _, key in self._queue[:limit]]
+
+    def stocked_out(self):
+        """Number of low products with no stock at all"""
+        return bisect.bisect_left(self._queue, (0, float("inf")))
+
+
+def purchase_order_rows(products, ids):
+    """PO_COLUMNS rows for ``ids`` (``products`` is ``{id: product_dict}``), grouped by category"""
+    rows = []
+    for key in ids:
+        product = products[key]
+        order = suggested_order(product)
+        rows.append([
+            key, product["name"], product["category"], product.get("barcode") or "", product["quantity"],
+            product["reorder_level"], order, product["price"], round(order * product["price"], 2)
+        ])
+    # Stable sort keeps the most urgent first within each category
+    rows.sort(key=lambda row: row[2])
+    return rows
+
+
+def purchase_order_csv(products, ids):
+    """Suggested purchase order for ``ids`` as CSV text"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(PO_COLUMNS)
+    writer.writerows(purchase_order_rows(products, ids))
+    return buffer.getvalue()
@@ -0,0 +1,121 @@
+"""Hourly/daily/monthly sales rollups kept in SQLite.
+
+Sale dates are stored as ``YYYY-MM-DD HH:MM:SS``, so a bucket is simply a
+prefix of the date: ``2026-10-18 13`` (hour), ``2026-10-18`` (day) or
+``2026-10`` (month). ``record_sale`` upserts the sale into every grain
+inside the checkout transaction, so the charts and top-seller tables read
+a handful of precomputed rows instead of rescanning raw sales.
+"""
+from datetime import datetime, timedelta
+
+# Grain -> length of the date prefix that identifies its bucket
+GRAINS = {"hour": 13, "day": 10, "month": 7}
+
+SCHEMA = """
+CREATE TABLE sales_rollups (
+    grain TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    bills INTEGER NOT NULL,
+    revenue REAL NOT NULL,
+    PRIMARY KEY (grain, bucket)
+);
+CREATE TABLE product_rollups (
+    grain TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    product_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    category TEXT NOT NULL,
+    units INTEGER NOT NULL,
+    revenue REAL NOT NULL,
+    PRIMARY KEY (grain, bucket, product_id)
+);
+CREATE INDEX idx_product_rollups_category ON product_rollups (grain, bucket, category);
+""" + "".join(f"""
+INSERT INTO sales_rollups (grain, bucket, bills, revenue)
+SELECT '{grain}', substr(date, 1, {length}), COUNT(*), SUM(total) FROM sales GROUP BY 2;
+INSERT INTO product_rollups (grain, bucket, product_id, name, category, units, revenue)
+SELECT '{grain}', substr(s.date, 1, {length}), i.product_id, MAX(i.name), COALESCE(MAX(p.category), 'Unknown'),
+       SUM(i.quantity), SUM(i.total)
+FROM sale_items i JOIN sales s ON s.id = i.sale_id LEFT JOIN products p ON p.id = i.product_id
+GROUP BY 2, 3;
+""" for grain, length in GRAINS.items())
+
+
+def trend_start(grain, buckets, now=None):
+    """Start of the oldest of the last ``buckets`` ``grain`` buckets, as YYYY-MM-DD HH"""
+    now = now or datetime.now()
+    if grain == "hour":
+        start = now.replace(minute=0, second=0, microsecond=0) - timedelta(hours=buckets - 1)
+    elif grain == "day":
+        start = datetime(now.year, now.month, now.day) - timedelta(days=buckets - 1)
+    else:
+        months = now.year * 12 + now.month - 1 - (buckets - 1)
+        start = datetime(months // 12, months % 12 + 1, 1)
+    return start.strftime("%Y-%m-%d %H")
+
+
+def record_sale(conn, date, items, categories, total):
+    """Add one sale to every grain; ``categories`` maps product ID -> category"""
+    for grain, length in GRAINS.items():
+        bucket = date[:length]
+        conn.execute(
+            "INSERT INTO sales_rollups (grain, bucket, bills, revenue) VALUES (?, ?, 1, ?) "
+            "ON CONFLICT (grain, bucket) DO UPDATE SET bills = bills + 1, revenue = revenue + excluded.revenue",
+            (grain, bucket, total)
+        )
+        conn.executemany(
+            "INSERT INTO product_rollups (grain, bucket, product_id, name, category, units, revenue) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (grain, bucket, product_id) DO UPDATE SET "
+            "units = units + excluded.units, revenue = revenue + excluded.revenue",
+            [(grain, bucket, item["key"], item["name"], categories.get(item["key"], "Unknown"),
+              item["quantity"], item["total"])
+             for item in items]
+        )
+
+
+def _bucket_range(grain, start, end):
+    """WHERE clause and params limiting buckets to ``[start, end]`` (bucket-prefix strings)"""
+    clause = "grain = ?"
+    params = [grain]
+    if start:
+        clause += " AND bucket >= ?"
+        params.append(str(start)[:GRAINS[grain]])
+    if end:
+        clause += " AND bucket <= ?"
+        params.append(str(end)[:GRAINS[grain]])
+    return clause, params
+
+
+def sales_series(conn, grain="day", start=None, end=None):
+    """``[(bucket, bills, revenue)]`` in bucket order"""
+    clause, params = _bucket_range(grain, start, end)
+    return conn.execute(
+        f"SELECT bucket, bills, revenue FROM sales_rollups WHERE {clause} ORDER BY bucket", params
+    ).fetchall()
+
+
+def bill_count(conn, grain="day", start=None, end=None):
+    """Number of bills in the buckets; it goes up whenever a sale lands in one, so it can key their cached totals"""
+    clause, params = _bucket_range(grain, start, end)
+    return conn.execute(f"SELECT COALESCE(SUM(bills), 0) FROM sales_rollups WHERE {clause}", params).fetchone()[0]
+
+
+def top_products(conn, grain="day", start=None, end=None, limit=10):
+    """``[(product_id, name, category, units, revenue)]``, best sellers by units first (every product if ``limit`` is None)"""
+    clause, params = _bucket_range(grain, start, end)
+    return conn.execute(
+        "SELECT product_id, MAX(name), MAX(category), SUM(units) AS units, SUM(revenue) "
+        f"FROM product_rollups WHERE {clause} GROUP BY product_id ORDER BY units DESC LIMIT ?",
+        params + [-1 if limit is None else limit]
+    ).fetchall()
+
+
+def category_sales(conn, grain="day", start=None, end=None):
+    """``[(category, units, revenue)]``, highest revenue first"""
+    clause, params = _bucket_range(grain, start, end)
+    return conn.execute(
+        "SELECT category, SUM(units), SUM(revenue) AS revenue "
+        f"FROM product_rollups WHERE {clause} GROUP BY category ORDER BY revenue DESC",
+        params
+    ).fetchall()
@@ -0,0 +1,158 @@
+import heapq
+
+NGRAM = 3
+
+
+def ngrams(text, n=NGRAM):
+    """Set of all length-``n`` substrings of ``text``"""
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+class TextIndex:
+    """Case-insensitive substring search over short texts, keyed by any hashable.
+
+    Texts are lowercased once when added. Terms of three or more characters
+    intersect the trigram posting sets and only check the few surviving
+    texts; shorter terms scan the pre-lowercased texts of the candidates.
+    """
+
+    def __init__(self):
+        self._texts = {}
+        self._grams = {}
+
+    def __len__(self):
+        return len(self._texts)
+
+    def keys(self):
+        """All keys, in the order they were added"""
+        return self._texts.keys()
+
+    def text(self, key):
+        """Lowercased text stored for ``key``"""
+        return self._texts[key]
+
+    def add(self, key, text):
+        text = text.lower()
+        self._texts[key] = text
+        for gram in ngrams(text):
+            self._grams.setdefault(gram, set()).add(key)
+
+    def remove(self, key):
+        for gram in ngrams(self._texts.pop(key)):
+            keys = self._grams[gram]
+            keys.discard(key)
+            if not keys:
+                del self._grams[gram]
+
+    def search(self, term, candidates=None):
+        """Keys whose text contains ``term``, optionally restricted to the ``candidates`` set"""
+        term = term.lower()
+        if len(term) >= NGRAM:
+            postings = sorted((self._grams.get(gram, set()) for gram in ngrams(term)), key=len)
+            keys = set(postings[0])
+            for posting in postings[1:]:
+                keys &= posting
+                if not keys:
+                    break
+            if candidates is not None:
+                keys &= candidates
+        else:
+            keys = self._texts.keys() if candidates is None else candidates
+        texts = self._texts
+        return {key for key in keys if term in texts[key]}
+
+
+class SearchIndex:
+    """In-memory product lookup: trigram name index, category index and barcode/ID lookup.
+
+    Kept current through ``update(key, old, new)`` like InventoryStats, so
+    names are lowercased once when indexed, not on every search.
+    """
+
+    def __init__(self, products=None):
+        self._names = TextIndex()
+        self._by_category = {}
+        self._by_barcode = {}
+        for key, product in (products or {}).items():
+            self.update(key, None, product)
+
+    def update(self, key, old, new):
+        # Stock changes are by far the most common update and touch nothing indexed
+        if old is not None and new is not None and (
+            old["name"] == new["name"]
+            and old["category"] == new["category"]
+            and old.get("barcode") == new.get("barcode")
+        ):
+            return
+        if old is not None:
+            self._remove(key, old)
+        if new is not None:
+            self._add(key, new)
+
+    def _add(self, key, product):
+        self._names.add(key, product["name"])
+        self._by_category.setdefault(product["category"], set()).add(key)
+        if product.get("barcode"):
+            self._by_barcode[product["barcode"]] = key
+
+    def _remove(self, key, product):
+        self._names.remove(key)
+        keys = self._by_category[product["category"]]
+        keys.discard(key)
+        if not keys:
+            del self._by_category[product["category"]]
+        if product.get("barcode") and self._by_barcode.get(product["barcode"]) == key:
+            del self._by_barcode[product["barcode"]]
+
+    def barcodes(self):
+        """Copy of the barcode -> product ID map"""
+        return dict(self._by_barcode)
+
+    def lookup(self, code):
+        """Product ID for an exact barcode or numeric ID, or None"""
+        code = str(code).strip()
+        if code in self._by_barcode:
+            return self._by_barcode[code]
+        if code.isdigit() and int(code) in self._names.keys():
+            return int(code)
+        return None
+
+    def suggest(self, term, limit=10):
+        """Top ``limit`` IDs for a typeahead box: exact barcode/ID first, then names starting with ``term``.
+
+        Terms shorter than NGRAM only match exactly, so a keystroke costs a
+        trigram lookup plus the names sharing those trigrams instead of a
+        scan of the catalogue, and a barcode scan is a single dict lookup.
+        """
+        term = (term or "").strip()
+        exact = self.lookup(term)
+        suggestions = [] if exact is None else [exact]
+        if len(term) >= NGRAM:
+            lowered = term.lower()
+            text = self._names.text
+            matches = self._names.search(term)
+            matches.discard(exact)
+            suggestions += heapq.nsmallest(
+                limit - len(suggestions), matches,
+                key=lambda key: (not text(key).startswith(lowered), text(key), key)
+            )
+        return suggestions[:limit]
+
+    def search(self, term="", category=None):
+        """IDs whose name contains ``term`` (case-insensitive), optionally within ``category``.
+
+        An exact barcode or ID match is listed first.
+        """
+        term = (term or "").strip()
+        in_category = self._by_category.get(category, set()) if category else None
+
+        if not term:
+            if in_category is None:
+                return list(self._names.keys())
+            return sorted(in_category)
+
+        matches = sorted(self._names.search(term, in_category))
+        exact = self.lookup(term)
+        if exact is not None and exact not in matches and (in_category is None or exact in in_category):
+            matches.insert(0, exact)
+        return matches
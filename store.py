@@ -0,0 +1,1146 @@
+import atexit
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+import movements
+import rollups
+import writebehind
+from aggregates import InventoryStats
+from catalogue import Catalogue
+from expiry import ExpiryIndex
+from history import SalesIndex
+from instrumentation import METRICS, timed
+from reorder import ReorderQueue, purchase_order_csv
+from search import SearchIndex
+
+# Database file shared by every session of the Streamlit process
+DEFAULT_DB_PATH = os.environ.get(
+    "STOCK_DB_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "inventory.db")
+)
+
+# Products and categories a brand new database starts with
+SEED_PRODUCTS = {
+    1: {"name": "Soap", "price": 150, "quantity": 50, "expiry_date": "2025-05-10", "category": "Cosmetics"},
+    2: {"name": "Oil", "price": 200, "quantity": 40, "expiry_date": "2026-05-10", "category": "Grocery"},
+    3: {"name": "Shampoo", "price": 300, "quantity": 78, "expiry_date": "2027-09-10", "category": "Cosmetics"},
+    4: {"name": "Biscuit", "price": 40, "quantity": 69, "expiry_date": "2027-09-10", "category": "Grocery"}
+}
+SEED_CATEGORIES = {"Cosmetics", "Grocery"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS categories (
+    name TEXT PRIMARY KEY
+);
+
+CREATE TABLE IF NOT EXISTS products (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    price REAL NOT NULL,
+    quantity INTEGER NOT NULL CHECK (quantity >= 0),
+    expiry_date TEXT NOT NULL,
+    category TEXT NOT NULL,
+    version INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_products_category ON products (category);
+CREATE INDEX IF NOT EXISTS idx_products_name ON products (name COLLATE NOCASE);
+
+CREATE TABLE IF NOT EXISTS sales (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    customer TEXT NOT NULL,
+    subtotal REAL NOT NULL,
+    discount REAL NOT NULL DEFAULT 0,
+    tax REAL NOT NULL DEFAULT 0,
+    total REAL NOT NULL,
+    date TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sales_date ON sales (date);
+CREATE INDEX IF NOT EXISTS idx_sales_customer ON sales (customer COLLATE NOCASE);
+
+CREATE TABLE IF NOT EXISTS sale_items (
+    sale_id INTEGER NOT NULL REFERENCES sales (id),
+    product_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    price REAL NOT NULL,
+    quantity INTEGER NOT NULL,
+    total REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sale_items_sale ON sale_items (sale_id);
+CREATE INDEX IF NOT EXISTS idx_sale_items_product ON sale_items (product_id);
+"""
+
+# Schema changes applied in order on top of SCHEMA; PRAGMA user_version
+# records how many of them a database has already run
+MIGRATIONS = [
+    # 1: optional barcode for scanner lookups
+    """
+    ALTER TABLE products ADD COLUMN barcode TEXT;
+    CREATE UNIQUE INDEX idx_products_barcode ON products (barcode);
+    """,
+    # 2: hourly/daily/monthly sales rollups, backfilled from existing sales
+    rollups.SCHEMA,
+    # 3: audit log of manual adjustments and stock-takes
+    movements.SCHEMA,
+    # 4: ledger snapshots, starting from the stock on record
+    movements.SNAPSHOT_SCHEMA,
+    # 5: reorder points (0 = never reorder) and order quantities
+    """
+    ALTER TABLE products ADD COLUMN reorder_level INTEGER NOT NULL DEFAULT 0 CHECK (reorder_level >= 0);
+    ALTER TABLE products ADD COLUMN reorder_quantity INTEGER NOT NULL DEFAULT 0 CHECK (reorder_quantity >= 0);
+    """,
+    # 6: counter bumped by every write, so a process can tell another one changed the database
+    """
+    CREATE TABLE store_version (id INTEGER PRIMARY KEY CHECK (id = 1), version INTEGER NOT NULL);
+    INSERT INTO store_version (id, version) VALUES (1, 0);
+    """,
+    # 7: the store_version at which each product last changed and each sale was written,
+    # so a reload reads only what changed since the version it last saw
+    """
+    CREATE TABLE product_changes (product_id INTEGER PRIMARY KEY, version INTEGER NOT NULL);
+    CREATE INDEX idx_product_changes_version ON product_changes (version);
+    CREATE TRIGGER products_inserted AFTER INSERT ON products BEGIN
+        INSERT INTO product_changes VALUES (NEW.id, (SELECT version FROM store_version))
+            ON CONFLICT (product_id) DO UPDATE SET version = excluded.version;
+    END;
+    CREATE TRIGGER products_updated AFTER UPDATE ON products BEGIN
+        INSERT INTO product_changes VALUES (NEW.id, (SELECT version FROM store_version))
+            ON CONFLICT (product_id) DO UPDATE SET version = excluded.version;
+    END;
+    CREATE TRIGGER products_deleted AFTER DELETE ON products BEGIN
+        INSERT INTO product_changes VALUES (OLD.id, (SELECT version FROM store_version))
+            ON CONFLICT (product_id) DO UPDATE SET version = excluded.version;
+    END;
+    ALTER TABLE sales ADD COLUMN version INTEGER NOT NULL DEFAULT 0;
+    CREATE INDEX idx_sales_version ON sales (version);
+    """,
+    # 8: ledger snapshots copied in chunks, off the write path
+    movements.SNAPSHOT_COMPLETE_SCHEMA,
+]
+
+
+log = logging.getLogger(__name__)
+
+# Queue checkouts in memory and write them in the background (see writebehind.py)
+WRITE_BEHIND = os.environ.get("STOCK_WRITE_BEHIND") == "1"
+
+
+def _now():
+    """Current time in the format every stored date uses"""
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _db_version(conn):
+    """Writes counted in store_version so far, by every process"""
+    return conn.execute("SELECT version FROM store_version").fetchone()[0]
+
+
+def _connect(path):
+    """Open a connection configured for concurrent readers (WAL mode)"""
+    conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    return conn
+
+
+class OutOfStockError(Exception):
+    """Raised when a checkout asks for more units than are in stock"""
+
+    def __init__(self, key, name, requested, available):
+        super().__init__(f"Not enough stock for {name}: requested {requested}, available {available}")
+        self.key = key
+        self.name = name
+        self.requested = requested
+        self.available = available
+
+
+class ExpiredProductError(Exception):
+    """Raised when a checkout includes a product that is past its expiry date"""
+
+    def __init__(self, key, name, expiry_date):
+        super().__init__(f"{name} expired on {expiry_date}")
+        self.key = key
+        self.name = name
+        self.expiry_date = expiry_date
+
+
+class ConnectionPool:
+    """Fixed-size pool of SQLite connections shared between script threads"""
+
+    def __init__(self, path, size=8):
+        self.path = path
+        self.size = size
+        self._idle = queue.Queue()
+        for _ in range(size):
+            self._idle.put(_connect(path))
+
+    @contextmanager
+    def connection(self):
+        conn = self._idle.get()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    @contextmanager
+    def transaction(self, synchronous=None):
+        """Run the block inside BEGIN IMMEDIATE ... COMMIT, rolling back on error.
+
+        ``synchronous="FULL"`` makes this one commit wait for an fsync.
+        """
+        with self.connection() as conn:
+            if synchronous:
+                conn.execute(f"PRAGMA synchronous={synchronous}")
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    yield conn
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+                conn.execute("COMMIT")
+            finally:
+                if synchronous:
+                    conn.execute("PRAGMA synchronous=NORMAL")
+
+    def close(self):
+        while not self._idle.empty():
+            self._idle.get_nowait().close()
+
+
+class InventoryStore:
+    """Products, categories and sales persisted in SQLite.
+
+    One instance is shared by all sessions (see ``get_store`` in app.py).
+    Products and categories are also kept in memory so reruns read them
+    without touching the database; every write goes to SQLite first and
+    only then updates the in-memory copy. The exception is checkout with
+    ``write_behind`` on: bills are applied in memory and written by a
+    SaleWriter thread a few milliseconds later (see writebehind.py).
+
+    Every write also bumps the ``store_version`` row. When it has moved
+    on without this instance, another process (e.g. the JSON API next to
+    the app) wrote to the database, and ``refresh`` or the next write
+    reads the products and sales changed since and applies them to the
+    in-memory copy.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH, pool_size=8, write_behind=WRITE_BEHIND, seed=True):
+        self.pool = ConnectionPool(path, pool_size)
+        self._lock = threading.RLock()
+        self._unsnapshotted = 0
+        self.writer = None
+        # Serialises write-behind batches without holding _lock, so checkouts never wait on the disk
+        self._flush_lock = threading.Lock()
+        # Background ledger snapshot copy (see _snapshot_if_due)
+        self._snapshot_lock = threading.Lock()
+        self._snapshotter = None
+        self._init_schema(seed)
+        self._products = {}
+        self._categories = set()
+        # Bumped by every write, so views cached on cache_key() are recomputed
+        self._versions = {"products": 0, "categories": 0, "sales": 0}
+        self._generation = uuid.uuid4().hex
+        with self.pool.connection() as conn:
+            self._load(conn)
+        if write_behind:
+            self.writer = writebehind.SaleWriter(self._write_behind)
+            # Streamlit never closes the shared store; write the queue on the way out
+            atexit.register(self.close)
+
+    def _init_schema(self, seed=True):
+        """Create or migrate the tables; a brand new database gets SEED_CATEGORIES, and SEED_PRODUCTS if ``seed``"""
+        with self.pool.connection() as conn:
+            conn.executescript(SCHEMA)
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            for number, script in enumerate(MIGRATIONS[version:], start=version + 1):
+                conn.executescript(f"BEGIN; {script}; PRAGMA user_version = {number}; COMMIT;")
+        with self.pool.transaction() as conn:
+            if conn.execute("SELECT COUNT(*) FROM categories").fetchone()[0] == 0:
+                conn.executemany(
+                    "INSERT INTO categories (name) VALUES (?)",
+                    [(name,) for name in sorted(SEED_CATEGORIES)]
+                )
+                if not seed:
+                    return
+                conn.executemany(
+                    "INSERT INTO products (id, name, price, quantity, expiry_date, category) VALUES (?, ?, ?, ?, ?, ?)",
+                    [(key, p["name"], p["price"], p["quantity"], p["expiry_date"], p["category"])
+                     for key, p in SEED_PRODUCTS.items()]
+                )
+                self._record_movements(conn, [
+                    (key, movements.RECEIPT, p["quantity"], p["quantity"], "Opening stock", _now())
+                    for key, p in SEED_PRODUCTS.items()
+                ])
+
+    @timed("store.load")
+    def _load(self, conn):
+        # Read first: a write landing during the load only makes the next check reload again
+        self._db_version = _db_version(conn)
+        rows = conn.execute(
+            "SELECT id, name, price, quantity, expiry_date, category, barcode, reorder_level, reorder_quantity "
+            "FROM products ORDER BY id"
+        ).fetchall()
+        self._categories = {row[0] for row in conn.execute("SELECT name FROM categories")}
+        self.sales_index = self._load_sales_index(conn)
+        # Write-behind sale IDs still reserved (see _reserve_sale_ids)
+        self._next_sale_id = self._sale_id_limit = 0
+        self._unsnapshotted = movements.movements_since_snapshot(conn)
+        self._products = {row["id"]: _product_from_row(row) for row in rows}
+        self.stats = InventoryStats(self._products)
+        self.search = SearchIndex(self._products)
+        self.catalogue = Catalogue(self._products)
+        self.expiry = ExpiryIndex(self._products)
+        self.reorder = ReorderQueue(self._products)
+
+    @timed("store.reload")
+    def _reload(self, conn):
+        """Apply what other processes wrote since ``_db_version``; call with the lock held and nothing unwritten.
+
+        Only the products in product_changes and the sales written after
+        that version are read, and each product goes through the same
+        per-product index updates as a local write. Anything this process
+        wrote itself is already in memory and is skipped.
+        """
+        since = self._db_version
+        # Read first: a write landing during the reload is only applied again by the next one
+        self._db_version = _db_version(conn)
+        changed = conn.execute(
+            "SELECT c.product_id, p.id, p.name, p.price, p.quantity, p.expiry_date, p.category, p.barcode, "
+            "p.reorder_level, p.reorder_quantity FROM product_changes c LEFT JOIN products p ON p.id = c.product_id "
+            "WHERE c.version > ?", (since,)
+        ).fetchall()
+        for row in changed:
+            product = None if row["id"] is None else _product_from_row(row)
+            if product != self._products.get(row["product_id"]):
+                self._set_product(row["product_id"], product)
+        categories = {row[0] for row in conn.execute("SELECT name FROM categories")}
+        if categories != self._categories:
+            self._categories = categories
+            self._versions["categories"] += 1
+        sales = [sale for sale in conn.execute(
+            "SELECT id, customer, total, date FROM sales WHERE version > ? ORDER BY id", (since,)
+        ) if sale["id"] not in self.sales_index]
+        for sale in sales:
+            self.sales_index.add(sale["id"], sale["customer"], sale["total"], sale["date"])
+        if sales:
+            self._versions["sales"] += 1
+        self._unsnapshotted = movements.movements_since_snapshot(conn)
+        log.info("%s was changed by another process: %d product(s) and %d sale(s) reloaded",
+                 self.pool.path, len(changed), len(sales))
+
+    def refresh(self):
+        """Apply other processes' writes to the in-memory copy (see ``_reload``); returns whether there were any.
+
+        Costs one single-row read when nothing changed, so it runs on every
+        rerun and API request (see Locations.store).
+        """
+        with self.pool.connection() as conn:
+            if _db_version(conn) == self._db_version:
+                return False
+        with self._lock:
+            # Our own queued sales go in first, so the reload includes them
+            self.flush()
+            with self.pool.connection() as conn:
+                if _db_version(conn) == self._db_version:
+                    return False
+                self._reload(conn)
+        return True
+
+    def _load_sales_index(self, conn):
+        """SalesIndex from its snapshot plus the sales after it, or rebuilt from every sale.
+
+        The snapshot is only trusted if the database holds exactly as many
+        sales up to its last ID as it indexes; otherwise it belongs to
+        another database or missed sales another process wrote.
+        """
+        path = writebehind.index_path(self.pool.path)
+        last_id, index = writebehind.load_index(path)
+        if index is not None:
+            on_disk = conn.execute("SELECT COUNT(*) FROM sales WHERE id <= ?", (last_id,)).fetchone()[0]
+            if on_disk != index.count:
+                log.warning("Sales index snapshot %s is out of date; rebuilding", path)
+                index = None
+        if index is None:
+            last_id = 0
+            index = SalesIndex()
+        start = index.count
+        index.extend(conn.execute("SELECT id, customer, total, date FROM sales WHERE id > ? ORDER BY id", (last_id,)))
+        self._index_saved = start
+        if index.count - start > writebehind.INDEX_SNAPSHOT_TAIL:
+            self._save_sales_index(index)
+        return index
+
+    def _save_sales_index(self, index):
+        writebehind.save_index(writebehind.index_path(self.pool.path), index, index.last_id)
+        self._index_saved = index.count
+
+    # ------------------------------------------------------------------ reads
+
+    def get_products(self):
+        """Snapshot of all products as ``{id: product_dict}``"""
+        with self._lock:
+            return dict(self._products)
+
+    def get_product(self, key):
+        return self._products.get(key)
+
+    def cache_key(self, *names):
+        """Key for a view derived from the named data ("products", "categories", "sales").
+
+        It changes whenever any of them is written, and differs between
+        store instances, so it can key caches shared across sessions.
+        """
+        with self._lock:
+            return (self._generation,) + tuple(self._versions[name] for name in names)
+
+    def get_categories(self):
+        with self._lock:
+            return set(self._categories)
+
+    def next_product_id(self):
+        with self._lock:
+            return max(self._products) + 1 if self._products else 1
+
+    @timed("store.query_sales")
+    def query_sales(self, customer="", order="newest", start=None, end=None):
+        """Sale IDs filtered by customer/date and ordered (see SalesIndex.query)"""
+        with self._lock:
+            return self.sales_index.query(customer, order, start, end)
+
+    def sales_summary(self):
+        """Number of sales and their combined bill total"""
+        with self._lock:
+            return {"count": self.sales_index.count, "total": self.sales_index.total_amount}
+
+    def sales_series(self, grain="day", start=None, end=None):
+        """Bills and revenue per hour/day/month bucket (see rollups.sales_series)"""
+        self.flush()
+        with self.pool.connection() as conn:
+            return [dict(row) for row in rollups.sales_series(conn, grain, start, end)]
+
+    def sales_bill_count(self, grain="day", start=None, end=None):
+        """Bills in the hour/day/month buckets of a date range (see rollups.bill_count)"""
+        self.flush()
+        with self.pool.connection() as conn:
+            return rollups.bill_count(conn, grain, start, end)
+
+    def top_products(self, start=None, end=None, limit=10, grain="day"):
+        """Best-selling products by units over a date range (all of them if ``limit`` is None)"""
+        self.flush()
+        with self.pool.connection() as conn:
+            return [
+                {"id": row[0], "name": row[1], "category": row[2], "units": row[3], "revenue": row[4]}
+                for row in rollups.top_products(conn, grain, start, end, limit)
+            ]
+
+    def category_sales(self, start=None, end=None, grain="day"):
+        """Units and revenue per category over a date range"""
+        self.flush()
+        with self.pool.connection() as conn:
+            return [
+                {"category": row[0], "units": row[1], "revenue": row[2]}
+                for row in rollups.category_sales(conn, grain, start, end)
+            ]
+
+    @timed("store.get_sales")
+    def get_sales(self, ids, batch_size=900):
+        """Sales with their ``items`` lists, in the order of ``ids``"""
+        ids = list(ids)
+        sales = {}
+        self.flush()
+        with self.pool.connection() as conn:
+            # Batches keep each IN (...) list under SQLite's bound-parameter limit
+            for start in range(0, len(ids), batch_size):
+                batch = ids[start:start + batch_size]
+                placeholders = ", ".join("?" * len(batch))
+                sales.update((row["id"], dict(row, items=[])) for row in conn.execute(
+                    f"SELECT id, customer, subtotal, discount, tax, total, date FROM sales WHERE id IN ({placeholders})",
+                    batch
+                ))
+                for row in conn.execute(
+                    "SELECT sale_id, product_id, name, price, quantity, total FROM sale_items "
+                    f"WHERE sale_id IN ({placeholders}) ORDER BY rowid",
+                    batch
+                ):
+                    sales[row["sale_id"]]["items"].append({
+                        "key": row["product_id"],
+                        "name": row["name"],
+                        "price": row["price"],
+                        "quantity": row["quantity"],
+                        "total": row["total"]
+                    })
+        return [sales[sale_id] for sale_id in ids if sale_id in sales]
+
+    def iter_sale_items(self, start=None, end=None, batch_size=5000):
+        """Yield lists of at most ``batch_size`` sale item rows, oldest sale first.
+
+        Each row is ``(sale_id, date, customer, product, quantity, price,
+        item_total, bill_total)``. ``start``/``end`` are optional
+        ``YYYY-MM-DD`` strings; both ends are inclusive.
+        """
+        conditions = []
+        params = []
+        if start:
+            conditions.append("s.date >= ?")
+            params.append(str(start))
+        if end:
+            # Dates are stored as "YYYY-MM-DD HH:MM:SS", so anything on the end day sorts below "~"
+            conditions.append("s.date <= ?")
+            params.append(f"{end}~")
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        self.flush()
+        with self.pool.connection() as conn:
+            cur = conn.execute(
+                "SELECT s.id, s.date, s.customer, i.name, i.quantity, i.price, i.total, s.total "
+                f"FROM sales s JOIN sale_items i ON i.sale_id = s.id {where} ORDER BY s.id, i.rowid",
+                params
+            )
+            while True:
+                rows = cur.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield [tuple(row) for row in rows]
+
+    def stock_movements(self, limit=100, product_id=None):
+        """Most recent ledger entries, newest first (see movements.recent_movements)"""
+        self.flush()
+        with self.pool.connection() as conn:
+            return [dict(row) for row in movements.recent_movements(conn, limit, product_id)]
+
+    def find_movement(self, product_id, reference):
+        """Newest ledger entry of ``product_id`` with ``reference`` as a dict, or None"""
+        self.flush()
+        with self.pool.connection() as conn:
+            row = movements.find_movement(conn, product_id, reference)
+        return None if row is None else dict(row)
+
+    def stock_at(self, date=None, product_id=None):
+        """``{product_id: quantity}`` rebuilt from the ledger as of ``date`` (see movements.stock_at)"""
+        self.flush()
+        with self.pool.connection() as conn:
+            conn.execute("BEGIN")
+            try:
+                return movements.stock_at(conn, date, product_id)
+            finally:
+                conn.execute("COMMIT")
+
+    def ledger_mismatches(self):
+        """Products whose quantity on record differs from the ledger: ``{id: (recorded, ledger)}``"""
+        with self._lock:
+            ledger = self.stock_at()
+            recorded = {key: product["quantity"] for key, product in self._products.items()}
+        return {
+            key: (recorded.get(key, 0), ledger.get(key, 0))
+            for key in recorded.keys() | ledger.keys()
+            if recorded.get(key, 0) != ledger.get(key, 0)
+        }
+
+    @timed("store.search")
+    def search_products(self, term="", category=None):
+        """IDs of products matching ``term`` (name, ID or barcode) and ``category``"""
+        with self._lock:
+            return self.search.search(term, category)
+
+    def suggest_products(self, term, limit=10):
+        """Top matches for a typeahead/barcode box (see SearchIndex.suggest)"""
+        with self._lock:
+            return self.search.suggest(term, limit)
+
+    def lookup_product(self, code):
+        """Product ID for an exact barcode or ID, or None"""
+        with self._lock:
+            return self.search.lookup(code)
+
+    def get_barcodes(self):
+        """Barcode -> product ID for every product that has one"""
+        with self._lock:
+            return self.search.barcodes()
+
+    @timed("store.sort")
+    def sort_products(self, ids, column="id", descending=False):
+        """Product IDs ordered by a catalogue column (see catalogue.COLUMNS)"""
+        with self._lock:
+            return self.catalogue.sort(ids, column, descending)
+
+    @timed("store.product_rows")
+    def product_rows(self, ids):
+        """DataFrame of the given products, in order"""
+        with self._lock:
+            return self.catalogue.rows(ids)
+
+    def catalogue_frame(self):
+        """DataFrame of the whole catalogue; shared between sessions, so treat it as read-only"""
+        with self._lock:
+            return self.catalogue.frame()
+
+    def expired_products(self, today=None):
+        """IDs past their expiry date, soonest expiry first"""
+        with self._lock:
+            return self.expiry.expired(today or datetime.now().date())
+
+    def expiring_products(self, days, today=None):
+        """IDs expiring within ``days`` days from today, soonest first"""
+        with self._lock:
+            return self.expiry.expiring(today or datetime.now().date(), days)
+
+    def is_expired(self, key, today=None):
+        return self.expiry.is_expired(key, today or datetime.now().date())
+
+    def low_stock(self, limit=None):
+        """IDs at or below their reorder level, most urgent (lowest cover) first"""
+        with self._lock:
+            return self.reorder.items(limit)
+
+    def low_stock_counts(self):
+        """``(low, stocked_out)`` numbers of products"""
+        with self._lock:
+            return len(self.reorder), self.reorder.stocked_out()
+
+    def purchase_order(self, ids=None):
+        """Suggested purchase order CSV for ``ids`` (default: every low-stock product)"""
+        with self._lock:
+            return purchase_order_csv(self._products, self.reorder.items() if ids is None else ids)
+
+    def get_stats(self):
+        """Catalogue totals (see InventoryStats.snapshot)"""
+        with self._lock:
+            return self.stats.snapshot()
+
+    # ----------------------------------------------------------------- writes
+
+    def _record_movements(self, conn, rows):
+        """Append ledger rows inside the current transaction (a snapshot falls due every SNAPSHOT_INTERVAL rows)"""
+        if rows:
+            movements.record_movements(conn, rows)
+            self._unsnapshotted += len(rows)
+
+    def _snapshot_if_due(self):
+        """Start copying a ledger snapshot on a background thread once SNAPSHOT_INTERVAL movements are unsnapshotted.
+
+        Called after the writing transaction commits, so no checkout ever
+        waits for the products table to be copied.
+        """
+        if self._unsnapshotted < movements.SNAPSHOT_INTERVAL:
+            return
+        with self._snapshot_lock:
+            if self._snapshotter is not None and self._snapshotter.is_alive():
+                return
+            self._unsnapshotted = 0
+            self._snapshotter = threading.Thread(target=self._copy_snapshot, name="ledger-snapshot", daemon=True)
+            self._snapshotter.start()
+
+    def _copy_snapshot(self):
+        # Its own connection for the long read, so the pool is left to the tills
+        conn = _connect(self.pool.path)
+        try:
+            movements.copy_snapshot(conn, self.pool.transaction, _now())
+        except Exception:
+            log.exception("Ledger snapshot of %s failed", self.pool.path)
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        """``pool.transaction()``, after any queued write-behind sales so writes reach SQLite in order.
+
+        Reloads the in-memory copy first if another process wrote since this
+        one last did, and counts the write in store_version.
+        """
+        self.flush()
+        with self.pool.transaction() as conn:
+            version = _db_version(conn)
+            if version != self._db_version:
+                self._reload(conn)
+            conn.execute("UPDATE store_version SET version = ?", (version + 1,))
+            yield conn
+        self._db_version = version + 1
+        self._snapshot_if_due()
+
+    def _set_product(self, key, product):
+        """Replace the cached product (None deletes it) and update the totals and indexes"""
+        old = self._products.get(key)
+        if product is None:
+            self._products.pop(key, None)
+        else:
+            self._products[key] = product
+        self.stats.update(key, old, product)
+        self.search.update(key, old, product)
+        self.catalogue.update(key, old, product)
+        self.expiry.update(key, old, product)
+        self.reorder.update(key, old, product)
+        self._versions["products"] += 1
+
+    def _add_category(self, name):
+        if name not in self._categories:
+            self._categories.add(name)
+            self._versions["categories"] += 1
+
+    def add_product(self, key, name, price, quantity, expiry_date, category, barcode=None,
+                    reorder_level=0, reorder_quantity=0):
+        """Insert a product (and its category if new); raises ValueError on duplicate ID or barcode"""
+        product = {
+            "name": name,
+            "price": price,
+            "quantity": quantity,
+            "expiry_date": str(expiry_date),
+            "category": category,
+            "barcode": barcode or None,
+            "reorder_level": reorder_level,
+            "reorder_quantity": reorder_quantity
+        }
+        with self._lock:
+            try:
+                with self._transaction() as conn:
+                    conn.execute(
+                        "INSERT INTO products (id, name, price, quantity, expiry_date, category, barcode, "
+                        "reorder_level, reorder_quantity) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (key, name, price, quantity, product["expiry_date"], category, product["barcode"],
+                         reorder_level, reorder_quantity)
+                    )
+                    conn.execute("INSERT OR IGNORE INTO categories (name) VALUES (?)", (category,))
+                    if quantity:
+                        self._record_movements(conn, [(key, movements.RECEIPT, quantity, quantity, "New product", _now())])
+            except sqlite3.IntegrityError as e:
+                if "barcode" in str(e):
+                    raise ValueError(f"Barcode {barcode} is already used by another product")
+                raise ValueError(f"Product ID {key} already exists")
+            self._set_product(key, product)
+            self._add_category(category)
+        return product
+
+    @timed("store.upsert_products")
+    def upsert_products(self, products):
+        """Insert or replace many products (``{id: product_dict}``) in one transaction.
+
+        Products without ``reorder_level``/``reorder_quantity`` keep the
+        ones they already have. Raises ValueError (and changes nothing) if a
+        barcode clashes with another product. Returns ``(inserted, updated)``
+        counts.
+        """
+        with self._lock:
+            products = {
+                key: dict(
+                    p,
+                    barcode=p.get("barcode"),
+                    reorder_level=p.get("reorder_level", self._products.get(key, {}).get("reorder_level", 0)),
+                    reorder_quantity=p.get("reorder_quantity", self._products.get(key, {}).get("reorder_quantity", 0))
+                )
+                for key, p in products.items()
+            }
+            try:
+                with self._transaction() as conn:
+                    conn.executemany(
+                        "INSERT INTO products (id, name, price, quantity, expiry_date, category, barcode, "
+                        "reorder_level, reorder_quantity) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                        "ON CONFLICT (id) DO UPDATE SET name = excluded.name, price = excluded.price, "
+                        "quantity = excluded.quantity, expiry_date = excluded.expiry_date, "
+                        "category = excluded.category, barcode = excluded.barcode, "
+                        "reorder_level = excluded.reorder_level, reorder_quantity = excluded.reorder_quantity, "
+                        "version = version + 1",
+                        [(key, p["name"], p["price"], p["quantity"], p["expiry_date"], p["category"], p["barcode"],
+                          p["reorder_level"], p["reorder_quantity"])
+                         for key, p in products.items()]
+                    )
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO categories (name) VALUES (?)",
+                        [(name,) for name in {p["category"] for p in products.values()}]
+                    )
+                    date = _now()
+                    self._record_movements(conn, [
+                        (key, movements.RECEIPT if key not in self._products else movements.ADJUSTMENT,
+                         p["quantity"] - self._products.get(key, {}).get("quantity", 0), p["quantity"], "Bulk import", date)
+                        for key, p in products.items()
+                        if p["quantity"] != self._products.get(key, {}).get("quantity", 0)
+                    ])
+            except sqlite3.IntegrityError as e:
+                raise ValueError(f"Import rejected: {e}")
+            updated = sum(1 for key in products if key in self._products)
+            for key, product in products.items():
+                self._set_product(key, product)
+                self._add_category(product["category"])
+        return len(products) - updated, updated
+
+    def adjust_stock(self, key, delta, reference=None, kind=movements.ADJUSTMENT):
+        """Add ``delta`` (may be negative) to a product's quantity and return the new quantity"""
+        with self._lock:
+            with self._transaction() as conn:
+                cur = conn.execute(
+                    "UPDATE products SET quantity = quantity + ?, version = version + 1 "
+                    "WHERE id = ? AND quantity + ? >= 0",
+                    (delta, key, delta)
+                )
+                if cur.rowcount == 0:
+                    raise ValueError("Not enough stock")
+                quantity = conn.execute("SELECT quantity FROM products WHERE id = ?", (key,)).fetchone()[0]
+                self._record_movements(conn, [(key, kind, delta, quantity, reference, _now())])
+            self._set_product(key, dict(self._products[key], quantity=quantity))
+        return quantity
+
+    @timed("store.apply_counts")
+    def apply_counts(self, counts, reference=None):
+        """Set many products to their counted quantities (``{id: counted}``) in one transaction.
+
+        Only products whose count differs from the stock on record are
+        written, each with a ``count`` movement in the audit log. Raises
+        ValueError (and changes nothing) for unknown IDs or negative counts.
+        Returns one variance line per counted product, in ``counts`` order.
+        """
+        negative = [key for key, counted in counts.items() if counted < 0]
+        if negative:
+            raise ValueError(f"Negative count for product ID(s): {', '.join(map(str, negative[:10]))}")
+        with self._lock:
+            date = _now()
+            with self._transaction() as conn:
+                # Variances against the stock as of this transaction, after any reload of other processes' writes
+                unknown = [key for key in counts if key not in self._products]
+                if unknown:
+                    raise ValueError(f"Unknown product ID(s): {', '.join(map(str, unknown[:10]))}")
+                report = []
+                changes = []
+                for key, counted in counts.items():
+                    product = self._products[key]
+                    variance = counted - product["quantity"]
+                    report.append({
+                        "id": key,
+                        "name": product["name"],
+                        "category": product["category"],
+                        "expected": product["quantity"],
+                        "counted": counted,
+                        "variance": variance,
+                        "value": variance * product["price"]
+                    })
+                    if variance:
+                        changes.append((key, counted, variance))
+                conn.executemany(
+                    "UPDATE products SET quantity = ?, version = version + 1 WHERE id = ?",
+                    [(counted, key) for key, counted, _ in changes]
+                )
+                self._record_movements(
+                    conn, [(key, movements.COUNT, variance, counted, reference, date) for key, counted, variance in changes]
+                )
+            for key, counted, _ in changes:
+                self._set_product(key, dict(self._products[key], quantity=counted))
+        return report
+
+    def set_reorder_points(self, points):
+        """Set reorder levels and quantities for many products (``{id: (level, quantity)}``) in one transaction"""
+        with self._lock:
+            unknown = [key for key in points if key not in self._products]
+            if unknown:
+                raise ValueError(f"Unknown product ID(s): {', '.join(map(str, unknown[:10]))}")
+            if any(level < 0 or quantity < 0 for level, quantity in points.values()):
+                raise ValueError("Reorder levels and quantities cannot be negative")
+            with self._transaction() as conn:
+                conn.executemany(
+                    "UPDATE products SET reorder_level = ?, reorder_quantity = ?, version = version + 1 WHERE id = ?",
+                    [(level, quantity, key) for key, (level, quantity) in points.items()]
+                )
+            for key, (level, quantity) in points.items():
+                self._set_product(key, dict(self._products[key], reorder_level=level, reorder_quantity=quantity))
+
+    def delete_product(self, key):
+        with self._lock:
+            with self._transaction() as conn:
+                conn.execute("DELETE FROM products WHERE id = ?", (key,))
+                quantity = self._products[key]["quantity"] if key in self._products else 0
+                if quantity:
+                    self._record_movements(conn, [(key, movements.DELETE, -quantity, 0, "Product deleted", _now())])
+            self._set_product(key, None)
+
+    def add_category(self, name):
+        with self._lock:
+            with self._transaction() as conn:
+                conn.execute("INSERT OR IGNORE INTO categories (name) VALUES (?)", (name,))
+            self._add_category(name)
+
+    @timed("store.checkout")
+    def checkout(self, customer, items, subtotal, discount, tax, total, date):
+        """Decrement stock for every cart line and record the sale in one transaction.
+
+        Each line is applied as a conditional ``UPDATE ... WHERE quantity >= ?``
+        so stock can never go negative, even with several tills selling the
+        same product at once. If any line is short the whole bill is rolled
+        back and OutOfStockError is raised. Products past their expiry date
+        on the sale date raise ExpiredProductError before anything is
+        written. Returns the new sale ID.
+
+        With write-behind on, the same checks run against the in-memory
+        stock and the bill is queued for the SaleWriter instead of written.
+        """
+        needed = _needed(items)
+        if self.writer is not None:
+            self.writer.wait_for_room()
+            with self._lock:
+                return self._accept(dict(customer=customer, items=items, subtotal=subtotal, discount=discount,
+                                         tax=tax, total=total, date=date), needed)
+        with self._lock:
+            self._check_expiry(needed, date)
+            with self._transaction() as conn:
+                sale_id, quantities = self._write_sale(conn, customer, items, needed, subtotal, discount, tax, total, date)
+            self._sale_applied(sale_id, quantities, customer, total, date)
+        return sale_id
+
+    @timed("store.checkout_many")
+    def checkout_many(self, bills):
+        """Check out many bills in one transaction; each bill is ``checkout``'s arguments as a dict.
+
+        Every bill gets its own savepoint, so one that is short of stock or
+        sells an expired product is rolled back alone and the rest still go
+        through. Returns one result per bill, in order: the new sale ID, or
+        the OutOfStockError/ExpiredProductError that rejected it.
+        """
+        results = []
+        applied = []
+        if self.writer is not None:
+            for bill in bills:
+                self.writer.wait_for_room()
+                with self._lock:
+                    try:
+                        results.append(self._accept(bill, _needed(bill["items"])))
+                    except (OutOfStockError, ExpiredProductError) as e:
+                        results.append(e)
+            return results
+        with self._lock:
+            with self._transaction() as conn:
+                for bill in bills:
+                    needed = _needed(bill["items"])
+                    try:
+                        self._check_expiry(needed, bill["date"])
+                        conn.execute("SAVEPOINT bill")
+                        try:
+                            sale_id, quantities = self._write_sale(
+                                conn, bill["customer"], bill["items"], needed, bill["subtotal"], bill["discount"],
+                                bill["tax"], bill["total"], bill["date"]
+                            )
+                        except OutOfStockError:
+                            conn.execute("ROLLBACK TO bill")
+                            raise
+                        finally:
+                            conn.execute("RELEASE bill")
+                    except (OutOfStockError, ExpiredProductError) as e:
+                        results.append(e)
+                    else:
+                        results.append(sale_id)
+                        applied.append((sale_id, quantities, bill))
+            for sale_id, quantities, bill in applied:
+                self._sale_applied(sale_id, quantities, bill["customer"], bill["total"], bill["date"])
+        return results
+
+    def _check_expiry(self, needed, date):
+        sale_day = datetime.strptime(date[:10], "%Y-%m-%d").date()
+        for key in needed:
+            if self.expiry.is_expired(key, sale_day):
+                product = self._products[key]
+                raise ExpiredProductError(key, product["name"], product["expiry_date"])
+
+    def _accept(self, bill, needed):
+        """Write-behind checkout: take the stock in memory and queue ``bill``; returns its sale ID"""
+        self._check_expiry(needed, bill["date"])
+        quantities = {}
+        for key in sorted(needed):
+            product = self._products.get(key)
+            available = product["quantity"] if product else 0
+            if available < needed[key]:
+                raise OutOfStockError(key, product["name"] if product else str(key), needed[key], available)
+            quantities[key] = available - needed[key]
+        if self._next_sale_id >= self._sale_id_limit:
+            self._reserve_sale_ids()
+        sale_id = self._next_sale_id
+        self._next_sale_id += 1
+        self.writer.submit(dict(bill, sale_id=sale_id, needed=needed))
+        self._sale_applied(sale_id, quantities, bill["customer"], bill["total"], bill["date"])
+        return sale_id
+
+    def _reserve_sale_ids(self):
+        """Take the next SALE_ID_BLOCK sale IDs for write-behind bills from the database.
+
+        Moving the sales table's AUTOINCREMENT counter past them makes every
+        other writer - this process's synchronous checkouts, or another
+        process - skip them, so a queued bill never finds its ID taken.
+        """
+        with self.pool.transaction() as conn:
+            start = conn.execute(
+                "SELECT MAX(COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'sales'), 0), "
+                "COALESCE((SELECT MAX(id) FROM sales), 0)) + 1"
+            ).fetchone()[0]
+            end = start + writebehind.SALE_ID_BLOCK
+            if not conn.execute("UPDATE sqlite_sequence SET seq = ? WHERE name = 'sales'", (end - 1,)).rowcount:
+                conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('sales', ?)", (end - 1,))
+        self._next_sale_id, self._sale_id_limit = start, end
+
+    def _write_sale(self, conn, customer, items, needed, subtotal, discount, tax, total, date, sale_id=None):
+        """Write one sale inside the current transaction; returns ``(sale_id, {id: quantity left})``
+
+        ``sale_id`` is given for write-behind bills, which got theirs when accepted.
+        """
+        quantities = {}
+        for key in sorted(needed):
+            cur = conn.execute(
+                "UPDATE products SET quantity = quantity - ?, version = version + 1 "
+                "WHERE id = ? AND quantity >= ?",
+                (needed[key], key, needed[key])
+            )
+            row = conn.execute("SELECT name, quantity FROM products WHERE id = ?", (key,)).fetchone()
+            if cur.rowcount == 0:
+                if row is None:
+                    raise OutOfStockError(key, str(key), needed[key], 0)
+                raise OutOfStockError(key, row["name"], needed[key], row["quantity"])
+            quantities[key] = row["quantity"]
+
+        cur = conn.execute(
+            "INSERT INTO sales (id, customer, subtotal, discount, tax, total, date, version) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, (SELECT version FROM store_version))",
+            (sale_id, customer, subtotal, discount, tax, total, date)
+        )
+        sale_id = cur.lastrowid
+        conn.executemany(
+            "INSERT INTO sale_items (sale_id, product_id, name, price, quantity, total) VALUES (?, ?, ?, ?, ?, ?)",
+            [(sale_id, item["key"], item["name"], item["price"], item["quantity"], item["total"])
+             for item in items]
+        )
+        rollups.record_sale(
+            conn, date, items,
+            {key: self._products[key]["category"] for key in needed if key in self._products},
+            total
+        )
+        self._record_movements(conn, [
+            (key, movements.SALE, -needed[key], quantities[key], f"Sale #{sale_id}", date)
+            for key in sorted(needed)
+        ])
+        return sale_id, quantities
+
+    def _sale_applied(self, sale_id, quantities, customer, total, date):
+        """Update the in-memory copy once a sale has been committed"""
+        for key, quantity in quantities.items():
+            self._set_product(key, dict(self._products[key], quantity=quantity))
+        self.sales_index.add(sale_id, customer, total, date)
+        self._versions["sales"] += 1
+
+    @timed("store.flush")
+    def flush(self):
+        """Write every bill accepted by write-behind checkouts so far (a no-op without write-behind).
+
+        The whole batch is one fsync'd transaction, written without holding
+        the store lock. A bill the database refuses - it can only happen if
+        another process changed the same stock - is skipped and kept in
+        ``writer.failures``, and the stock of its products is reloaded from
+        the database.
+        """
+        # Pending or in flight: taking _flush_lock waits for a batch another thread is writing
+        if self.writer is None or not self.writer.unwritten():
+            return
+        with self._flush_lock:
+            batch = self.writer.take()
+            if not batch:
+                return
+            failed = []
+            try:
+                with self.pool.transaction(synchronous="FULL") as conn:
+                    version = _db_version(conn)
+                    conn.execute("UPDATE store_version SET version = ?", (version + 1,))
+                    for bill in batch:
+                        conn.execute("SAVEPOINT bill")
+                        try:
+                            self._write_sale(
+                                conn, bill["customer"], bill["items"], bill["needed"], bill["subtotal"],
+                                bill["discount"], bill["tax"], bill["total"], bill["date"], bill["sale_id"]
+                            )
+                        except (OutOfStockError, sqlite3.IntegrityError) as e:
+                            conn.execute("ROLLBACK TO bill")
+                            failed.append((bill, e))
+                        finally:
+                            conn.execute("RELEASE bill")
+            except BaseException:
+                self.writer.requeue(batch)
+                raise
+            # Left behind if another process wrote in between, so the next refresh reloads
+            if version == self._db_version:
+                self._db_version = version + 1
+            self.writer.done(len(batch) - len(failed))
+        if failed:
+            with self._lock, self._flush_lock:
+                self._refused(failed)
+        METRICS.gauge("pending_sales", self.writer.unwritten())
+
+    def _refused(self, failed):
+        """Record write-behind bills the database refused, drop them from the sales index and resync their products' stock"""
+        keys = set()
+        for bill, error in failed:
+            log.error("Sale #%s for %s could not be written: %s", bill["sale_id"], bill["customer"], error)
+            self.sales_index.remove(bill["sale_id"])
+            self.writer.failures.append({"sale_id": bill["sale_id"], "customer": bill["customer"],
+                                         "total": bill["total"], "date": bill["date"], "error": str(error)})
+            keys.update(bill["needed"])
+        # Bills accepted since this batch was taken are already out of the in-memory stock
+        pending = {}
+        for bill in self.writer.queued():
+            for key, quantity in bill["needed"].items():
+                pending[key] = pending.get(key, 0) + quantity
+        with self.pool.connection() as conn:
+            for key in keys:
+                row = conn.execute("SELECT quantity FROM products WHERE id = ?", (key,)).fetchone()
+                if row is not None and key in self._products:
+                    quantity = row["quantity"] - pending.get(key, 0)
+                    self._set_product(key, dict(self._products[key], quantity=quantity))
+        self._versions["sales"] += 1
+
+    def _write_behind(self):
+        """SaleWriter's periodic job: flush, then start any ledger snapshot that has come due"""
+        self.flush()
+        self._snapshot_if_due()
+
+    @timed("store.take_snapshot")
+    def take_snapshot(self):
+        """Snapshot current stock into the ledger now; returns the movement ID it covers"""
+        with self._lock:
+            with self._transaction() as conn:
+                self._unsnapshotted = 0
+                return movements.take_snapshot(conn, _now())
+
+    def compact_ledger(self, before):
+        """Fold ledger movements dated before ``before`` into a snapshot (see movements.compact)"""
+        with self._lock:
+            with self._transaction() as conn:
+                return movements.compact(conn, str(before), _now())
+
+    def close(self):
+        """Write any queued sales, save the sales index snapshot if it is well behind, close the connections"""
+        if self.writer is not None:
+            atexit.unregister(self.close)
+            self.writer.close()
+            self.flush()
+        if self._snapshotter is not None:
+            self._snapshotter.join()
+        with self._lock:
+            if self.sales_index.count - self._index_saved > writebehind.INDEX_SNAPSHOT_TAIL:
+                self._save_sales_index(self.sales_index)
+        self.pool.close()
+
+
+def _needed(items):
+    """Units per product of a bill; lines for the same product are merged so the stock guard sees the full amount"""
+    needed = {}
+    for item in items:
+        needed[item["key"]] = needed.get(item["key"], 0) + item["quantity"]
+    return needed
+
+
+def _product_from_row(row):
+    return {
+        "name": row["name"],
+        "price": row["price"],
+        "quantity": row["quantity"],
+        "expiry_date": row["expiry_date"],
+        "category": row["category"],
+        "barcode": row["barcode"],
+        "reorder_level": row["reorder_level"],
+        "reorder_quantity": row["reorder_quantity"]
+    }
@@ -0,0 +1,150 @@
+"""Write-behind queue for checkouts and crash-safe snapshots of the sales index.
+
+With write-behind on (``STOCK_WRITE_BEHIND=1``) the store accepts a bill
+in memory - stock is checked and reserved there, the sale gets its ID and
+appears in the indexes - and ``SaleWriter`` commits the accepted bills to
+SQLite from a background thread, in batches. Each batch is one
+``synchronous=FULL`` (fsync'd) transaction, so a crash loses only the
+bills accepted since the last commit - a few ``interval``s' worth, and
+never more than ``max_pending`` plus one per till: a till waits for room
+once that many are unwritten. Sale IDs come from blocks of SALE_ID_BLOCK
+reserved in the database, so another process writing sales meanwhile
+never takes the ID of a queued bill.
+
+The sales table is append-only, which makes it the log for the in-memory
+SalesIndex: ``save_index`` writes the index with the last sale ID it
+covers (temporary file, fsync, atomic rename), and at startup the store
+loads it and replays only the sales after that ID instead of rebuilding
+the index from every sale.
+"""
+import logging
+import os
+import pickle
+import threading
+
+log = logging.getLogger(__name__)
+
+# Seconds between batch commits, and the most accepted bills waiting at once
+FLUSH_INTERVAL = 0.05
+MAX_PENDING = 500
+
+# Sale IDs reserved in the database at a time for write-behind bills
+SALE_ID_BLOCK = 1000
+
+# Sales replayed at startup beyond which the index snapshot is rewritten
+INDEX_SNAPSHOT_TAIL = 10000
+
+
+class SaleWriter:
+    """Background thread that calls ``flush`` every ``interval`` seconds, or sooner when the queue fills"""
+
+    def __init__(self, flush, interval=FLUSH_INTERVAL, max_pending=MAX_PENDING):
+        self._flush = flush
+        self.interval = interval
+        self.max_pending = max_pending
+        self._pending = []
+        # Bills taken by the flush in progress: unwritten too, so they count against max_pending
+        self._writing = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        # Counters for the Diagnostics page
+        self.written = 0
+        self.batches = 0
+        self.failures = []
+        self._thread = threading.Thread(target=self._run, name="sale-writer", daemon=True)
+        self._thread.start()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def unwritten(self):
+        """Bills accepted but not yet committed: waiting plus being written"""
+        return len(self._pending) + self._writing
+
+    def wait_for_room(self):
+        """Block while ``max_pending`` accepted bills are not yet written"""
+        with self._cond:
+            if self.unwritten() >= self.max_pending:
+                # Wake the thread now rather than at the end of its interval
+                self._cond.notify_all()
+                while self.unwritten() >= self.max_pending and not self._closed:
+                    self._cond.wait()
+
+    def submit(self, bill):
+        with self._cond:
+            self._pending.append(bill)
+            if len(self._pending) >= self.max_pending:
+                self._cond.notify_all()
+
+    def take(self):
+        """Remove and return every waiting bill, oldest first; call ``done`` or ``requeue`` once written"""
+        with self._cond:
+            batch, self._pending = self._pending, []
+            self._writing = len(batch)
+            return batch
+
+    def done(self, written):
+        """The taken batch is committed, ``written`` bills of it (the rest were refused)"""
+        with self._cond:
+            self._writing = 0
+            self.written += written
+            self.batches += 1
+            self._cond.notify_all()
+
+    def queued(self):
+        """Copy of the waiting bills, oldest first"""
+        with self._cond:
+            return list(self._pending)
+
+    def requeue(self, batch):
+        """Put back a batch that could not be written, ahead of newer bills"""
+        with self._cond:
+            self._pending[:0] = batch
+            self._writing = 0
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._closed and len(self._pending) < self.max_pending:
+                    self._cond.wait(self.interval)
+                closed = self._closed
+            try:
+                self._flush()
+            except Exception:
+                # The batch was requeued; try again next interval
+                log.exception("Writing accepted sales failed")
+            if closed:
+                return
+
+    def close(self):
+        """Stop the thread once everything queued so far has been written"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+
+
+def index_path(db_path):
+    return f"{db_path}.sales-index"
+
+
+def save_index(path, index, last_sale_id):
+    """Atomically write ``index`` covering sales up to ``last_sale_id``"""
+    partial = f"{path}.partial"
+    with open(partial, "wb") as f:
+        pickle.dump((last_sale_id, index), f, protocol=pickle.HIGHEST_PROTOCOL)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(partial, path)
+
+
+def load_index(path):
+    """``(last_sale_id, index)`` from ``save_index``, or ``(0, None)`` if there is no usable snapshot"""
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return 0, None
+    except Exception:
+        log.warning("Ignoring unreadable sales index snapshot %s", path, exc_info=True)
+        return 0, None